@@ -0,0 +1,108 @@
+# asset_cache.py
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+from typing import Optional
+
+class ImageCache:
+    """Content-addressed on-disk cache for generated images with LRU eviction"""
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes = None  # Computed lazily on first write
+
+    @staticmethod
+    def make_key(model: str, prompt: str, size: str, quality: str) -> str:
+        """Builds a cache key from every parameter that affects the generated image"""
+        request = {"model": model, "prompt": prompt, "size": size, "quality": quality}
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> str:
+        """Returns the storage path for a cache key"""
+        return os.path.join(self.cache_dir, key[:2], f"{key}.png")
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached image path for a key, or None on a miss"""
+        path = self.path_for(key)
+        try:
+            # Touch the entry so eviction sees it as recently used
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def fetch(self, key: str, target_path: str) -> bool:
+        """Copies a cached image to target_path. Returns False on a miss."""
+        path = self.get(key)
+        if path is None:
+            return False
+        try:
+            os.makedirs(os.path.dirname(target_path) or ".", exist_ok=True)
+            shutil.copyfile(path, target_path)
+        except OSError as e:
+            print(f"Error reading image cache: {e}")
+            return False
+        return True
+
+    def put(self, key: str, source_path: str) -> str:
+        """Stores a copy of source_path under key and evicts old entries if needed"""
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first so readers never see a partial image
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(source_path, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += os.path.getsize(path)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+        return path
+
+    def _entries(self):
+        """Yields (path, size, last_used) for every cached image"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".png"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """Removes least recently used entries until the cache fits in max_bytes"""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._total_bytes = total
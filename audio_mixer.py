@@ -0,0 +1,245 @@
+# audio_mixer.py
+import os
+import time
+import json
+import wave
+import hashlib
+import numpy as np
+from typing import Dict, List, Optional
+from config import MovieConfig
+from timeline import Timecode, parse_timecode
+from ffmpeg_runner import run_ffmpeg
+from tracing import span
+
+def timecode_to_samples(timecode: Timecode, sample_rate: int) -> int:
+    """Converts a cue timecode to a sample offset; "HH:MM:SS:FF" frames are at the video frame rate"""
+    if isinstance(timecode, str) and timecode.count(":") == 3:
+        fps = MovieConfig.VIDEO_SETTINGS["fps"]
+        return parse_timecode(timecode, fps) * sample_rate // fps
+    return parse_timecode(timecode, sample_rate)
+
+def db_to_gain(db: float) -> float:
+    return 10.0 ** (db / 20.0)
+
+class PlacedCue:
+    """A cue resolved to a stem and an absolute sample range on the mix timeline"""
+    __slots__ = ("layer", "stem", "start", "end", "offset", "gain", "fade_in", "fade_out", "loop")
+
+    def __init__(self, layer, stem, start, end, offset, gain, fade_in, fade_out, loop):
+        self.layer = layer
+        self.stem = stem
+        self.start = start
+        self.end = end
+        self.offset = offset
+        self.gain = gain
+        self.fade_in = fade_in
+        self.fade_out = fade_out
+        self.loop = loop
+
+class AudioMixer:
+    """
+    Mixes a sound design cue list onto a sample-accurate timeline.
+
+    Each cue has a "timecode" and a layer "type" (ambience, foley, sfx, music
+    or dialogue) and refers to a stem file through "file" or the stems
+    mapping passed to mix. Optional cue fields are "duration" and "offset"
+    (seconds), "gain_db", "fade_in" and "fade_out" (seconds) and "loop".
+    Stems are decoded once to raw float32 files and memory-mapped, and the
+    mix is rendered and written in fixed-size blocks, so memory stays
+    bounded regardless of the film's length. Music is ducked while dialogue
+    cues play.
+    """
+
+    def __init__(self, sample_rate: int = None, channels: int = None, block_seconds: float = None,
+                 cache_dir: str = None):
+        settings = MovieConfig.MIX_SETTINGS
+        self.sample_rate = sample_rate or settings["sample_rate"]
+        self.channels = channels or settings["channels"]
+        self.block_size = int((block_seconds or settings["block_seconds"]) * self.sample_rate)
+        self.cache_dir = cache_dir or settings["stem_cache_dir"]
+        self._stems = {}
+
+    def load_stem(self, path: str) -> np.ndarray:
+        """
+        Returns a stem as a read-only (samples, channels) float32 memory map,
+        decoding it with ffmpeg on first use. Decoded stems are cached on disk
+        keyed by path, size, modification time and output format.
+        """
+        path = os.path.abspath(path)
+        if path in self._stems:
+            return self._stems[path]
+
+        stat = os.stat(path)
+        key = hashlib.sha256(
+            f"{path}|{stat.st_size}|{stat.st_mtime_ns}|{self.sample_rate}|{self.channels}".encode("utf-8")
+        ).hexdigest()
+        raw_path = os.path.join(self.cache_dir, f"{key}.f32")
+        if not os.path.exists(raw_path):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{raw_path}.part"
+            cmd = [
+                "ffmpeg", "-y",
+                "-i", path,
+                "-vn",
+                "-f", "f32le",
+                "-acodec", "pcm_f32le",
+                "-ac", str(self.channels),
+                "-ar", str(self.sample_rate),
+                tmp_path
+            ]
+            run_ffmpeg(cmd, label=f"stem_decode:{os.path.basename(path)}")
+            os.replace(tmp_path, raw_path)
+
+        if os.path.getsize(raw_path) == 0:
+            stem = np.zeros((0, self.channels), dtype=np.float32)
+        else:
+            stem = np.memmap(raw_path, dtype=np.float32, mode='r').reshape(-1, self.channels)
+        self._stems[path] = stem
+        return stem
+
+    def place_cues(self, cue_list: List[Dict], stems: Dict = None) -> tuple:
+        """
+        Resolves cues to PlacedCue ranges sorted by start. stems maps a cue's
+        index or description to a stem file for cues without a "file" entry.
+        Returns the placed cues and the cues skipped for lack of a stem.
+        """
+        settings = MovieConfig.MIX_SETTINGS
+        stems = stems or {}
+        placed = []
+        skipped = []
+        for index, cue in enumerate(cue_list):
+            path = cue.get("file") or stems.get(index) or stems.get(cue.get("description"))
+            if not path or not os.path.exists(path):
+                skipped.append(cue)
+                continue
+
+            layer = cue.get("type", "sfx")
+            stem = self.load_stem(path)
+            start = timecode_to_samples(cue.get("timecode", 0), self.sample_rate)
+            offset = timecode_to_samples(cue.get("offset", 0), self.sample_rate)
+            loop = bool(cue.get("loop", False)) and len(stem) > 0
+            available = len(stem) - offset
+            if "duration" in cue:
+                length = timecode_to_samples(cue["duration"], self.sample_rate)
+                if not loop:
+                    length = min(length, available)
+            else:
+                length = available
+            if length <= 0:
+                skipped.append(cue)
+                continue
+
+            gain_db = cue.get("gain_db", settings["layer_gain_db"].get(layer, 0.0))
+            placed.append(PlacedCue(
+                layer, stem, start, start + length, offset, db_to_gain(gain_db),
+                int(cue.get("fade_in", settings["fade_in"]) * self.sample_rate),
+                int(cue.get("fade_out", settings["fade_out"]) * self.sample_rate),
+                loop
+            ))
+        placed.sort(key=lambda placed_cue: placed_cue.start)
+        return placed, skipped
+
+    def _cue_block(self, cue: PlacedCue, start: int, end: int) -> np.ndarray:
+        """Returns the cue's samples for timeline range [start, end) with gain and fades applied"""
+        position = np.arange(start - cue.start, end - cue.start, dtype=np.int64)
+        if cue.loop:
+            samples = cue.stem[(cue.offset + position) % len(cue.stem)]
+        else:
+            samples = cue.stem[cue.offset + position[0]:cue.offset + position[-1] + 1]
+
+        envelope = np.full(len(position), cue.gain, dtype=np.float32)
+        if cue.fade_in > 0:
+            envelope *= np.minimum(1.0, position / cue.fade_in).astype(np.float32)
+        if cue.fade_out > 0:
+            envelope *= np.minimum(1.0, (cue.end - cue.start - position) / cue.fade_out).astype(np.float32)
+        return samples * envelope[:, None]
+
+    def _duck_gain(self, dialogue: List[tuple], start: int, end: int) -> Optional[np.ndarray]:
+        """Music gain for [start, end): ramps down before each dialogue cue and back up after it"""
+        settings = MovieConfig.MIX_SETTINGS["ducking"]
+        attack = max(1, int(settings["attack"] * self.sample_rate))
+        release = max(1, int(settings["release"] * self.sample_rate))
+        overlapping = [(s, e) for s, e in dialogue if s - attack < end and e + release > start]
+        if not overlapping:
+            return None
+
+        t = np.arange(start, end, dtype=np.float64)
+        amount = np.zeros(end - start, dtype=np.float64)
+        for s, e in overlapping:
+            ramp = np.minimum((t - (s - attack)) / attack, ((e + release) - t) / release)
+            np.maximum(amount, np.clip(ramp, 0.0, 1.0), out=amount)
+        return (1.0 - amount * (1.0 - db_to_gain(settings["amount_db"]))).astype(np.float32)
+
+    def mix(self, cue_list: List[Dict], output_path: str, stems: Dict = None, duration: Timecode = None) -> Dict:
+        """
+        Renders the cue list to a 16-bit WAV file at output_path, block by
+        block. duration defaults to the end of the last cue. Returns mix
+        statistics including the realtime factor.
+        """
+        started = time.perf_counter()
+        placed, skipped = self.place_cues(cue_list, stems)
+        if duration is not None:
+            total = timecode_to_samples(duration, self.sample_rate)
+        else:
+            total = max((cue.end for cue in placed), default=0)
+        dialogue = [(cue.start, cue.end) for cue in placed if cue.layer == "dialogue"]
+
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        peak = 0.0
+        clipped = 0
+        next_cue = 0
+        active = []
+        with span("audio_mix", "audio", cues=len(placed)), wave.open(output_path, 'wb') as out:
+            out.setnchannels(self.channels)
+            out.setsampwidth(2)
+            out.setframerate(self.sample_rate)
+
+            for block_start in range(0, total, self.block_size):
+                block_end = min(total, block_start + self.block_size)
+                while next_cue < len(placed) and placed[next_cue].start < block_end:
+                    active.append(placed[next_cue])
+                    next_cue += 1
+                active = [cue for cue in active if cue.end > block_start]
+
+                bus = np.zeros((block_end - block_start, self.channels), dtype=np.float32)
+                music = None
+                for cue in active:
+                    start, end = max(block_start, cue.start), min(block_end, cue.end)
+                    if start >= end:
+                        continue
+                    samples = self._cue_block(cue, start, end)
+                    if cue.layer == "music":
+                        if music is None:
+                            music = np.zeros_like(bus)
+                        music[start - block_start:end - block_start] += samples
+                    else:
+                        bus[start - block_start:end - block_start] += samples
+
+                if music is not None:
+                    duck = self._duck_gain(dialogue, block_start, block_end)
+                    bus += music if duck is None else music * duck[:, None]
+
+                peak = max(peak, float(np.abs(bus).max(initial=0.0)))
+                clipped += int(np.count_nonzero(np.abs(bus) > 1.0))
+                np.clip(bus, -1.0, 1.0, out=bus)
+                out.writeframes((bus * 32767.0).astype('<i2').tobytes())
+
+        wall_time = time.perf_counter() - started
+        seconds = total / self.sample_rate
+        return {
+            "output": output_path,
+            "duration": round(seconds, 3),
+            "cues": len(placed),
+            "skipped": len(skipped),
+            "peak": round(peak, 4),
+            "clipped_samples": clipped,
+            "wall_time": round(wall_time, 3),
+            "realtime_factor": round(seconds / wall_time, 1) if wall_time > 0 else None
+        }
+
+    def mix_sound_design(self, sound_design_path: str, output_path: str, stems: Dict = None,
+                         duration: Timecode = None) -> Dict:
+        """Mixes the cue_list of a sound design document written by generate_sound_description"""
+        with open(sound_design_path, 'r') as f:
+            sound_design = json.load(f)
+        return self.mix(sound_design.get("cue_list", []), output_path, stems, duration)
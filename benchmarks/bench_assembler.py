@@ -0,0 +1,76 @@
+# benchmarks/bench_assembler.py
+import os
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+from benchmarks.common import percentiles, peak_rss_mb, emit, read_metrics_log
+
+def make_shot_list(shots: int, duration: int, fade_every: int = 0) -> dict:
+    """Builds a synthetic shot list; every fade_every-th shot fades in"""
+    shot_list = {"project_name": f"bench_{shots}", "shots": []}
+    for number in range(1, shots + 1):
+        shot = {
+            "shot_number": number,
+            "type": "medium",
+            "description": f"Synthetic shot {number}",
+            "duration": duration,
+            "camera_movement": "static"
+        }
+        if fade_every and number % fade_every == 0:
+            shot["transitions"] = {"in": "fade", "out": "cut"}
+        shot_list["shots"].append(shot)
+    return shot_list
+
+def run(shots: int, duration: int, resolution: str, mode: str, fade_every: int) -> dict:
+    from config import MovieConfig
+    from video_assembler import VideoAssembler, generate_video_shots_batch
+
+    # Small frames keep 10k-shot runs practical; encoder settings are otherwise unchanged
+    MovieConfig.VIDEO_SETTINGS["resolution"] = resolution
+
+    with tempfile.TemporaryDirectory(prefix="bench_assembler_") as project:
+        metrics_log = os.path.join(project, "ffmpeg_metrics.jsonl")
+        MovieConfig.FFMPEG_SETTINGS["metrics_log"] = metrics_log
+
+        shot_list = make_shot_list(shots, duration, fade_every)
+        shot_list_path = os.path.join(project, "shot_list.json")
+        with open(shot_list_path, 'w') as f:
+            json.dump(shot_list, f)
+
+        with contextlib.redirect_stdout(open(os.devnull, 'w')):
+            start = time.perf_counter()
+            rendered = generate_video_shots_batch(shot_list["shots"], output_dir=os.path.join(project, "shots"))
+            render_seconds = time.perf_counter() - start
+
+            assembler = VideoAssembler(project)
+            start = time.perf_counter()
+            assembler.assemble_video(shot_list_path, "bench.mp4", mode=mode)
+            assembly_seconds = time.perf_counter() - start
+
+        jobs = read_metrics_log(metrics_log)
+        media_seconds = shots * duration
+        return {
+            "case": f"assembler_{shots}",
+            "shots": shots,
+            "rendered": len(rendered),
+            "render_seconds": round(render_seconds, 3),
+            "render_shots_per_second": round(shots / render_seconds, 2) if render_seconds else None,
+            "assembly_seconds": round(assembly_seconds, 3),
+            "assembly_realtime_factor": round(media_seconds / assembly_seconds, 2) if assembly_seconds else None,
+            "assembled": os.path.exists(os.path.join(project, "output", "bench.mp4")),
+            "ffmpeg_jobs": len(jobs),
+            "ffmpeg_job_latency": percentiles([job["wall_time"] for job in jobs]),
+            **peak_rss_mb()
+        }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark placeholder rendering and assembly")
+    parser.add_argument("--shots", type=int, default=10)
+    parser.add_argument("--duration", type=int, default=1, help="Seconds per shot")
+    parser.add_argument("--resolution", type=str, default="320x180")
+    parser.add_argument("--mode", type=str, default="auto")
+    parser.add_argument("--fade-every", type=int, default=0, help="Make every Nth shot fade in")
+    args = parser.parse_args()
+    emit(run(args.shots, args.duration, args.resolution, args.mode, args.fade_every))
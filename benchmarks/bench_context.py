@@ -0,0 +1,76 @@
+# benchmarks/bench_context.py
+import time
+import json
+import argparse
+import tempfile
+from benchmarks.common import emit
+from context_compaction import ContextCompactor
+from screenplay import parse_screenplay, build_shot_list
+
+SCENE = """INT. {place} - NIGHT
+
+Ann runs to the door and slams it shut behind her as the sirens wail outside.
+
+ANN
+They found us. We have maybe an hour before they break through.
+
+BOB
+(calm)
+Then we leave tonight, and we take the flower with us.
+
+EXT. CITY ROOFTOP {number} - DAWN
+
+Rain sweeps across the rooftops. A small flower pushes through the cracked concrete.
+"""
+
+VISUAL_DEV = """## Visual Development
+- Color palette: teal shadows against warm amber practicals
+- Lighting: hard, motivated sources with neon spill through rain
+- Mood: tense and melancholic, hope in small details
+- Texture: wet concrete, rust, peeling paint, film grain
+Concept art covers the lab interior, the rooftop at dawn and the ruined skyline.
+"""
+
+def make_outputs(scenes: int) -> dict:
+    script = "\n".join(SCENE.format(place=f"LAB {number}", number=number) for number in range(scenes))
+    shots = build_shot_list(parse_screenplay(script))["shots"]
+    for shot in shots:
+        shot["description"] += " 35mm lens, shallow depth of field, slow push toward the subject."
+    cinematography = "Refined shot list:\n" + json.dumps(shots, indent=2) + "\nKeep the camera low in the lab scenes."
+    return {"script": script, "visual_dev": VISUAL_DEV * 4, "cinematography": cinematography}
+
+def run(scenes: int, repeat: int) -> dict:
+    """
+    Measures the video director's context size with and without compaction,
+    and the best cold and warm compaction time over repeat runs
+    """
+    outputs = make_outputs(scenes)
+    cold = warm = float("inf")
+    for _ in range(max(1, repeat)):
+        # A fresh cache directory per run keeps the cold timing cold
+        with tempfile.TemporaryDirectory(prefix="context_bench_") as cache_dir:
+            compactor = ContextCompactor(cache_dir=cache_dir)
+            start = time.perf_counter()
+            compactor.compact("video_prompts", outputs)
+            cold = min(cold, time.perf_counter() - start)
+            start = time.perf_counter()
+            compactor.compact("video_prompts", outputs)
+            warm = min(warm, time.perf_counter() - start)
+
+    stats = compactor.stats["video_prompts"]
+    return {
+        "case": f"context_{scenes}",
+        "scenes": scenes,
+        "raw_tokens": stats["raw_tokens"],
+        "compacted_tokens": stats["tokens"],
+        "reduction_ratio": round(stats["raw_tokens"] / max(1, stats["tokens"]), 1),
+        "cold_seconds": round(cold, 4),
+        "warm_seconds": round(warm, 4)
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark context compaction for the video prompt task")
+    parser.add_argument("--scenes", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs; the fastest is reported")
+    args = parser.parse_args()
+    emit(run(args.scenes, args.repeat))
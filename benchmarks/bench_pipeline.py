@@ -0,0 +1,71 @@
+# benchmarks/bench_pipeline.py
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+from benchmarks.common import REPO_ROOT, percentiles, peak_rss_mb, emit
+from benchmarks.mock_openai import MockOpenAIServer
+
+def run(iterations: int, chat_latency: float, image_latency: float, chat_rpm: int, image_rpm: int,
+        crew_mode: str) -> dict:
+    """
+    Runs create_movie_from_prompt end to end against the local mock server.
+    The working directory, environment and cache settings it changes are
+    restored afterwards.
+    """
+    saved_cwd = os.getcwd()
+    saved_env = {name: os.environ.get(name) for name in ("OPENAI_API_BASE", "OPENAI_API_KEY")}
+    with MockOpenAIServer(chat_latency=chat_latency, image_latency=image_latency,
+                          chat_rpm=chat_rpm, image_rpm=image_rpm) as server, \
+            tempfile.TemporaryDirectory(prefix="bench_pipeline_") as project:
+        # Settings are read at import time, so configure the environment first
+        os.environ["OPENAI_API_BASE"] = server.url
+        os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+        from config import MovieConfig
+        import movie_generator
+        saved_cache_dir = MovieConfig.CACHE_SETTINGS["image_cache_dir"]
+
+        latencies = []
+        try:
+            shutil.copy(os.path.join(REPO_ROOT, "movie_template.md"), project)
+            os.chdir(project)
+            for iteration in range(iterations):
+                # Each iteration is a cold run: fresh image cache and no manifest
+                MovieConfig.CACHE_SETTINGS["image_cache_dir"] = os.path.join(project, f".cache_{iteration}")
+                movie_generator.image_cache.cache_dir = MovieConfig.CACHE_SETTINGS["image_cache_dir"]
+                with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                    start = time.perf_counter()
+                    movie_generator.create_movie_from_prompt("A lonely robot protects a flower",
+                                                             crew_mode=crew_mode, resume=False)
+                    latencies.append(time.perf_counter() - start)
+        finally:
+            os.chdir(saved_cwd)
+            MovieConfig.CACHE_SETTINGS["image_cache_dir"] = saved_cache_dir
+            movie_generator.image_cache.cache_dir = saved_cache_dir
+            for name, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+        return {
+            "case": f"pipeline_{crew_mode}",
+            "iterations": iterations,
+            "films_per_minute": round(60.0 * iterations / sum(latencies), 3),
+            "latency": percentiles(latencies),
+            "requests": dict(server.stats),
+            **peak_rss_mb()
+        }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark create_movie_from_prompt against a mock OpenAI server")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--chat-latency", type=float, default=0.05)
+    parser.add_argument("--image-latency", type=float, default=0.1)
+    parser.add_argument("--chat-rpm", type=int, default=None)
+    parser.add_argument("--image-rpm", type=int, default=None)
+    parser.add_argument("--crew-mode", type=str, default="dag", choices=["dag", "sequential"])
+    args = parser.parse_args()
+    emit(run(args.iterations, args.chat_latency, args.image_latency, args.chat_rpm, args.image_rpm, args.crew_mode))
@@ -0,0 +1,33 @@
+# benchmarks/bench_startup.py
+import sys
+import time
+import argparse
+import subprocess
+from benchmarks.common import REPO_ROOT, percentiles, emit
+
+def run(iterations: int) -> dict:
+    """Measures CLI startup: `main.py --help` and a bare import of movie_generator"""
+    help_times = []
+    import_times = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "main.py", "--help"], cwd=REPO_ROOT, check=True, capture_output=True)
+        help_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import movie_generator"], cwd=REPO_ROOT, check=True,
+                       capture_output=True)
+        import_times.append(time.perf_counter() - start)
+
+    return {
+        "case": "startup",
+        "help_seconds": percentiles(help_times)["p50"],
+        "import_seconds": percentiles(import_times)["p50"],
+        "help_latency": percentiles(help_times)
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark CLI startup and import time")
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+    emit(run(args.iterations))
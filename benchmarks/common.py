@@ -0,0 +1,43 @@
+# benchmarks/common.py
+import os
+import sys
+import json
+import resource
+from typing import Dict, List
+
+# Make the project modules importable when run as python -m benchmarks.<name>
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+def percentiles(values: List[float], points=(50, 90, 99)) -> Dict[str, float]:
+    """Returns nearest-rank percentiles of values as {"p50": ..., ...}"""
+    if not values:
+        return {f"p{point}": None for point in points}
+    ordered = sorted(values)
+    result = {}
+    for point in points:
+        rank = max(0, min(len(ordered) - 1, int(round(point / 100.0 * len(ordered))) - 1))
+        result[f"p{point}"] = round(ordered[rank], 4)
+    return result
+
+def peak_rss_mb() -> Dict[str, float]:
+    """Peak resident set size of this process and of its reaped children, in MB"""
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+        "peak_child_rss_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1)
+    }
+
+def emit(result: Dict):
+    """Prints a benchmark result as the last line of output for run.py to collect"""
+    sys.stdout.write("BENCHMARK_RESULT " + json.dumps(result) + "\n")
+    sys.stdout.flush()
+
+def read_metrics_log(path: str) -> List[Dict]:
+    """Loads the ffmpeg JSON-lines metrics log written by ffmpeg_runner"""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -0,0 +1,245 @@
+# benchmarks/mock_openai.py
+import json
+import time
+import zlib
+import struct
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional
+
+# A short screenplay in the movie_template.md format, returned by chat completions
+CANNED_SCREENPLAY = """FADE IN:
+
+EXT. RUINED CITY - DAWN
+
+Wind moves through empty streets. A small ROBOT picks its way over rubble.
+
+ROBOT
+(to itself)
+Another day. Another search.
+
+INT. ABANDONED GREENHOUSE - DAY
+
+Broken glass everywhere. In the center, a single FLOWER pushes through cracked concrete.
+
+The Robot kneels, optical sensors focusing.
+
+ROBOT
+Hello, little one.
+
+EXT. RUINED CITY - NIGHT
+
+A storm rolls in. The Robot shields the flower with its own body as rain hammers down.
+
+FADE OUT.
+"""
+
+def make_png(width: int, height: int, rgb=(40, 40, 40)) -> bytes:
+    """Builds a valid solid-colour PNG of the given size"""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff)
+
+    row = b"\x00" + bytes(rgb) * width
+    raw = row * height
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, 6)) + chunk(b"IEND", b"")
+
+class _RateLimiter:
+    """Token bucket returning the wait time until the next request is allowed"""
+
+    def __init__(self, per_minute: Optional[int]):
+        self.rate = per_minute / 60.0 if per_minute else None
+        self.capacity = float(per_minute or 0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        if self.rate is None:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+class MockOpenAIServer:
+    """
+    Local stand-in for the OpenAI chat and image endpoints with configurable
+    latency, per-endpoint rate limits (429 with Retry-After) and canned PNGs.
+    Use as a context manager; point OPENAI_API_BASE at server.url.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, chat_latency: float = 0.05,
+                 image_latency: float = 0.1, chat_rpm: int = None, image_rpm: int = None,
+                 image_size=(1792, 1024), completion_text: str = None, stream_chunk_chars: int = 40):
+        self.chat_latency = chat_latency
+        self.image_latency = image_latency
+        self.completion_text = completion_text or f"Thought: I now know the final answer\nFinal Answer: {CANNED_SCREENPLAY}"
+        self.stream_chunk_chars = stream_chunk_chars
+        self.png = make_png(*image_size)
+        self.limits = {"chat": _RateLimiter(chat_rpm), "image": _RateLimiter(image_rpm)}
+        self.stats = {"chat": 0, "image": 0, "download": 0, "rate_limited": 0}
+        self._stats_lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handler_class(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, body: dict, headers: dict = None):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _rate_limited(self, endpoint: str) -> bool:
+                wait = mock.limits[endpoint].acquire()
+                if wait <= 0:
+                    return False
+                mock.count("rate_limited")
+                self._send_json(429, {"error": {"message": "Rate limit reached", "type": "requests"}},
+                                {"Retry-After": f"{wait:.3f}"})
+                return True
+
+            def _read_json(self) -> dict:
+                length = int(self.headers.get("Content-Length", 0))
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def do_POST(self):
+                request = self._read_json()
+                if self.path.endswith("/chat/completions"):
+                    self._chat(request)
+                elif self.path.endswith("/images/generations"):
+                    self._image(request)
+                else:
+                    self._send_json(404, {"error": {"message": "Not found"}})
+
+            def do_GET(self):
+                if self.path.startswith("/images/"):
+                    mock.count("download")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "image/png")
+                    self.send_header("Content-Length", str(len(mock.png)))
+                    self.end_headers()
+                    self.wfile.write(mock.png)
+                else:
+                    self._send_json(404, {"error": {"message": "Not found"}})
+
+            def _chat(self, request: dict):
+                if self._rate_limited("chat"):
+                    return
+                mock.count("chat")
+                prompt_chars = sum(len(str(message.get("content", ""))) for message in request.get("messages", []))
+                text = mock.completion_text
+                usage = {"prompt_tokens": prompt_chars // 4, "completion_tokens": len(text) // 4}
+                usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+                model = request.get("model", "gpt-4-turbo-preview")
+
+                if request.get("stream"):
+                    self._stream_chat(text, model)
+                    return
+
+                time.sleep(mock.chat_latency)
+                self._send_json(200, {
+                    "id": "chatcmpl-mock",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                                 "finish_reason": "stop"}],
+                    "usage": usage
+                })
+
+            def _stream_chat(self, text: str, model: str):
+                # Spread the latency over the stream so the first chunk arrives early
+                pieces = [text[i:i + mock.stream_chunk_chars] for i in range(0, len(text), mock.stream_chunk_chars)]
+                delay = mock.chat_latency / max(1, len(pieces))
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for piece in pieces + [None]:
+                    time.sleep(delay)
+                    choice = {"index": 0, "delta": {"content": piece} if piece else {},
+                              "finish_reason": None if piece else "stop"}
+                    chunk = {"id": "chatcmpl-mock", "object": "chat.completion.chunk",
+                             "created": int(time.time()), "model": model, "choices": [choice]}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+            def _image(self, request: dict):
+                if self._rate_limited("image"):
+                    return
+                mock.count("image")
+                time.sleep(mock.image_latency)
+                host, port = mock._server.server_address[:2]
+                with mock._stats_lock:
+                    index = mock.stats["image"]
+                self._send_json(200, {
+                    "created": int(time.time()),
+                    "data": [{"url": f"http://{host}:{port}/images/{index}.png",
+                              "revised_prompt": request.get("prompt", "")}]
+                })
+
+        return Handler
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Run a local OpenAI stand-in")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--chat-latency", type=float, default=0.05)
+    parser.add_argument("--image-latency", type=float, default=0.1)
+    parser.add_argument("--chat-rpm", type=int, default=None)
+    parser.add_argument("--image-rpm", type=int, default=None)
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(port=args.port, chat_latency=args.chat_latency, image_latency=args.image_latency,
+                              chat_rpm=args.chat_rpm, image_rpm=args.image_rpm)
+    print(f"Mock OpenAI server listening on {server.url}")
+    server.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
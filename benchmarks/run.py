@@ -0,0 +1,130 @@
+# benchmarks/run.py
+import os
+import sys
+import json
+import argparse
+import subprocess
+from typing import Dict, List
+from benchmarks.common import REPO_ROOT
+
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+# Absolute budgets that fail the run regardless of the stored baselines
+BUDGETS = {
+    "startup": {"help_seconds": 1.0}
+}
+
+# Metric name suffixes where a larger value is better; everything else timed is lower-is-better
+HIGHER_IS_BETTER = ("_per_second", "realtime_factor", "films_per_minute", "reduction_ratio")
+LOWER_IS_BETTER = ("_seconds", "_mb", "p50", "p90", "p99", "compacted_tokens")
+TIMINGS = ("_seconds", "p50", "p90", "p99")
+
+# Timing changes smaller than this are scheduler noise on short cases, whatever the ratio
+NOISE_FLOOR_SECONDS = 0.05
+
+def run_case(module: str, args: List[str]) -> Dict:
+    """Runs one benchmark in a fresh interpreter so peak RSS is per case"""
+    cmd = [sys.executable, "-m", f"benchmarks.{module}"] + args
+    result = subprocess.run(cmd, cwd=REPO_ROOT, capture_output=True, text=True)
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith("BENCHMARK_RESULT "):
+            return json.loads(line[len("BENCHMARK_RESULT "):])
+    raise RuntimeError(f"{module} {' '.join(args)} failed:\n{result.stderr[-2000:]}")
+
+def flatten(result: Dict, prefix: str = "") -> Dict[str, float]:
+    values = {}
+    for key, value in result.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            values.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[name] = value
+    return values
+
+def compare(result: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Returns a description of every metric that regressed beyond tolerance.
+    Timings must also have grown by more than NOISE_FLOOR_SECONDS, so
+    millisecond cases are not failed by jitter.
+    """
+    regressions = []
+    current, previous = flatten(result), flatten(baseline)
+    for name, value in current.items():
+        old = previous.get(name)
+        if old in (None, 0):
+            continue
+        if name.endswith(HIGHER_IS_BETTER) and value < old * (1 - tolerance):
+            regressions.append(f"{name}: {value} < baseline {old}")
+        elif name.endswith(LOWER_IS_BETTER) and value > old * (1 + tolerance):
+            if name.endswith(TIMINGS) and value - old <= NOISE_FLOOR_SECONDS:
+                continue
+            regressions.append(f"{name}: {value} > baseline {old}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite")
+    parser.add_argument("--suite", type=str, default="startup,assembler,pipeline,context",
+                        help="Comma-separated suites: startup, assembler, pipeline, context")
+    parser.add_argument("--sizes", type=str, default="10,100,1000,10000",
+                        help="Shot counts for the assembler suite")
+    parser.add_argument("--iterations", type=int, default=3, help="Pipeline iterations")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed regression ratio")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baselines")
+    parser.add_argument("--output", type=str, help="Write the results as JSON")
+    args = parser.parse_args()
+
+    suites = [suite.strip() for suite in args.suite.split(",") if suite.strip()]
+    cases = []
+    if "startup" in suites:
+        cases.append(("bench_startup", []))
+    if "assembler" in suites:
+        cases.extend(("bench_assembler", ["--shots", size.strip()]) for size in args.sizes.split(","))
+    if "pipeline" in suites:
+        cases.append(("bench_pipeline", ["--iterations", str(args.iterations)]))
+    if "context" in suites:
+        cases.extend(("bench_context", ["--scenes", scenes]) for scenes in ("10", "200"))
+
+    results = {}
+    failures = []
+    for module, case_args in cases:
+        print(f"Running {module} {' '.join(case_args)}...")
+        try:
+            result = run_case(module, case_args)
+        except RuntimeError as e:
+            print(f"  {e}")
+            failures.append(str(e).splitlines()[0])
+            continue
+        results[result["case"]] = result
+        print("  " + json.dumps(result))
+
+    baselines = {}
+    if os.path.exists(BASELINES_PATH):
+        with open(BASELINES_PATH, 'r') as f:
+            baselines = json.load(f)
+
+    for case, result in results.items():
+        for metric, budget in BUDGETS.get(case, {}).items():
+            if result.get(metric) is not None and result[metric] > budget:
+                failures.append(f"{case}.{metric}: {result[metric]} exceeds budget {budget}")
+        if case in baselines and not args.save_baseline:
+            failures.extend(f"{case}.{regression}" for regression in compare(result, baselines[case], args.tolerance))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        baselines.update(results)
+        with open(BASELINES_PATH, 'w') as f:
+            json.dump(baselines, f, indent=2)
+        print(f"Baselines saved to {BASELINES_PATH}")
+
+    if failures:
+        print("\nRegressions:")
+        for failure in failures:
+            print(f"- {failure}")
+        sys.exit(1)
+    print("\nNo regressions")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# clients.py
+import os
+import tempfile
+import threading
+from config import MovieConfig
+from tracing import span
+
+# Shared clients, created on first use and reused by every helper
+_lock = threading.Lock()
+_openai_client = None
+_http_session = None
+
+def get_openai_client():
+    """Returns the shared OpenAI client backed by a pooled keep-alive connection pool"""
+    global _openai_client
+    if _openai_client is None:
+        with _lock:
+            if _openai_client is None:
+                import httpx
+                from openai import OpenAI
+                settings = MovieConfig.HTTP_SETTINGS
+                http_client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=settings["pool_maxsize"],
+                        max_keepalive_connections=settings["pool_maxsize"]
+                    ),
+                    timeout=settings["timeout"]
+                )
+                _openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), base_url=MovieConfig.OPENAI_API_BASE,
+                                        http_client=http_client,
+                                        # Retries are handled by the shared request scheduler
+                                        max_retries=0)
+    return _openai_client
+
+def get_http_session():
+    """Returns the shared keep-alive requests session used for asset downloads"""
+    global _http_session
+    if _http_session is None:
+        with _lock:
+            if _http_session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                settings = MovieConfig.HTTP_SETTINGS
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=settings["pool_connections"],
+                    pool_maxsize=settings["pool_maxsize"]
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _http_session = session
+    return _http_session
+
+def download_file(url: str, filepath: str) -> str:
+    """
+    Streams url to filepath in chunks without buffering the whole body in memory.
+    The file is written to a temporary name and renamed into place once complete.
+    """
+    settings = MovieConfig.HTTP_SETTINGS
+    directory = os.path.dirname(filepath) or "."
+    os.makedirs(directory, exist_ok=True)
+
+    with span("download", "download") as trace, \
+            get_http_session().get(url, stream=True, timeout=settings["timeout"]) as response:
+        response.raise_for_status()
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                for chunk in response.iter_content(chunk_size=settings["download_chunk_size"]):
+                    if chunk:
+                        file.write(chunk)
+                        size += len(chunk)
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        trace["bytes"] = size
+    return filepath
@@ -11,9 +11,75 @@ class MovieConfig:
         "fps": 24,
         "aspect_ratio": "16:9",
         "codec": "h264",
-        "bitrate": "10M"
+        "bitrate": "10M",
+        # Encoder settings shared by every render path so clips can be
+        # stream-copied and concatenated without re-encoding
+        "encoder": "libx264",
+        "preset": "medium",
+        "crf": 23,
+        "pix_fmt": "yuv420p"
     }
     
+    # Draft/proxy render settings
+    PROXY_SETTINGS = {
+        "height": 480,
+        "preset": "ultrafast",
+        "crf": 28
+    }
+    
+    # Storyboard animatic settings
+    ANIMATIC_SETTINGS = {
+        "zoom": 1.15,          # Zoom factor reached by Ken Burns moves
+        "slates": True,        # Burn shot-number slates into each shot
+        "proxies": True,       # Read storyboards through cached proxy images instead of the full-size PNGs
+        "preset": "veryfast",
+        "crf": 26
+    }
+    
+    # Thumbnails, proxies and contact sheets of generated art
+    DERIVATIVE_SETTINGS = {
+        "output_dir": "review",                       # Under the project directory
+        "directories": ["concept_art", "characters", "storyboards"],
+        "kinds": {
+            "thumb": {"max_size": 320, "format": "WEBP", "quality": 75},
+            "proxy": {"max_size": 1280, "format": "JPEG", "quality": 85}
+        },
+        "sheet": {"columns": 6, "cell": 320, "label_height": 24, "format": "JPEG", "quality": 85},
+        "workers": os.cpu_count() or 1
+    }
+    
+    # Audio mix settings
+    MIX_SETTINGS = {
+        "sample_rate": 48000,
+        "channels": 2,
+        "block_seconds": 10,                                # Mix rendered and written in blocks of this length
+        "stem_cache_dir": os.path.join(".cache", "stems"),  # Decoded float32 stems
+        "layer_gain_db": {
+            "dialogue": 0.0,
+            "foley": -6.0,
+            "sfx": -3.0,
+            "ambience": -12.0,
+            "music": -8.0
+        },
+        "fade_in": 0.05,                                    # Seconds, unless the cue sets its own
+        "fade_out": 0.05,
+        "ducking": {
+            "amount_db": -12.0,                             # Music reduction under dialogue
+            "attack": 0.2,
+            "release": 0.5
+        }
+    }
+    
+    # FFmpeg job settings
+    FFMPEG_SETTINGS = {
+        "timeout": None,                                   # Seconds before a job is killed
+        "stderr_tail_lines": 40,                           # stderr lines kept for error reports
+        "metrics_log": os.getenv("FFMPEG_METRICS_LOG")     # JSON-lines file of per-job metrics
+    }
+    
+    # OpenAI-compatible API endpoint (point at a local mock for offline runs)
+    OPENAI_API_BASE = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
+    
     # AI model settings
     AI_MODELS = {
         "script": "gpt-4-turbo-preview",
@@ -22,6 +88,83 @@ class MovieConfig:
         "sound": "elevenlabs",   # Placeholder for when available
     }
     
+    # Cache settings
+    CACHE_SETTINGS = {
+        "image_cache_dir": os.getenv("MOVIE_CACHE_DIR", os.path.join(".cache", "images")),
+        "image_cache_max_bytes": 2 * 1024 ** 3  # 2 GB
+    }
+    
+    # LLM completion cache settings
+    LLM_CACHE_SETTINGS = {
+        "match": os.getenv("MOVIE_LLM_CACHE", "off"),     # "exact", "normalized" or "off" (opt in)
+        "mode": "read_write",                              # "read_write", "record" or "replay"
+        "path": os.path.join(".cache", "llm_cache.sqlite"),
+        "ttl": 7 * 24 * 3600,                              # Seconds before an entry expires
+        "max_entries": 20000
+    }
+    
+    # Context compaction for crew tasks with several upstream outputs
+    CONTEXT_SETTINGS = {
+        "compact": True,                                  # Summarize upstream outputs instead of passing them raw
+        "cache_dir": os.path.join(".cache", "context"),   # Cached summaries keyed by the text they summarize
+        "chars_per_token": 4,                             # For token estimates
+        "min_scenes": 40,                                 # Scene index and shot table lines kept while
+        "min_shots": 40,                                  # lower-priority sections are trimmed
+        "budgets": {                                      # Context tokens per task
+            "video_prompts": 3000,
+            "default": 4000
+        }
+    }
+    
+    # Concurrency settings
+    CONCURRENCY_SETTINGS = {
+        "asset_max_in_flight": 4,  # Parallel asset jobs after the crew finishes
+        "crew_mode": "dag",        # "dag" runs independent crew tasks together, "sequential" uses Crew.kickoff
+        "crew_max_workers": 4,
+        "stream_script": True,     # Stream the screenplay and start per-scene assets as scenes arrive ("dag" only)
+        "render_workers": os.cpu_count() or 1,  # Parallel ffmpeg encoders for full re-encodes
+        "render_segment_shots": 8,              # Shots per parallel render segment
+        "placeholder_batch_size": 8             # Placeholder shots (single-threaded encoders) per ffmpeg process
+    }
+    
+    # OpenAI rate limits per model, enforced by the shared request scheduler
+    RATE_LIMIT_SETTINGS = {
+        "models": {
+            "gpt-4-turbo-preview": {"rpm": 500, "tpm": 300000, "est_tokens": 2500},
+            "dall-e-3": {"rpm": 7}
+        },
+        "max_retries": 6,      # Retries for rate-limited or transient chat and image calls
+        "base_delay": 1.0,     # Seconds, doubled each retry unless Retry-After says otherwise
+        "max_delay": 60.0
+    }
+    
+    # Batch ("movie farm") settings
+    FARM_SETTINGS = {
+        "root": "farm",             # One project directory per batch entry
+        "jobs": 4,                  # Projects generated concurrently
+        "asset_max_in_flight": 8    # Asset jobs in flight across all projects
+    }
+    
+    # Generation daemon settings
+    DAEMON_SETTINGS = {
+        "host": "127.0.0.1",
+        "port": int(os.getenv("MOVIE_DAEMON_PORT", "8765")),
+        "workers": 2,                  # Jobs generated concurrently, each with its own warm crew
+        "queue_size": 32,              # Queued jobs beyond this are rejected with 503
+        "asset_max_in_flight": 8,      # Asset jobs in flight across all running jobs
+        "root": "daemon_projects",     # One project directory per job
+        "history": 1000,               # Finished jobs kept for status polling
+        "probe_timeout": 0.2           # Seconds main.py waits for a daemon before running locally
+    }
+    
+    # HTTP client settings
+    HTTP_SETTINGS = {
+        "pool_connections": 8,     # Number of hosts to keep pools for
+        "pool_maxsize": 32,        # Keep-alive connections per host
+        "timeout": 120,
+        "download_chunk_size": 1024 * 1024
+    }
+    
     # Style presets
     STYLE_PRESETS = {
         "cinematic": {
@@ -0,0 +1,205 @@
+# context_compaction.py
+import os
+import re
+import json
+import math
+import time
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+from config import MovieConfig
+from pipeline_manifest import hash_inputs
+from screenplay import parse_screenplay, build_shot_list
+from tracing import span
+
+# Bump when the summary format changes so cached summaries are rebuilt
+SUMMARY_VERSION = 1
+
+# Visual development lines worth keeping as style keys
+STYLE_WORDS = ("color", "colour", "palette", "light", "shadow", "mood", "tone", "texture", "lens", "grain",
+               "atmosphere", "contrast", "saturat", "style", "aesthetic", "composition", "weather", "time of day")
+
+def estimate_tokens(text: str) -> int:
+    """Approximate GPT token count; English prose averages about four characters per token"""
+    return math.ceil(len(text) / MovieConfig.CONTEXT_SETTINGS["chars_per_token"])
+
+def _words(text: str, max_words: int) -> str:
+    words = text.split()
+    return " ".join(words[:max_words]) + ("..." if len(words) > max_words else "")
+
+def _plain(line: str) -> str:
+    """Strips markdown bullets, headings and emphasis from a line"""
+    line = re.sub(r"^\s*(?:[#>]+|[-*+•]|\d+[.)])\s*", "", line)
+    return re.sub(r"[*_`]+", "", line).strip()
+
+def scene_index(script: str) -> List[str]:
+    """One line per scene: number, heading, speaking characters, estimated seconds and opening action"""
+    scenes = parse_screenplay(script)
+    if not scenes:
+        return [_words(" ".join(script.split()), 200)] if script.strip() else []
+    return [f"S{scene.number} | {scene.heading} | {', '.join(scene.characters) or '-'} | "
+            f"{scene.estimated_duration()}s | {_words(' '.join(scene.action), 25)}" for scene in scenes]
+
+def _json_shots(text: str) -> Optional[List[Dict]]:
+    """Returns the shot list embedded in a task output as JSON, if there is one"""
+    start, end = text.find("["), text.rfind("]")
+    if start == -1 or end <= start:
+        return None
+    try:
+        shots = json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+    if isinstance(shots, list) and shots and all(isinstance(shot, dict) and "shot_number" in shot for shot in shots):
+        return shots
+    return None
+
+def shot_table(cinematography: str, script: str) -> Tuple[List[str], List[str]]:
+    """
+    Returns the shot table rows and the cinematographer's notes. Shots come
+    from the JSON shot list in the cinematography output when it has one,
+    otherwise from the skeleton parsed from the script.
+    """
+    shots = _json_shots(cinematography)
+    notes = cinematography
+    if shots is None:
+        shots = build_shot_list(parse_screenplay(script))["shots"]
+    else:
+        notes = cinematography[:cinematography.find("[")] + cinematography[cinematography.rfind("]") + 1:]
+
+    rows = []
+    for shot in shots:
+        shot_type = shot.get("type", "")
+        abbr = shot.get("abbr") or MovieConfig.SHOT_TYPES.get(shot_type, {}).get("abbr", shot_type)
+        rows.append(f"{shot['shot_number']} | S{shot.get('scene_number', '-')} | {abbr} | "
+                    f"{shot.get('camera_movement', 'static')} | {shot.get('duration', '-')}s | "
+                    f"{_words(str(shot.get('description', '')), 20)}")
+    note_lines = [_plain(line) for line in notes.splitlines()]
+    return rows, [line for line in note_lines if line]
+
+def style_keys(visual_dev: str, max_keys: int = 12) -> List[str]:
+    """Deduplicated lines of the visual development package that describe look and mood"""
+    keys = []
+    for line in visual_dev.splitlines():
+        line = _plain(line)
+        if line and any(word in line.lower() for word in STYLE_WORDS):
+            line = _words(line, 25)
+            if line not in keys:
+                keys.append(line)
+        if len(keys) >= max_keys:
+            break
+    return keys
+
+def fit_sections(sections: List[Tuple[str, List[str], int]], budget: int) -> str:
+    """
+    Renders (title, lines, keep) sections, highest priority first, within a
+    token budget. Lines are dropped from the end of the lowest-priority
+    section first, down to its keep minimum, and a count of dropped lines
+    marks each trimmed section. If the minimums alone exceed the budget,
+    a second pass trims every section down to one line.
+    """
+    sections = [(title, list(lines), keep, 0) for title, lines, keep in sections]
+
+    def render():
+        parts = []
+        for title, lines, _, dropped in sections:
+            if lines or dropped:
+                more = [f"(+{dropped} more)"] if dropped else []
+                parts.append("\n".join([f"## {title}"] + lines + more))
+        return "\n\n".join(parts)
+
+    text = render()
+    for soft_minimum in (True, False):
+        for index in reversed(range(len(sections))):
+            title, lines, keep, dropped = sections[index]
+            minimum = keep if soft_minimum else min(keep, 1)
+            # Drop lines in proportion to the overshoot rather than one render per line
+            while estimate_tokens(text) > budget and len(lines) > minimum:
+                overshoot = estimate_tokens(text) - budget
+                per_line = max(1, estimate_tokens("\n".join(lines)) // max(1, len(lines)))
+                count = min(len(lines) - minimum, max(1, overshoot // per_line))
+                del lines[len(lines) - count:]
+                dropped += count
+                sections[index] = (title, lines, keep, dropped)
+                text = render()
+    if estimate_tokens(text) > budget:
+        text = text[:budget * MovieConfig.CONTEXT_SETTINGS["chars_per_token"]]
+    return text
+
+class ContextCompactor:
+    """
+    Turns the raw outputs of upstream crew tasks into compact structured
+    summaries (scene index, shot table, style keys and trimmed notes) that
+    fit a per-task token budget. Summaries are cached on disk keyed by the
+    text they summarize, so unchanged upstream outputs are not re-parsed.
+    Use builder(task) as a TaskGraph context builder.
+    """
+
+    def __init__(self, cache_dir: str = None, budgets: Dict[str, int] = None):
+        settings = MovieConfig.CONTEXT_SETTINGS
+        self.cache_dir = cache_dir or settings["cache_dir"]
+        self.budgets = budgets or settings["budgets"]
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, kind: str, build: Callable, *texts: str):
+        key = hash_inputs(SUMMARY_VERSION, kind, texts)
+        path = os.path.join(self.cache_dir, key[:2], f"{key}.json")
+        try:
+            with open(path, 'r') as f:
+                return json.load(f), True
+        except (OSError, ValueError):
+            pass
+        summary = build(*texts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(summary, f)
+        os.replace(tmp_path, path)
+        return summary, False
+
+    def compact(self, task_name: str, dep_outputs: Dict[str, str]) -> str:
+        """Builds the compacted context for task_name from its dependencies' outputs"""
+        budget = self.budgets.get(task_name, self.budgets["default"])
+        started = time.perf_counter()
+        with span(f"compact:{task_name}", "context") as trace:
+            script = dep_outputs.get("script", "")
+            hits = []
+            sections = []
+            if "script" in dep_outputs:
+                index, hit = self._cached("scene_index", scene_index, script)
+                hits.append(hit)
+                sections.append(("Scene index (scene | heading | characters | seconds | action)", index,
+                                 MovieConfig.CONTEXT_SETTINGS["min_scenes"]))
+            notes = []
+            if "cinematography" in dep_outputs:
+                (rows, notes), hit = self._cached("shot_table", shot_table, dep_outputs["cinematography"], script)
+                hits.append(hit)
+                sections.append(("Shot table (shot | scene | type | movement | seconds | description)", rows,
+                                 MovieConfig.CONTEXT_SETTINGS["min_shots"]))
+            if "visual_dev" in dep_outputs:
+                keys, hit = self._cached("style_keys", style_keys, dep_outputs["visual_dev"])
+                hits.append(hit)
+                sections.append(("Style keys", keys, 3))
+            if notes:
+                sections.append(("Cinematography notes", notes, 0))
+            # Outputs without a structured summary are passed through as trimmed notes
+            for name, output in dep_outputs.items():
+                if name not in ("script", "cinematography", "visual_dev"):
+                    sections.append((f"{name} notes", [_plain(line) for line in output.splitlines() if _plain(line)], 0))
+
+            context = fit_sections(sections, budget)
+            raw_tokens = estimate_tokens("\n\n".join(dep_outputs.values()))
+            stats = {
+                "raw_tokens": raw_tokens,
+                "tokens": estimate_tokens(context),
+                "budget": budget,
+                "cache_hits": sum(hits),
+                "seconds": round(time.perf_counter() - started, 4)
+            }
+            trace.update(stats)
+        with self._lock:
+            self.stats[task_name] = stats
+        return context
+
+    def builder(self, task_name: str) -> Callable[[Dict[str, str]], str]:
+        """Returns a TaskGraph context builder that compacts task_name's context"""
+        return lambda dep_outputs: self.compact(task_name, dep_outputs)
@@ -0,0 +1,248 @@
+# daemon.py
+import json
+import time
+import uuid
+import queue
+import threading
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Optional
+from config import MovieConfig
+
+# Spec fields accepted from clients; anything else in a job request is ignored
+JOB_FIELDS = ("prompt", "style", "duration", "output", "assemble", "force", "name")
+
+def daemon_url(host: str = None, port: int = None) -> str:
+    settings = MovieConfig.DAEMON_SETTINGS
+    return f"http://{host or settings['host']}:{port or settings['port']}"
+
+class MovieDaemon:
+    """
+    Long-running generation server. The LLM, OpenAI and HTTP clients, caches
+    and one crew per worker are built once at startup and reused, so a job
+    only pays for its own generation. Jobs are accepted over a local HTTP API
+    into a bounded queue and run by a fixed number of workers:
+
+        POST /jobs         submit {"prompt": ..., "style", "duration", "output", "assemble", "force"}
+        GET  /jobs         list jobs
+        GET  /jobs/<id>    job status, timings and artifact paths
+        GET  /health       queue depth, running jobs and uptime
+    """
+
+    def __init__(self, host: str = None, port: int = None, workers: int = None, queue_size: int = None,
+                 root: str = None, asset_max_in_flight: int = None):
+        settings = MovieConfig.DAEMON_SETTINGS
+        self.host = host or settings["host"]
+        self.port = port if port is not None else settings["port"]
+        self.workers = max(1, workers or settings["workers"])
+        self.root = root or settings["root"]
+        self.asset_max_in_flight = asset_max_in_flight or settings["asset_max_in_flight"]
+        self.history = settings["history"]
+
+        self.queue = queue.Queue(maxsize=queue_size or settings["queue_size"])
+        self.jobs = OrderedDict()
+        self.running = 0
+        self.started_at = None
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._threads = []
+        self._server = None
+        self._farm = None
+        self._asset_executor = None
+
+    def warm_up(self) -> list:
+        """Builds the shared clients and one crew per worker before accepting jobs"""
+        from movie_generator import get_llm, build_crew
+        from clients import get_openai_client, get_http_session
+        from movie_farm import MovieFarm
+
+        get_llm()
+        get_openai_client()
+        get_http_session()
+        self._farm = MovieFarm(root=self.root)
+        return [build_crew() for _ in range(self.workers)]
+
+    def start(self):
+        """Warms up, starts the workers and binds the HTTP server (serve with serve_forever)"""
+        crews = self.warm_up()
+        self._asset_executor = ThreadPoolExecutor(max_workers=max(1, self.asset_max_in_flight))
+        for crew in crews:
+            thread = threading.Thread(target=self._worker, args=(crew,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        handler = type("Handler", (_JobHandler,), {"daemon": self})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self.port = self._server.server_address[1]
+        self.started_at = time.time()
+        return self
+
+    def serve_forever(self):
+        print(f"Movie daemon listening on {daemon_url(self.host, self.port)} with {self.workers} workers")
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Stops accepting jobs, lets running jobs finish and shuts the workers down"""
+        if self._server is not None:
+            self._server.server_close()
+        for _ in self._threads:
+            self.queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        if self._asset_executor is not None:
+            self._asset_executor.shutdown()
+
+    def submit(self, spec: Dict) -> Dict:
+        """Queues a job; raises queue.Full when the queue is at capacity"""
+        if not spec.get("prompt"):
+            raise ValueError("a job needs a prompt")
+        spec = {key: spec[key] for key in JOB_FIELDS if key in spec}
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._sequence += 1
+            job = {
+                "id": job_id,
+                "index": self._sequence,
+                "status": "queued",
+                "spec": spec,
+                "submitted_at": time.time()
+            }
+            self.queue.put_nowait(job_id)
+            self.jobs[job_id] = job
+            self._trim_history()
+            return dict(job, queue_position=self.queue.qsize())
+
+    def _trim_history(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] not in ("queued", "running")]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self.jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def health(self) -> Dict:
+        with self._lock:
+            return {
+                "status": "ok",
+                "workers": self.workers,
+                "running": self.running,
+                "queued": self.queue.qsize(),
+                "queue_capacity": self.queue.maxsize,
+                "jobs": len(self.jobs),
+                "uptime": round(time.time() - self.started_at, 1) if self.started_at else 0.0
+            }
+
+    def _worker(self, crew: Dict):
+        while True:
+            job_id = self.queue.get()
+            if job_id is None:
+                return
+            with self._lock:
+                job = self.jobs[job_id]
+                job["status"] = "running"
+                job["started_at"] = time.time()
+                self.running += 1
+            spec = dict(job["spec"], name=job["spec"].get("name", job_id))
+            try:
+                result = self._farm.run_project(job["index"], spec, self._asset_executor, crew)
+            except Exception as e:
+                result = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+            with self._lock:
+                self.running -= 1
+                job.update({key: value for key, value in result.items()
+                            if key not in ("name", "prompt", "style", "duration", "output")})
+                job["finished_at"] = time.time()
+
+class _JobHandler(BaseHTTPRequestHandler):
+    daemon = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: Dict, headers: Dict = None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        path = self.path.rstrip("/")
+        if path == "/health":
+            self._send(200, self.daemon.health())
+        elif path == "/jobs":
+            with self.daemon._lock:
+                jobs = [{"id": job["id"], "status": job["status"], "prompt": job["spec"]["prompt"]}
+                        for job in self.daemon.jobs.values()]
+            self._send(200, {"jobs": jobs})
+        elif path.startswith("/jobs/"):
+            job = self.daemon.get(path[len("/jobs/"):])
+            if job is None:
+                self._send(404, {"error": "unknown job"})
+            else:
+                self._send(200, job)
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            self._send(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            spec = json.loads(self.rfile.read(length) or b"{}")
+            job = self.daemon.submit(spec)
+        except (ValueError, TypeError, AttributeError) as e:
+            self._send(400, {"error": str(e)})
+            return
+        except queue.Full:
+            self._send(503, {"error": "job queue is full"}, {"Retry-After": "5"})
+            return
+        self._send(202, job, {"Location": f"/jobs/{job['id']}"})
+
+# Client helpers used by main.py; they only need the standard library so the
+# thin client starts fast.
+
+def _request(method: str, path: str, body: Dict = None, timeout: float = 5.0) -> Dict:
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    request = urllib.request.Request(daemon_url() + path, data=data, method=method,
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        raise RuntimeError(json.loads(e.read() or b"{}").get("error", str(e))) from e
+
+def is_daemon_running() -> bool:
+    """Returns True when a daemon answers /health on the configured address"""
+    try:
+        return _request("GET", "/health", timeout=MovieConfig.DAEMON_SETTINGS["probe_timeout"]).get("status") == "ok"
+    except (OSError, ValueError, RuntimeError):
+        return False
+
+def submit_job(spec: Dict) -> Dict:
+    return _request("POST", "/jobs", spec)
+
+def get_job(job_id: str) -> Dict:
+    return _request("GET", f"/jobs/{job_id}")
+
+def wait_for_job(job_id: str, poll_interval: float = 1.0) -> Dict:
+    """Polls a job until it leaves the queued and running states"""
+    while True:
+        job = get_job(job_id)
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(poll_interval)
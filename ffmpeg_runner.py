@@ -0,0 +1,150 @@
+# ffmpeg_runner.py
+import os
+import json
+import time
+import threading
+import subprocess
+from collections import deque
+from typing import Callable, Dict, List, Optional
+from config import MovieConfig
+from tracing import tracer
+
+class FFmpegError(subprocess.CalledProcessError):
+    """Raised when an ffmpeg job fails, times out or is cancelled. Carries the tail of stderr."""
+
+    def __init__(self, returncode: int, cmd: List[str], stderr_tail: str, reason: str = "failed"):
+        super().__init__(returncode, cmd, stderr=stderr_tail)
+        self.reason = reason
+
+    def __str__(self):
+        return f"ffmpeg {self.reason} (exit code {self.returncode}):\n{self.stderr}"
+
+def _parse_seconds(value: str) -> Optional[float]:
+    """Parses an ffmpeg out_time value ("HH:MM:SS.micro") into seconds"""
+    try:
+        hours, minutes, seconds = value.split(":")
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except ValueError:
+        return None
+
+def _progress_event(fields: Dict[str, str], duration: Optional[float]) -> Dict:
+    """Builds a structured progress event from one block of -progress output"""
+    speed = fields.get("speed", "").rstrip("x").strip()
+    event = {
+        "frame": int(fields["frame"]) if fields.get("frame", "").isdigit() else None,
+        "fps": float(fields["fps"]) if fields.get("fps") not in (None, "", "N/A") else None,
+        "speed": float(speed) if speed not in ("", "N/A") else None,
+        "out_time": _parse_seconds(fields.get("out_time", "")),
+        "bitrate": fields.get("bitrate"),
+        "done": fields.get("progress") == "end"
+    }
+    if duration and event["out_time"] is not None:
+        event["percent"] = min(100.0, 100.0 * event["out_time"] / duration)
+        if event["speed"]:
+            event["eta"] = max(0.0, (duration - event["out_time"]) / event["speed"])
+    return event
+
+def _with_progress(cmd: List[str]) -> List[str]:
+    """Adds machine-readable progress output right after the ffmpeg executable"""
+    return [cmd[0], "-progress", "pipe:1", "-nostats"] + list(cmd[1:])
+
+def _log_metrics(metrics: Dict):
+    log_path = MovieConfig.FFMPEG_SETTINGS["metrics_log"]
+    if not log_path:
+        return
+    os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+    with open(log_path, 'a') as f:
+        f.write(json.dumps(metrics) + "\n")
+
+def run_ffmpeg(cmd: List[str], label: str = None, duration: float = None,
+               on_progress: Callable[[Dict], None] = None, on_metrics: Callable[[Dict], None] = None,
+               timeout: float = None, cancel_event: threading.Event = None) -> Dict:
+    """
+    Runs an ffmpeg command with structured progress reporting.
+    on_progress receives events with frame, fps, speed, out_time (seconds),
+    bitrate and, when the media duration is known, percent and eta.
+    The job is killed when timeout seconds pass or cancel_event is set.
+    Returns the job metrics (wall time, CPU time, realtime factor), which are
+    also passed to on_metrics and appended to the configured JSON log.
+    Raises FFmpegError with the stderr tail on failure.
+    """
+    settings = MovieConfig.FFMPEG_SETTINGS
+    if timeout is None:
+        timeout = settings["timeout"]
+    label = label or os.path.basename(cmd[-1])
+
+    start = time.perf_counter()
+    process = subprocess.Popen(_with_progress(cmd), stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               text=True, errors="replace")
+
+    # Keep only the tail of stderr so long renders do not accumulate output
+    stderr_tail = deque(maxlen=settings["stderr_tail_lines"])
+    stderr_thread = threading.Thread(target=lambda: stderr_tail.extend(process.stderr), daemon=True)
+    stderr_thread.start()
+
+    # Kill the process on timeout or cancellation
+    stop_reason = []
+    finished = threading.Event()
+
+    def watchdog():
+        while not finished.wait(0.1):
+            if cancel_event is not None and cancel_event.is_set():
+                stop_reason.append("cancelled")
+            elif timeout is not None and time.perf_counter() - start > timeout:
+                stop_reason.append("timed out")
+            else:
+                continue
+            process.kill()
+            return
+
+    watchdog_thread = threading.Thread(target=watchdog, daemon=True)
+    watchdog_thread.start()
+
+    last_event = {}
+    fields = {}
+    for line in process.stdout:
+        key, _, value = line.strip().partition("=")
+        if not key:
+            continue
+        fields[key] = value.strip()
+        if key == "progress":
+            last_event = _progress_event(fields, duration)
+            if on_progress is not None:
+                on_progress(last_event)
+            fields = {}
+
+    # Reap the process with its resource usage so CPU time is exact per job
+    cpu_time = None
+    try:
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+        cpu_time = usage.ru_utime + usage.ru_stime
+    except (AttributeError, ChildProcessError):
+        # No wait4 on this platform, or the process was already reaped by kill()
+        process.wait()
+    finished.set()
+    stderr_thread.join()
+    process.stdout.close()
+    process.stderr.close()
+    wall_time = time.perf_counter() - start
+
+    media_time = last_event.get("out_time") or duration
+    metrics = {
+        "label": label,
+        "returncode": process.returncode,
+        "wall_time": round(wall_time, 3),
+        "cpu_time": round(cpu_time, 3) if cpu_time is not None else None,
+        "media_time": media_time,
+        "realtime_factor": round(media_time / wall_time, 3) if media_time and wall_time > 0 else None,
+        "frames": last_event.get("frame"),
+        "status": stop_reason[0] if stop_reason else ("ok" if process.returncode == 0 else "failed")
+    }
+    if on_metrics is not None:
+        on_metrics(metrics)
+    _log_metrics(metrics)
+    tracer.add_span(f"ffmpeg:{label}", "render", start, start + wall_time, dict(metrics))
+
+    if stop_reason or process.returncode != 0:
+        raise FFmpegError(process.returncode, cmd, "".join(stderr_tail),
+                          stop_reason[0] if stop_reason else "failed")
+    return metrics
@@ -0,0 +1,215 @@
+# image_derivatives.py
+import os
+import html
+from typing import Dict, Iterable, List
+from concurrent.futures import ProcessPoolExecutor
+from config import MovieConfig
+from pipeline_manifest import StageManifest, hash_inputs, hash_file
+from tracing import span
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+EXTENSIONS = {"WEBP": ".webp", "JPEG": ".jpg", "PNG": ".png"}
+
+def render_derivatives(source: str, jobs: List[tuple]) -> List[str]:
+    """
+    Writes copies of source scaled to fit each (target, max_size,
+    image_format, quality) job. Runs in a worker process. The source is
+    decoded once, JPEGs straight at reduced size, and each derivative is
+    scaled down from the next larger one.
+    """
+    from PIL import Image
+
+    jobs = sorted(jobs, key=lambda job: job[1], reverse=True)
+    largest = jobs[0][1]
+    with Image.open(source) as image:
+        image.draft("RGB", (largest, largest))
+        image.thumbnail((largest, largest), Image.LANCZOS, reducing_gap=3.0)
+        image = image.convert("RGB")
+    for target, max_size, image_format, quality in jobs:
+        image.thumbnail((max_size, max_size), Image.LANCZOS)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp_path = f"{target}.{os.getpid()}.tmp"
+        options = {"method": 4} if image_format == "WEBP" else {"optimize": True}
+        image.save(tmp_path, image_format, quality=quality, **options)
+        os.replace(tmp_path, target)
+    return [job[0] for job in jobs]
+
+class ImageDerivatives:
+    """
+    Cached derivatives of a project's generated art, so that review pages
+    and animatics never decode the full-size PNGs: a small WebP "thumb" and
+    a JPEG "proxy" per image (MovieConfig.DERIVATIVE_SETTINGS), plus
+    per-directory contact sheets and a review page. Derivatives are named
+    by the source image's content hash, and a manifest of each source's
+    size and modification time means only new or changed images are
+    hashed and rebuilt. Images are processed in a pool of worker processes.
+    """
+
+    def __init__(self, project_dir: str = None, workers: int = None):
+        settings = MovieConfig.DERIVATIVE_SETTINGS
+        self.project_dir = os.path.abspath(project_dir or os.getcwd())
+        self.output_dir = os.path.join(self.project_dir, settings["output_dir"])
+        self.workers = max(1, workers or settings["workers"])
+        self.manifest = StageManifest(os.path.join(self.project_dir, "production", "derivatives.json"))
+        self.built = 0
+        self.reused = 0
+
+    def collect(self, directories: Iterable[str] = None) -> List[str]:
+        """Lists the project's source images in the given directories (default: all art directories)"""
+        paths = []
+        for directory in directories or MovieConfig.DERIVATIVE_SETTINGS["directories"]:
+            directory = os.path.join(self.project_dir, directory)
+            if os.path.isdir(directory):
+                paths.extend(os.path.join(directory, name) for name in sorted(os.listdir(directory))
+                             if name.lower().endswith(IMAGE_EXTENSIONS))
+        return paths
+
+    def _target(self, kind: str, content_hash: str) -> str:
+        spec = MovieConfig.DERIVATIVE_SETTINGS["kinds"][kind]
+        return os.path.join(self.output_dir, kind, f"{content_hash}{EXTENSIONS[spec['format']]}")
+
+    def build(self, paths: Iterable[str], kinds: Iterable[str] = ("thumb", "proxy")) -> Dict[str, Dict[str, str]]:
+        """
+        Makes sure every image in paths has the requested derivatives and
+        returns {source path: {kind: derivative path}}. Images that cannot
+        be read are reported and left out.
+        """
+        specs = MovieConfig.DERIVATIVE_SETTINGS["kinds"]
+        kinds = tuple(kinds)
+        results = {}
+        pending = {}
+        records = {}
+        for path in paths:
+            path = os.path.abspath(path)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            stage = f"derivatives:{os.path.relpath(path, self.project_dir)}:{','.join(kinds)}"
+            signature = hash_inputs(stat.st_size, stat.st_mtime_ns, [specs[kind] for kind in kinds])
+            if self.manifest.is_fresh(stage, signature):
+                results[path] = self.manifest.outputs(stage)
+                self.reused += 1
+                continue
+
+            content_hash = hash_file(path)
+            targets = {kind: self._target(kind, content_hash) for kind in kinds}
+            jobs = [(target, specs[kind]["max_size"], specs[kind]["format"], specs[kind]["quality"])
+                    for kind, target in targets.items() if not os.path.exists(target)]
+            if jobs:
+                pending[path] = jobs
+            results[path] = targets
+            records[path] = (stage, signature, targets)
+
+        failed = set()
+        if pending:
+            # One job per source, so each image is decoded once for all its derivatives
+            with span("image_derivatives", "image", images=len(pending)):
+                if len(pending) == 1 or self.workers == 1:
+                    outcomes = {path: self._run(path, jobs) for path, jobs in pending.items()}
+                else:
+                    with ProcessPoolExecutor(max_workers=min(self.workers, len(pending))) as executor:
+                        futures = {path: executor.submit(render_derivatives, path, jobs) for path, jobs in pending.items()}
+                        outcomes = {path: self._result(future, path) for path, future in futures.items()}
+            failed = {path for path, ok in outcomes.items() if not ok}
+            self.built += sum(len(pending[path]) for path, ok in outcomes.items() if ok)
+
+        self.manifest.record_many({stage: (signature, targets) for path, (stage, signature, targets)
+                                   in records.items() if path not in failed})
+        return {path: targets for path, targets in results.items() if path not in failed}
+
+    @staticmethod
+    def _run(source: str, jobs: List[tuple]) -> bool:
+        try:
+            render_derivatives(source, jobs)
+            return True
+        except Exception as e:
+            print(f"Error creating derivative of {source}: {e}")
+            return False
+
+    @staticmethod
+    def _result(future, source: str) -> bool:
+        try:
+            future.result()
+            return True
+        except Exception as e:
+            print(f"Error creating derivative of {source}: {e}")
+            return False
+
+    def proxies(self, paths: Iterable[str]) -> Dict[str, str]:
+        """Returns {source path: proxy path} for the given images, building missing proxies"""
+        paths = list(paths)
+        built = self.build(paths, ("proxy",))
+        return {path: built[os.path.abspath(path)]["proxy"] for path in paths if os.path.abspath(path) in built}
+
+    def contact_sheet(self, directory: str, thumbs: Dict[str, Dict[str, str]] = None) -> str:
+        """
+        Lays out the thumbnails of one art directory as a labelled grid and
+        returns the sheet's path, or "" if the directory has no images. The
+        sheet is only rebuilt when its images change.
+        """
+        from PIL import Image, ImageDraw
+
+        settings = MovieConfig.DERIVATIVE_SETTINGS["sheet"]
+        if thumbs is None:
+            thumbs = self.build(self.collect([directory]), ("thumb",))
+        entries = [(os.path.basename(path), thumbs[path]["thumb"]) for path in self.collect([directory])
+                   if path in thumbs]
+        if not entries:
+            return ""
+
+        sheet_path = os.path.join(self.output_dir, f"contact_{directory}{EXTENSIONS[settings['format']]}")
+        stage = f"contact_sheet:{directory}"
+        input_hash = hash_inputs(entries, settings)
+        if self.manifest.is_fresh(stage, input_hash):
+            return sheet_path
+
+        cell = settings["cell"]
+        label = settings["label_height"]
+        columns = min(settings["columns"], len(entries))
+        rows = -(-len(entries) // columns)
+        sheet = Image.new("RGB", (columns * cell, rows * (cell + label)), (24, 24, 24))
+        draw = ImageDraw.Draw(sheet)
+        with span(f"contact_sheet:{directory}", "image", images=len(entries)):
+            for index, (name, thumb) in enumerate(entries):
+                x, y = (index % columns) * cell, (index // columns) * (cell + label)
+                with Image.open(thumb) as image:
+                    image.thumbnail((cell, cell))
+                    sheet.paste(image.convert("RGB"), (x + (cell - image.width) // 2, y + (cell - image.height) // 2))
+                draw.text((x + 6, y + cell + 4), name[:cell // 7], fill=(220, 220, 220))
+            os.makedirs(self.output_dir, exist_ok=True)
+            tmp_path = f"{sheet_path}.tmp"
+            sheet.save(tmp_path, settings["format"], quality=settings["quality"])
+            os.replace(tmp_path, sheet_path)
+        self.manifest.record(stage, input_hash, sheet_path)
+        return sheet_path
+
+    def build_review(self) -> str:
+        """
+        Builds thumbnails, proxies and contact sheets for every art
+        directory and writes a review page linking each thumbnail to its
+        proxy. Returns the page's path.
+        """
+        derivatives = self.build(self.collect())
+        sections = []
+        for directory in MovieConfig.DERIVATIVE_SETTINGS["directories"]:
+            images = [path for path in self.collect([directory]) if path in derivatives]
+            if not images:
+                continue
+            sheet = self.contact_sheet(directory, derivatives)
+            figures = "\n".join(
+                f'<a href="{html.escape(os.path.relpath(derivatives[path]["proxy"], self.output_dir))}">'
+                f'<figure><img src="{html.escape(os.path.relpath(derivatives[path]["thumb"], self.output_dir))}" '
+                f'loading="lazy"><figcaption>{html.escape(os.path.basename(path))}</figcaption></figure></a>'
+                for path in images)
+            sections.append(f'<h2>{html.escape(directory)}</h2>\n'
+                            f'<p><a href="{html.escape(os.path.basename(sheet))}">Contact sheet</a></p>\n{figures}')
+
+        page_path = os.path.join(self.output_dir, "index.html")
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(page_path, 'w') as f:
+            f.write("<!doctype html>\n<meta charset=\"utf-8\">\n<title>Art review</title>\n"
+                    "<style>figure{display:inline-block;margin:6px;font:12px sans-serif}</style>\n"
+                    + "\n".join(sections) + "\n")
+        print(f"Review page: {page_path} ({self.built} derivatives built, {self.reused} images unchanged)")
+        return page_path
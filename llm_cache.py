@@ -0,0 +1,123 @@
+# llm_cache.py
+import os
+import time
+import json
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from typing import Optional, Sequence
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from config import MovieConfig
+
+class ReplayMissError(RuntimeError):
+    """Raised in replay mode when a completion was not recorded"""
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapses whitespace and unicode variants so trivially different prompts share an entry"""
+    prompt = unicodedata.normalize("NFKC", prompt)
+    return " ".join(prompt.split())
+
+class CompletionCache(BaseCache):
+    """
+    Persistent LLM completion cache for LangChain models, stored in SQLite.
+    Entries are keyed on the serialized model parameters (model name,
+    temperature, stop words, ...) and the prompt messages, either exactly
+    or after normalize_prompt. Entries expire after ttl seconds and the
+    least recently used ones are evicted beyond max_entries.
+
+    mode is "read_write" (serve hits, store misses), "record" (store every
+    completion without serving hits) or "replay" (serve only recorded
+    completions and raise ReplayMissError on a miss).
+    """
+
+    def __init__(self, path: str, match: str = "exact", ttl: Optional[float] = None,
+                 max_entries: Optional[int] = None, mode: str = "read_write"):
+        if match not in ("exact", "normalized"):
+            raise ValueError(f"Unknown cache match mode: {match}")
+        if mode not in ("read_write", "record", "replay"):
+            raise ValueError(f"Unknown cache mode: {mode}")
+        self.path = path
+        self.match = match
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            "key TEXT PRIMARY KEY, llm_string TEXT, prompt TEXT, value TEXT, created REAL, accessed REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS completions_accessed ON completions (accessed)")
+        self._conn.commit()
+
+    def _key(self, prompt: str, llm_string: str) -> str:
+        if self.match == "normalized":
+            prompt = normalize_prompt(prompt)
+        payload = json.dumps([llm_string, prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence]:
+        key = self._key(prompt, llm_string)
+        if self.mode == "record":
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and self.mode != "replay" and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is not None:
+                self._conn.execute("UPDATE completions SET accessed = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+
+        if row is None:
+            self.misses += 1
+            if self.mode == "replay":
+                raise ReplayMissError(f"No recorded completion for this prompt in {self.path}")
+            return None
+        self.hits += 1
+        # Cached completions change what a run produces, so make every hit visible
+        print(f"LLM completion served from cache ({self.path}, {self.match} match)")
+        return loads(row[0])
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence):
+        if self.mode == "replay":
+            return
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, llm_string, prompt, value, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, llm_string, prompt, dumps(list(return_val)), now, now)
+            )
+            if self.max_entries is not None:
+                # Drop the least recently used entries beyond the size bound
+                self._conn.execute(
+                    "DELETE FROM completions WHERE key IN (SELECT key FROM completions "
+                    "ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+            self._conn.commit()
+
+    def clear(self, **kwargs):
+        with self._lock:
+            self._conn.execute("DELETE FROM completions")
+            self._conn.commit()
+
+def build_llm_cache() -> Optional[CompletionCache]:
+    """Builds the completion cache described by MovieConfig.LLM_CACHE_SETTINGS, or None when disabled"""
+    settings = MovieConfig.LLM_CACHE_SETTINGS
+    if settings["match"] == "off":
+        return None
+    return CompletionCache(settings["path"], match=settings["match"], ttl=settings["ttl"],
+                           max_entries=settings["max_entries"], mode=settings["mode"])
@@ -1,14 +1,51 @@
 # main.py
 import os
-from movie_generator import create_movie_from_prompt
+import sys
+import json
 from config import MovieConfig
 from video_assembler import VideoAssembler
 import argparse
+from pipeline_manifest import StageManifest
+from tracing import tracer
+
+def export_trace(trace_path: str):
+    """Writes the Chrome trace and prints its summary when tracing was requested"""
+    if trace_path:
+        tracer.export_chrome(trace_path)
+        print("\n=== Trace Summary ===")
+        print(tracer.format_summary())
+        print(f"Trace written to {trace_path}")
+
+def submit_to_daemon(args):
+    """Submits the generation to the running daemon and, unless detached, waits for it"""
+    from daemon import submit_job, wait_for_job
+    job = submit_job({
+        "prompt": args.prompt,
+        "style": args.style,
+        "duration": args.duration,
+        "output": args.output,
+        "assemble": args.assemble,
+        "force": args.force
+    })
+    print(f"Submitted job {job['id']} to the movie daemon (queue position {job['queue_position']})")
+    if args.detach:
+        return
+    
+    job = wait_for_job(job["id"])
+    print(f"Job {job['id']}: {job['status']} in {job.get('wall_time', 0):.1f}s")
+    if job.get("error"):
+        print(f"Error: {job['error']}")
+    for name, error in job.get("asset_errors", {}).items():
+        print(f"Error generating {name}: {error}")
+    for group, paths in job.get("artifacts", {}).items():
+        print(f"- {group}:")
+        for path in paths:
+            print(f"    {path}")
 
 def main():
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='Generate a movie from a story prompt')
-    parser.add_argument('prompt', type=str, help='Story prompt for the movie')
+    parser.add_argument('prompt', type=str, nargs='?', help='Story prompt for the movie')
     parser.add_argument('--style', type=str, default='cinematic', 
                        choices=['cinematic', 'documentary', 'noir'],
                        help='Visual style preset')
@@ -16,9 +53,118 @@ def main():
                        help='Target duration in seconds (default: 180)')
     parser.add_argument('--output', type=str, default='my_movie.mp4',
                        help='Output filename')
+    parser.add_argument('--max-in-flight', type=int, default=None,
+                       help='Maximum concurrent asset generation jobs')
+    parser.add_argument('--crew-mode', type=str, default=None,
+                       choices=['dag', 'sequential'],
+                       help='Run crew tasks as a dependency graph or strictly in sequence')
+    parser.add_argument('--no-stream', action='store_true',
+                       help='Wait for the full screenplay before starting per-scene assets')
+    parser.add_argument('--assemble', action='store_true',
+                       help='Render shots from the shot list and assemble the final video')
+    parser.add_argument('--draft', action='store_true',
+                       help='With --assemble, render a fast low-resolution draft from proxies')
+    parser.add_argument('--conform', type=str, metavar='EDL',
+                       help='Render a saved draft EDL at full resolution and exit')
+    parser.add_argument('--animatic', action='store_true',
+                       help='Render a storyboard animatic from the shot list (without a prompt, only the animatic)')
+    parser.add_argument('--review', action='store_true',
+                       help='Build thumbnails, proxies, contact sheets and a review page of the generated art (without a prompt, only the review)')
+    parser.add_argument('--mix', action='store_true',
+                       help='Mix the sound design cue list to output/audio/mix.wav (and onto the assembled video)')
+    parser.add_argument('--batch', type=str, metavar='FILE',
+                       help='Generate one film per line of FILE (JSON specs or prompts, "-" for stdin)')
+    parser.add_argument('--jobs', type=int, default=None,
+                       help='With --batch, number of films generated concurrently')
+    parser.add_argument('--report', type=str, metavar='FILE',
+                       help='With --batch, write a per-project status and timing report (default: <farm dir>/farm_report.json)')
+    parser.add_argument('--farm-dir', type=str, default=None,
+                       help='With --batch, directory holding one project directory per film')
+    parser.add_argument('--serve', action='store_true',
+                       help='Run the generation daemon with warm agents and clients')
+    parser.add_argument('--no-daemon', action='store_true',
+                       help='Generate in this process even when a daemon is running')
+    parser.add_argument('--detach', action='store_true',
+                       help='When submitting to a daemon, print the job id and exit without waiting')
+    parser.add_argument('--llm-cache', type=str, default=None,
+                       choices=['exact', 'normalized', 'off'],
+                       help='Serve repeated LLM prompts from a local completion cache (default: off)')
+    parser.add_argument('--record', type=str, metavar='FILE',
+                       help='Record every LLM completion of this run to FILE')
+    parser.add_argument('--replay', type=str, metavar='FILE',
+                       help='Serve all LLM completions from a run recorded with --record')
+    parser.add_argument('--trace', type=str, metavar='FILE',
+                       help='Write a Chrome trace-event JSON of the run and print a timing summary')
+    parser.add_argument('--force', action='store_true',
+                       help='Ignore the stage manifest and regenerate everything')
+    parser.add_argument('--sequential-assets', action='store_true',
+                       help='Generate assets one at a time')
     
     args = parser.parse_args()
     
+    if args.serve:
+        from daemon import MovieDaemon
+        MovieDaemon().start().serve_forever()
+        return
+    
+    # Plain generations go to a running daemon, which already has warm agents and clients
+    local_only = (args.no_daemon or args.batch or args.conform or args.trace or args.record or args.replay
+                  or args.llm_cache or args.draft or args.mix or args.animatic or args.review or args.sequential_assets
+                  or args.max_in_flight or args.crew_mode or args.no_stream)
+    if args.prompt and not local_only:
+        from daemon import is_daemon_running
+        if is_daemon_running():
+            submit_to_daemon(args)
+            return
+    
+    if args.trace:
+        tracer.enable()
+    
+    # LLM cache settings must be in place before the generator builds its LLM
+    if args.llm_cache:
+        MovieConfig.LLM_CACHE_SETTINGS["match"] = args.llm_cache
+    if args.record or args.replay:
+        MovieConfig.LLM_CACHE_SETTINGS.update({
+            "path": args.record or args.replay,
+            "mode": "record" if args.record else "replay",
+            "match": "exact" if MovieConfig.LLM_CACHE_SETTINGS["match"] == "off" else MovieConfig.LLM_CACHE_SETTINGS["match"],
+            "ttl": None,
+            "max_entries": None
+        })
+    
+    if args.conform:
+        assembler = VideoAssembler("output")
+        assembler.conform(assembler.load_edl(args.conform), args.output)
+        return
+    
+    if args.batch:
+        from movie_farm import MovieFarm, read_batch
+        farm = MovieFarm(root=args.farm_dir, jobs=args.jobs, asset_max_in_flight=args.max_in_flight,
+                         crew_mode=args.crew_mode, resume=not args.force, assemble=args.assemble)
+        report_path = args.report or os.path.join(farm.root, "farm_report.json")
+        stream = sys.stdin if args.batch == "-" else open(args.batch, 'r')
+        try:
+            farm.run(read_batch(stream), report_path)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        print(f"\n=== Farm Summary ===\n{json.dumps(farm.summary(), indent=2)}")
+        print(f"Report written to {report_path}")
+        export_trace(args.trace)
+        return
+    
+    # Without a prompt, re-render the animatic and review pages from the existing assets
+    if (args.animatic or args.review) and not args.prompt:
+        if args.review:
+            from image_derivatives import ImageDerivatives
+            ImageDerivatives().build_review()
+        if args.animatic:
+            VideoAssembler("output").render_animatic("production/shot_list.json", f"animatic_{args.output}")
+        return
+    
+    if not args.prompt:
+        parser.error("a story prompt is required")
+    
     # Setup directories
     MovieConfig.setup_directories()
     
@@ -27,12 +173,60 @@ def main():
     print(f"Style: {args.style}")
     print(f"Target duration: {args.duration} seconds")
     
+    # Import the generator only once a generation actually runs, so --help
+    # and argument errors do not pay for crewai and langchain imports
+    from movie_generator import create_movie_from_prompt
+    
     # Create the movie
-    result = create_movie_from_prompt(args.prompt)
+    result = create_movie_from_prompt(args.prompt,
+                                      concurrent=not args.sequential_assets,
+                                      max_in_flight=args.max_in_flight,
+                                      crew_mode=args.crew_mode,
+                                      stream_script=False if args.no_stream else None,
+                                      resume=not args.force,
+                                      style=args.style,
+                                      duration=args.duration)
+    
+    # Assemble video from placeholder shots until video generation is available.
+    # Only shots whose shot list entry changed are re-rendered.
+    if args.assemble:
+        manifest = None if args.force else StageManifest()
+        assembler = VideoAssembler("output")
+        assembler.render_shots("production/shot_list.json", manifest)
+        if args.draft:
+            # Save the timeline so the final master can be conformed from the same EDL
+            edl = assembler.create_edit_decision_list("production/shot_list.json")
+            edl_file = os.path.join("production", "edl.json")
+            assembler.save_edl(edl, edl_file)
+            assembler.render_draft(edl, f"draft_{args.output}")
+            print(f"Conform the final master with: python main.py --conform {edl_file}")
+        else:
+            assembler.assemble_video("production/shot_list.json", args.output, manifest)
+    
+    # Stems are referenced from each cue's "file" entry in the sound design
+    if args.mix:
+        from audio_mixer import AudioMixer
+        mix_path = os.path.join("output", "audio", "mix.wav")
+        stats = AudioMixer().mix_sound_design(os.path.join("sound", "sound_design.json"), mix_path)
+        print(f"Mixed {stats['cues']} cues ({stats['skipped']} without stems) to {mix_path} "
+              f"at {stats['realtime_factor']}x realtime")
+        video_path = os.path.join("output", "output", args.output)
+        if not stats["cues"] or not stats["duration"]:
+            # Muxing an empty mix with -shortest would cut the film to nothing
+            print(f"Skipping the audio mux: the mix is empty ({stats['cues']} cues with stems, {stats['duration']}s)")
+        elif args.assemble and os.path.exists(video_path):
+            VideoAssembler("output").add_audio_track(video_path, mix_path,
+                                                     os.path.join("output", "output", f"mixed_{args.output}"))
+    
+    if args.review:
+        from image_derivatives import ImageDerivatives
+        ImageDerivatives().build_review()
+    
+    # Storyboards are referenced from each shot's "storyboard" entry in the shot list
+    if args.animatic:
+        VideoAssembler("output").render_animatic("production/shot_list.json", f"animatic_{args.output}")
     
-    # Assemble video (when actual video generation is available)
-    # assembler = VideoAssembler("output")
-    # assembler.assemble_video("output/production/shot_list.json", args.output)
+    export_trace(args.trace)
     
     print(f"\nMovie generation complete!")
     print(f"Check the output directories for generated content:")
@@ -0,0 +1,185 @@
+# movie_farm.py
+import os
+import re
+import json
+import time
+import threading
+import traceback
+from typing import Dict, Iterable, Iterator, List, TextIO
+from concurrent.futures import ThreadPoolExecutor
+from config import MovieConfig
+from pipeline_manifest import StageManifest
+from tracing import span
+
+def read_batch(stream: TextIO) -> Iterator[Dict]:
+    """
+    Yields project specs from a batch file or stream. Each line is either a
+    JSON object with "prompt" and optional "style", "duration", "output",
+    "name", "assemble" and "force", or a plain story prompt. Blank lines and # comments are skipped.
+    """
+    for line in stream:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            spec = json.loads(line)
+            if not spec.get("prompt"):
+                raise ValueError(f"Batch entry has no prompt: {line}")
+            yield spec
+        else:
+            yield {"prompt": line}
+
+def project_name(index: int, spec: Dict) -> str:
+    """Returns a unique, filesystem-safe directory name for a batch entry"""
+    name = spec.get("name") or "_".join(spec["prompt"].split()[:5])
+    name = re.sub(r'[^a-zA-Z0-9_-]', '', name.replace(" ", "_")).lower() or "project"
+    return f"{index:04d}_{name}"
+
+def collect_artifacts(project_dir: str) -> Dict[str, List[str]]:
+    """Lists a project's generated files grouped by top-level directory, skipping caches and manifests"""
+    artifacts = {}
+    for directory, subdirs, files in os.walk(project_dir):
+        subdirs[:] = sorted(d for d in subdirs if not d.startswith(".") and d != "stages")
+        relative = os.path.relpath(directory, project_dir)
+        if relative == ".":
+            continue
+        group = relative.split(os.sep)[0]
+        for file in sorted(files):
+            if file.startswith(".") or file in ("manifest.json", "derivatives.json", "proxy_map.json"):
+                continue
+            artifacts.setdefault(group, []).append(os.path.join(directory, file))
+    return artifacts
+
+class MovieFarm:
+    """
+    Generates many films in one process. Projects run concurrently, each in
+    its own directory under root with its own crew and manifest, while the
+    LLM, HTTP clients, image and LLM caches and the OpenAI request scheduler
+    are shared. Asset jobs from all projects share one bounded pool.
+    """
+
+    def __init__(self, root: str = None, jobs: int = None, asset_max_in_flight: int = None,
+                 crew_mode: str = None, resume: bool = True, assemble: bool = False):
+        settings = MovieConfig.FARM_SETTINGS
+        self.root = root or settings["root"]
+        self.jobs = max(1, jobs or settings["jobs"])
+        self.asset_max_in_flight = max(1, asset_max_in_flight or settings["asset_max_in_flight"])
+        self.crew_mode = crew_mode
+        self.resume = resume
+        self.assemble = assemble
+        self.results = []
+        self.wall_time = None
+        self._lock = threading.Lock()
+
+    def run_project(self, index: int, spec: Dict, asset_executor: ThreadPoolExecutor, crew: Dict = None) -> Dict:
+        """
+        Generates (and optionally assembles) one project and returns its status
+        record. crew may be a crew from build_crew() that is not in use by any
+        other project; by default a new one is built.
+        """
+        from movie_generator import build_crew, create_movie_from_prompt
+
+        name = project_name(index, spec)
+        resume = self.resume and not spec.get("force", False)
+        project_dir = os.path.abspath(os.path.join(self.root, name))
+        status = {
+            "name": name,
+            "prompt": spec["prompt"],
+            "style": spec.get("style", "cinematic"),
+            "duration": spec.get("duration"),
+            "output": spec.get("output", "my_movie.mp4"),
+            "project_dir": project_dir,
+            "status": "running",
+            "error": None,
+            "asset_errors": {},
+            "timings": {},
+            "started_at": time.time()
+        }
+        started = time.perf_counter()
+
+        def record_assets(asset_results):
+            status["asset_errors"] = {job: outcome["error"] for job, outcome in asset_results.items()
+                                      if outcome["error"]}
+
+        try:
+            with span(f"project:{name}", "project"):
+                create_movie_from_prompt(
+                    spec["prompt"],
+                    crew_mode=self.crew_mode,
+                    resume=resume,
+                    project_dir=project_dir,
+                    style=status["style"],
+                    duration=status["duration"],
+                    crew=crew if crew is not None else build_crew(project_dir=project_dir),
+                    executor=asset_executor,
+                    on_asset_results=record_assets
+                )
+                status["timings"]["generate"] = round(time.perf_counter() - started, 3)
+
+                if spec.get("assemble", self.assemble):
+                    from video_assembler import VideoAssembler
+                    assembly_started = time.perf_counter()
+                    manifest = StageManifest(os.path.join(project_dir, "production", "manifest.json")) \
+                        if resume else None
+                    shot_list_path = os.path.join(project_dir, "production", "shot_list.json")
+                    assembler = VideoAssembler(os.path.join(project_dir, "output"))
+                    assembler.render_shots(shot_list_path, manifest)
+                    assembler.assemble_video(shot_list_path, status["output"], manifest)
+                    status["timings"]["assembly"] = round(time.perf_counter() - assembly_started, 3)
+            status["status"] = "failed_assets" if status["asset_errors"] else "ok"
+            status["artifacts"] = collect_artifacts(project_dir)
+        except Exception as e:
+            status["status"] = "failed"
+            status["error"] = f"{type(e).__name__}: {e}"
+            status["traceback"] = traceback.format_exc()
+        status["wall_time"] = round(time.perf_counter() - started, 3)
+        return status
+
+    def run(self, specs: Iterable[Dict], report_path: str = None) -> List[Dict]:
+        """
+        Runs every spec, at most jobs projects at a time. specs may be a lazy
+        stream; projects start as entries arrive and are reported as soon as
+        they finish, while later entries are still being read. With
+        report_path, the status report is rewritten as each project finishes.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        started = time.perf_counter()
+
+        def finished(future):
+            status = future.result()
+            with self._lock:
+                self.results.append(status)
+                self.wall_time = time.perf_counter() - started
+                if report_path:
+                    self.write_report(report_path)
+                print(f"[farm] {status['name']}: {status['status']} in {status['wall_time']:.1f}s")
+
+        with ThreadPoolExecutor(max_workers=self.asset_max_in_flight) as asset_executor, \
+                ThreadPoolExecutor(max_workers=self.jobs) as project_executor:
+            for index, spec in enumerate(specs):
+                project_executor.submit(self.run_project, index, spec, asset_executor).add_done_callback(finished)
+
+        self.results.sort(key=lambda status: status["name"])
+        self.wall_time = time.perf_counter() - started
+        if report_path:
+            self.write_report(report_path)
+        return self.results
+
+    def summary(self) -> Dict:
+        """Counts projects by status and reports overall throughput"""
+        counts = {}
+        for status in self.results:
+            counts[status["status"]] = counts.get(status["status"], 0) + 1
+        summary = {"projects": len(self.results), "status": counts}
+        if self.wall_time:
+            summary["wall_time"] = round(self.wall_time, 3)
+            summary["films_per_minute"] = round(60.0 * len(self.results) / self.wall_time, 3)
+        return summary
+
+    def write_report(self, report_path: str):
+        """Writes the per-project status and timing report atomically"""
+        os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+        tmp_path = f"{report_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"summary": self.summary(), "projects": self.results}, f, indent=2)
+        os.replace(tmp_path, report_path)
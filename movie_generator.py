@@ -1,78 +1,118 @@
 # movie_generator.py
-from crewai import Agent, Task, Crew, Process
-from langchain_openai import ChatOpenAI
-from crewai_tools.tools import FileReadTool
 import os
-import requests
 import re
-import subprocess
 import json
-from typing import List, Dict
-from openai import OpenAI
-import base64
-from pathlib import Path
 import time
+import threading
+from typing import List, Dict, Callable, Tuple
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from config import MovieConfig
+from asset_cache import ImageCache
+from clients import get_openai_client, download_file
+from task_graph import TaskGraph
+from pipeline_manifest import StageManifest, hash_inputs
+from tracing import span, make_langchain_handler
+from rate_limiter import (get_scheduler, make_scheduled_chat_model, request_priority,
+                          PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW)
+from screenplay import Scene, SceneStreamParser, parse_screenplay, build_shot_list
+from context_compaction import ContextCompactor
+from video_prompts import write_video_prompts
 
-# Configure LLM
-llm = ChatOpenAI(
-    openai_api_base="https://api.openai.com/v1",
-    openai_api_key=os.getenv("OPENAI_API_KEY"),
-    model_name="gpt-4-turbo-preview"
-)
+# crewai, langchain and the agents are heavy to import and build, so they are
+# created on first use by the factories below rather than at import time.
+_lock = threading.RLock()
+_llm = None
+_default_crew = None
+
+def get_llm():
+    """Returns the shared chat LLM used by all agents, creating it on first use"""
+    global _llm
+    if _llm is None:
+        with _lock:
+            if _llm is None:
+                from llm_cache import build_llm_cache
+                cache = build_llm_cache()
+                # Calls are paced and retried (honouring Retry-After) by the shared scheduler
+                _llm = make_scheduled_chat_model(
+                    openai_api_base=MovieConfig.OPENAI_API_BASE,
+                    openai_api_key=os.getenv("OPENAI_API_KEY"),
+                    model_name=MovieConfig.AI_MODELS["script"],
+                    callbacks=[make_langchain_handler()],
+                    # Without a cache instance, False keeps any global LangChain cache out of the way
+                    cache=cache if cache is not None else False
+                )
+    return _llm
 
-# File reading tool for templates
-file_read_tool = FileReadTool(
-    file_path='movie_template.md',
-    description='A tool to read the movie script template file and understand the expected output format.'
+# Persistent cache of generated images, keyed on the full DALL-E request
+image_cache = ImageCache(
+    MovieConfig.CACHE_SETTINGS["image_cache_dir"],
+    MovieConfig.CACHE_SETTINGS["image_cache_max_bytes"]
 )
 
+def _generate_image(prompt: str, size: str, quality: str, filepath: str, priority: int = PRIORITY_NORMAL) -> str:
+    """
+    Generates an image with DALL-E 3 and saves it to filepath.
+    Identical requests are served from the image cache without calling the API;
+    others are queued on the shared request scheduler at the given priority.
+    """
+    model = MovieConfig.AI_MODELS["visual"]
+    cache_key = image_cache.make_key(model, prompt, size, quality)
+    
+    # Create directory if it doesn't exist
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    
+    with span("image.cache_lookup", "image", size=size) as trace:
+        trace["hit"] = image_cache.fetch(cache_key, filepath)
+    if trace["hit"]:
+        return filepath
+    
+    client = get_openai_client()
+    with span("image.generate", "image", model=model, size=size, quality=quality):
+        response = get_scheduler().call(
+            lambda: client.images.generate(
+                model=model,
+                prompt=prompt,
+                size=size,
+                quality=quality,
+                n=1,
+            ),
+            model,
+            priority=priority
+        )
+    
+    image_url = response.data[0].url
+    
+    # Stream the image straight to disk
+    download_file(image_url, filepath)
+    image_cache.put(cache_key, filepath)
+    return filepath
+
 # Define tools as functions that will be called by agents
-def generate_concept_art(scene_description: str, style: str = "cinematic") -> str:
+def generate_concept_art(scene_description: str, style: str = "cinematic", project_dir: str = None) -> str:
     """
     Generates concept art for a scene using DALL-E 3.
-    Returns the path to the saved image.
+    Returns the path to the saved image under project_dir (default: the working directory).
     """
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    
     prompt = f"Cinematic concept art: {scene_description}. Style: {style}, photorealistic, dramatic lighting, wide aspect ratio, professional film production quality. No text or watermarks."
     
     try:
-        response = client.images.generate(
-            model="dall-e-3",
-            prompt=prompt,
-            size="1792x1024",
-            quality="hd",
-            n=1,
-        )
-        
-        image_url = response.data[0].url
-        
         # Create filename from scene description
         words = scene_description.split()[:5]
         safe_words = [re.sub(r'[^a-zA-Z0-9_]', '', word) for word in words]
         filename = "_".join(safe_words).lower() + "_concept.png"
-        filepath = os.path.join(os.getcwd(), "concept_art", filename)
-        
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        filepath = os.path.join(project_dir or os.getcwd(), "concept_art", filename)
         
-        # Download the image
-        img_response = requests.get(image_url)
-        if img_response.status_code == 200:
-            with open(filepath, 'wb') as file:
-                file.write(img_response.content)
-            return filepath
+        return _generate_image(prompt, "1792x1024", "hd", filepath)
     except Exception as e:
         print(f"Error generating concept art: {e}")
     return ""
 
-def generate_storyboard(shot_description: str, shot_type: str = "medium_shot") -> str:
+def generate_storyboard(shot_description: str, shot_type: str = "medium_shot", project_dir: str = None) -> str:
     """
     Generates storyboard panels for specific shots using DALL-E 3.
     Shot types: extreme_wide, wide, medium, close_up, extreme_close_up
     """
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    
     shot_styles = {
         "extreme_wide": "extreme wide shot, establishing shot",
         "wide": "wide shot, full body visible",
@@ -84,77 +124,40 @@ def generate_storyboard(shot_description: str, shot_type: str = "medium_shot") -
     prompt = f"Storyboard panel, {shot_styles.get(shot_type, 'medium shot')}: {shot_description}. Black and white sketch style, professional storyboard art, clear composition, cinematic framing."
     
     try:
-        response = client.images.generate(
-            model="dall-e-3",
-            prompt=prompt,
-            size="1024x1024",
-            quality="standard",
-            n=1,
-        )
-        
-        image_url = response.data[0].url
-        
         # Create filename
         words = shot_description.split()[:3]
         safe_words = [re.sub(r'[^a-zA-Z0-9_]', '', word) for word in words]
         filename = f"{shot_type}_" + "_".join(safe_words).lower() + ".png"
-        filepath = os.path.join(os.getcwd(), "storyboards", filename)
-        
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        filepath = os.path.join(project_dir or os.getcwd(), "storyboards", filename)
         
-        img_response = requests.get(image_url)
-        if img_response.status_code == 200:
-            with open(filepath, 'wb') as file:
-                file.write(img_response.content)
-            return filepath
+        return _generate_image(prompt, "1024x1024", "standard", filepath, priority=PRIORITY_LOW)
     except Exception as e:
         print(f"Error generating storyboard: {e}")
     return ""
 
-def generate_character_design(character_description: str) -> str:
+def generate_character_design(character_description: str, project_dir: str = None) -> str:
     """
     Generates character design sheets using DALL-E 3.
     """
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    
     prompt = f"Character design sheet showing multiple angles (front, side, three-quarter view) of: {character_description}. Professional concept art style, consistent character across all views, detailed costume design, neutral background."
     
     try:
-        response = client.images.generate(
-            model="dall-e-3",
-            prompt=prompt,
-            size="1792x1024",
-            quality="hd",
-            n=1,
-        )
-        
-        image_url = response.data[0].url
-        
         # Create filename from character description
         words = character_description.split()[:3]
         safe_words = [re.sub(r'[^a-zA-Z0-9_]', '', word) for word in words]
         filename = "_".join(safe_words).lower() + "_character.png"
-        filepath = os.path.join(os.getcwd(), "characters", filename)
-        
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        filepath = os.path.join(project_dir or os.getcwd(), "characters", filename)
         
-        img_response = requests.get(image_url)
-        if img_response.status_code == 200:
-            with open(filepath, 'wb') as file:
-                file.write(img_response.content)
-            return filepath
+        return _generate_image(prompt, "1792x1024", "hd", filepath)
     except Exception as e:
         print(f"Error generating character design: {e}")
     return ""
 
-def create_shot_list(script_content: str) -> str:
-    """
-    Creates a detailed shot list from the script.
-    Returns a JSON string with shot information.
-    """
-    # This would normally use an AI model to analyze the script
-    # For now, we'll create a simple example structure
-    shot_list = {
+def _script_shot_list(script_content: str) -> Dict:
+    """Breaks a screenplay down into a shot list locally"""
+    # The sample list is only used when the text has no scene headings to parse
+    scenes = parse_screenplay(script_content)
+    return build_shot_list(scenes) if scenes else {
         "project_name": "AI Movie",
         "shots": [
             {
@@ -180,16 +183,52 @@ def create_shot_list(script_content: str) -> str:
             }
         ]
     }
-    
-    shot_list_path = os.path.join(os.getcwd(), "production", "shot_list.json")
+
+def create_shot_list(script_content: str, project_dir: str = None) -> str:
+    """
+    Creates a detailed shot list from the script.
+    Returns a JSON string with shot information.
+    """
+    shot_list = _script_shot_list(script_content)
+    shot_list_path = os.path.join(project_dir or os.getcwd(), "production", "shot_list.json")
     os.makedirs(os.path.dirname(shot_list_path), exist_ok=True)
     
-    with open(shot_list_path, 'w') as f:
+    with span("write:shot_list", "file_write"), open(shot_list_path, 'w') as f:
         json.dump(shot_list, f, indent=2)
     
     return json.dumps(shot_list)
 
-def generate_sound_description(scene_description: str) -> str:
+def attach_storyboards(asset_results: Dict[str, Dict], project_dir: str = None) -> int:
+    """
+    Records the storyboard made for each streamed scene (the
+    scene_NNN_storyboard asset jobs) as the "storyboard" of that scene's
+    shots in production/shot_list.json, relative to the project directory,
+    so animatics show it. Returns the number of shots updated.
+    """
+    base_dir = project_dir or os.getcwd()
+    storyboards = {}
+    for name, outcome in asset_results.items():
+        match = re.fullmatch(r"scene_(\d+)_storyboard", name)
+        if match and outcome["result"]:
+            storyboards[int(match.group(1))] = os.path.relpath(outcome["result"], base_dir)
+    shot_list_path = os.path.join(base_dir, "production", "shot_list.json")
+    if not storyboards or not os.path.exists(shot_list_path):
+        return 0
+    
+    with open(shot_list_path, 'r') as f:
+        shot_list = json.load(f)
+    updated = 0
+    for shot in shot_list.get("shots", []):
+        storyboard = storyboards.get(shot.get("scene_number"))
+        if storyboard and shot.get("storyboard") != storyboard:
+            shot["storyboard"] = storyboard
+            updated += 1
+    if updated:
+        with span("write:shot_list", "file_write"), open(shot_list_path, 'w') as f:
+            json.dump(shot_list, f, indent=2)
+    return updated
+
+def generate_sound_description(scene_description: str, project_dir: str = None) -> str:
     """
     Creates a detailed sound design document for the scene.
     """
@@ -223,17 +262,19 @@ def generate_sound_description(scene_description: str) -> str:
         ]
     }
     
-    sound_path = os.path.join(os.getcwd(), "sound", "sound_design.json")
+    sound_path = os.path.join(project_dir or os.getcwd(), "sound", "sound_design.json")
     os.makedirs(os.path.dirname(sound_path), exist_ok=True)
     
-    with open(sound_path, 'w') as f:
+    with span("write:sound_design", "file_write"), open(sound_path, 'w') as f:
         json.dump(sound_design, f, indent=2)
     
     return json.dumps(sound_design)
 
-def create_video_prompt(scene_description: str, shot_type: str, duration: int) -> str:
+def create_video_prompt(scene_description: str, shot_type: str, duration: int, project_dir: str = None,
+                        prompt_id: str = None) -> str:
     """
     Creates a detailed prompt for video generation tools like Runway Gen-4.
+    The prompt is saved as video_prompts/prompt_<prompt_id or shot_type>.json.
     """
     video_prompt = {
         "scene": scene_description,
@@ -253,158 +294,534 @@ def create_video_prompt(scene_description: str, shot_type: str, duration: int) -
         "prompt_text": f"Cinematic video: {scene_description}. Shot type: {shot_type}. Professional cinematography, dramatic lighting, smooth camera movement, photorealistic quality."
     }
     
-    prompt_path = os.path.join(os.getcwd(), "video_prompts", f"prompt_{shot_type}.json")
+    prompt_path = os.path.join(project_dir or os.getcwd(), "video_prompts", f"prompt_{prompt_id or shot_type}.json")
     os.makedirs(os.path.dirname(prompt_path), exist_ok=True)
     
-    with open(prompt_path, 'w') as f:
+    with span("write:video_prompt", "file_write"), open(prompt_path, 'w') as f:
         json.dump(video_prompt, f, indent=2)
     
     return json.dumps(video_prompt)
 
-# Define AI Agents
-script_writer = Agent(
-    role='Screenplay Writer',
-    goal='Transform story concepts into professional screenplay format with compelling dialogue and visual storytelling',
-    backstory="An experienced screenwriter who understands three-act structure, character arcs, and visual narrative techniques. Skilled at creating engaging dialogue and dynamic scenes.",
-    verbose=True,
-    llm=llm,
-    allow_delegation=False
-)
+def create_video_prompts(script_content: str, style: str = "cinematic", project_dir: str = None) -> str:
+    """
+    Creates a video prompt for every shot of the script's shot list in the
+    given STYLE_PRESETS style, streamed into video_prompts/prompts.jsonl with
+    an offset index for VideoPromptReader. Returns the JSONL path.
+    """
+    prompts_path = os.path.join(project_dir or os.getcwd(), "video_prompts", "prompts.jsonl")
+    write_video_prompts(_script_shot_list(script_content)["shots"], prompts_path, style)
+    return prompts_path
 
-visual_developer = Agent(
-    role='Visual Development Artist',
-    goal='Create comprehensive visual development including concept art, mood boards, and color scripts',
-    backstory="A talented visual development artist with experience in film pre-production. Expert at translating scripts into visual language and establishing aesthetic direction.",
-    verbose=True,
-    llm=llm,
-    allow_delegation=False
-)
+def _crew_paths(project_dir: str = None) -> Tuple[str, str]:
+    """Returns the movie template the video director reads and the guide it writes for a project"""
+    base_dir = project_dir or os.getcwd()
+    template = os.path.join(base_dir, "movie_template.md")
+    if not os.path.exists(template):
+        # Projects without their own template use the one shipped with the generator
+        template = os.path.join(os.path.dirname(os.path.abspath(__file__)), "movie_template.md")
+    return template, os.path.join(base_dir, "video_generation_guide.md")
 
-character_designer = Agent(
-    role='Character Designer',
-    goal='Design compelling virtual actors with detailed appearance, personality, and movement characteristics',
-    backstory="A character designer specializing in creating memorable virtual actors. Understands how visual design reflects personality and supports storytelling.",
-    verbose=True,
-    llm=llm,
-    allow_delegation=False
-)
+def build_crew(llm=None, project_dir: str = None) -> Dict:
+    """
+    Builds the six agents, their tasks and the crew.
+    Returns {"agents": ..., "tasks": ..., "crew": ...} with tasks keyed by stage name.
+    The video generation guide is written under project_dir (default: the
+    working directory); create_movie_from_prompt retargets reused crews.
+    """
+    from crewai import Agent, Task, Crew, Process
+    from crewai_tools.tools import FileReadTool
+    
+    if llm is None:
+        llm = get_llm()
+    template_path, guide_path = _crew_paths(project_dir)
+    
+    # File reading tool for templates
+    file_read_tool = FileReadTool(
+        file_path=template_path,
+        description='A tool to read the movie script template file and understand the expected output format.'
+    )
+    
+    # Define AI Agents
+    script_writer = Agent(
+        role='Screenplay Writer',
+        goal='Transform story concepts into professional screenplay format with compelling dialogue and visual storytelling',
+        backstory="An experienced screenwriter who understands three-act structure, character arcs, and visual narrative techniques. Skilled at creating engaging dialogue and dynamic scenes.",
+        verbose=True,
+        llm=llm,
+        allow_delegation=False
+    )
+    
+    visual_developer = Agent(
+        role='Visual Development Artist',
+        goal='Create comprehensive visual development including concept art, mood boards, and color scripts',
+        backstory="A talented visual development artist with experience in film pre-production. Expert at translating scripts into visual language and establishing aesthetic direction.",
+        verbose=True,
+        llm=llm,
+        allow_delegation=False
+    )
+    
+    character_designer = Agent(
+        role='Character Designer',
+        goal='Design compelling virtual actors with detailed appearance, personality, and movement characteristics',
+        backstory="A character designer specializing in creating memorable virtual actors. Understands how visual design reflects personality and supports storytelling.",
+        verbose=True,
+        llm=llm,
+        allow_delegation=False
+    )
+    
+    cinematographer = Agent(
+        role='Virtual Cinematographer',
+        goal='Plan shot compositions, camera movements, and visual flow of the film',
+        backstory="An experienced cinematographer who thinks in frames and sequences. Expert at using camera language to enhance emotional storytelling.",
+        verbose=True,
+        llm=llm,
+        allow_delegation=False
+    )
+    
+    sound_designer = Agent(
+        role='Sound Designer',
+        goal='Design comprehensive soundscapes including dialogue, foley, ambience, and music direction',
+        backstory="An award-winning sound designer who understands how audio shapes emotional experience. Creates rich, layered soundscapes that support visual narrative.",
+        verbose=True,
+        llm=llm,
+        allow_delegation=False
+    )
+    
+    video_director = Agent(
+        role='AI Video Generation Director',
+        goal='Create detailed prompts and specifications for AI video generation tools',
+        backstory="A director specializing in AI video generation, understanding how to translate creative vision into technical prompts that produce compelling footage.",
+        verbose=True,
+        llm=llm,
+        tools=[file_read_tool],
+        allow_delegation=False
+    )
+    
+    # Create Tasks
+    task_script = Task(
+        description='Write a compelling short film screenplay based on the story prompt. Include proper screenplay format with scene headings, action lines, and dialogue. Target length: 3-5 pages for a 3-5 minute film.',
+        agent=script_writer,
+        expected_output='A properly formatted screenplay with engaging dialogue, clear action, and visual storytelling'
+    )
+    
+    task_visual_dev = Task(
+        description='Create comprehensive visual development including concept art for key scenes, mood boards, and establishing the visual style of the film. Generate at least 3 concept art images.',
+        agent=visual_developer,
+        expected_output='A visual development package with concept art for major scenes and established visual style'
+    )
+    
+    task_characters = Task(
+        description='Design all characters mentioned in the screenplay, creating detailed visual references and character sheets. Generate character design sheets.',
+        agent=character_designer,
+        expected_output='Complete character designs for all roles with multiple angles and expression sheets'
+    )
+    
+    task_cinematography = Task(
+        description='Create a detailed shot list breaking down the screenplay into specific shots with camera angles, movements, and compositions. When a shot list skeleton parsed from the screenplay is provided, refine it rather than starting over: keep its shot numbers and durations, and add framing, lens and composition notes to each shot',
+        agent=cinematographer,
+        expected_output='A comprehensive shot list with camera specifications for each scene'
+    )
+    
+    task_sound = Task(
+        description='Design the complete sound landscape including dialogue notes, foley requirements, ambience, and music direction',
+        agent=sound_designer,
+        expected_output='A detailed sound design document with cue sheets and audio requirements'
+    )
+    
+    task_video_prompts = Task(
+        description='Create detailed prompts for AI video generation tools, incorporating all visual development, cinematography, and directorial vision',
+        agent=video_director,
+        expected_output='Complete set of video generation prompts ready for production',
+        context=[task_script, task_visual_dev, task_cinematography],
+        output_file=guide_path
+    )
+    
+    # Create Crew
+    movie_crew = Crew(
+        agents=[script_writer, visual_developer, character_designer, cinematographer, sound_designer, video_director],
+        tasks=[task_script, task_visual_dev, task_characters, task_cinematography, task_sound, task_video_prompts],
+        verbose=True,
+        process=Process.sequential
+    )
+    
+    # Named crew tasks for dependency-graph execution
+    tasks = {
+        "script": task_script,
+        "visual_dev": task_visual_dev,
+        "characters": task_characters,
+        "cinematography": task_cinematography,
+        "sound": task_sound,
+        "video_prompts": task_video_prompts
+    }
+    
+    agents = {
+        "script_writer": script_writer,
+        "visual_developer": visual_developer,
+        "character_designer": character_designer,
+        "cinematographer": cinematographer,
+        "sound_designer": sound_designer,
+        "video_director": video_director
+    }
+    return {"agents": agents, "tasks": tasks, "crew": movie_crew}
 
-cinematographer = Agent(
-    role='Virtual Cinematographer',
-    goal='Plan shot compositions, camera movements, and visual flow of the film',
-    backstory="An experienced cinematographer who thinks in frames and sequences. Expert at using camera language to enhance emotional storytelling.",
-    verbose=True,
-    llm=llm,
-    allow_delegation=False
-)
+def get_crew() -> Dict:
+    """Returns the default crew, building it on first use"""
+    global _default_crew
+    if _default_crew is None:
+        with _lock:
+            if _default_crew is None:
+                _default_crew = build_crew()
+    return _default_crew
 
-sound_designer = Agent(
-    role='Sound Designer',
-    goal='Design comprehensive soundscapes including dialogue, foley, ambience, and music direction',
-    backstory="An award-winning sound designer who understands how audio shapes emotional experience. Creates rich, layered soundscapes that support visual narrative.",
-    verbose=True,
-    llm=llm,
-    allow_delegation=False
-)
+def __getattr__(name: str):
+    # Keep the old module-level names (llm, movie_crew, task_script, ...) working
+    if name == "llm":
+        return get_llm()
+    if name == "movie_crew":
+        return get_crew()["crew"]
+    if name.startswith("task_") and name[len("task_"):] in ("script", "visual_dev", "characters",
+                                                           "cinematography", "sound", "video_prompts"):
+        return get_crew()["tasks"][name[len("task_"):]]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-video_director = Agent(
-    role='AI Video Generation Director',
-    goal='Create detailed prompts and specifications for AI video generation tools',
-    backstory="A director specializing in AI video generation, understanding how to translate creative vision into technical prompts that produce compelling footage.",
-    verbose=True,
-    llm=llm,
-    tools=[file_read_tool],
-    allow_delegation=False
-)
+def _cinematography_context(dep_outputs: Dict[str, str]) -> str:
+    """Gives the cinematographer the screenplay plus the locally parsed shot skeleton to refine"""
+    script = dep_outputs["script"]
+    scenes = parse_screenplay(script)
+    if not scenes:
+        return script
+    skeleton = json.dumps(build_shot_list(scenes)["shots"], indent=1)
+    return f"{script}\n\nShot list skeleton (parsed from the screenplay):\n{skeleton}"
 
-# Create Tasks
-task_script = Task(
-    description='Write a compelling short film screenplay based on the story prompt. Include proper screenplay format with scene headings, action lines, and dialogue. Target length: 3-5 pages for a 3-5 minute film.',
-    agent=script_writer,
-    expected_output='A properly formatted screenplay with engaging dialogue, clear action, and visual storytelling'
-)
+def run_crew(crew_mode: str = None, manifest: StageManifest = None, crew: Dict = None, project_dir: str = None,
+             precomputed: Dict[str, str] = None, on_outputs: Callable[[Dict[str, str]], None] = None):
+    """
+    Runs the crew tasks. In "dag" mode independent tasks run concurrently
+    and the critical path is reported; "sequential" uses Crew.kickoff.
+    With a manifest, tasks whose inputs are unchanged are not re-run.
+    precomputed maps task names to outputs produced elsewhere ("dag" only),
+    and on_outputs receives every task's output.
+    """
+    if crew is None:
+        crew = get_crew()
+    crew_tasks = crew["tasks"]
+    stage_dir = os.path.join(project_dir or os.getcwd(), "production", "stages")
+    
+    if crew_mode is None:
+        crew_mode = MovieConfig.CONCURRENCY_SETTINGS["crew_mode"]
+    
+    if crew_mode == "sequential":
+        # The sequential crew is recorded as a single stage, with each task's output stored beside it
+        input_hash = hash_inputs([(task.description, task.expected_output) for task in crew_tasks.values()])
+        graph = TaskGraph(crew_tasks, root="script")
+        if manifest is not None and manifest.is_fresh("crew", input_hash):
+            stored = {name: graph.load_stage(manifest, name, input_hash) for name in crew_tasks}
+            if None not in stored.values():
+                print("Skipping crew: inputs unchanged")
+                if on_outputs is not None:
+                    on_outputs(stored)
+                with open(manifest.outputs("crew"), 'r') as f:
+                    return f.read()
+            print("Re-running crew: stored task outputs are missing")
+        with span("crew:kickoff", "crew_task"):
+            result = crew["crew"].kickoff()
+        outputs = {name: getattr(task.output, "raw", None) or "" for name, task in crew_tasks.items()}
+        if manifest is not None:
+            for name, output in outputs.items():
+                graph.save_stage(manifest, stage_dir, name, input_hash, output)
+            crew_output_path = os.path.join(stage_dir, "crew.md")
+            with open(crew_output_path, 'w') as f:
+                f.write(str(result))
+            manifest.record("crew", input_hash, crew_output_path)
+        if on_outputs is not None:
+            on_outputs(outputs)
+        return result
+    
+    context_builders = {"cinematography": _cinematography_context}
+    compactor = None
+    if MovieConfig.CONTEXT_SETTINGS["compact"]:
+        # The video director gets summaries of the script, visual development and shot list
+        compactor = ContextCompactor()
+        context_builders["video_prompts"] = compactor.builder("video_prompts")
+    graph = TaskGraph(crew_tasks, root="script", context_builders=context_builders)
+    outputs = graph.run(max_workers=MovieConfig.CONCURRENCY_SETTINGS["crew_max_workers"], precomputed=precomputed,
+                        manifest=manifest, stage_dir=stage_dir)
+    
+    report = graph.report()
+    print("\n=== Crew Timing ===")
+    for name, seconds in report["tasks"].items():
+        print(f"{name}: {seconds:.1f}s")
+    print(f"Wall time: {report['wall_time']:.1f}s")
+    print(f"Critical path: {' -> '.join(report['critical_path'])} ({report['critical_path_time']:.1f}s)")
+    if compactor is not None:
+        for name, stats in compactor.stats.items():
+            print(f"Context for {name}: {stats['raw_tokens']} -> {stats['tokens']} tokens "
+                  f"(budget {stats['budget']}, {stats['cache_hits']} cached summaries)")
+    
+    if on_outputs is not None:
+        on_outputs(outputs)
+    return outputs["video_prompts"]
 
-task_visual_dev = Task(
-    description='Create comprehensive visual development including concept art for key scenes, mood boards, and establishing the visual style of the film. Generate at least 3 concept art images.',
-    agent=visual_developer,
-    expected_output='A visual development package with concept art for major scenes and established visual style'
-)
+def _traced_job(name: str, func: Callable, args: tuple):
+    with span(f"asset:{name}", "asset"):
+        return func(*args)
 
-task_characters = Task(
-    description='Design all characters mentioned in the screenplay, creating detailed visual references and character sheets. Generate character design sheets.',
-    agent=character_designer,
-    expected_output='Complete character designs for all roles with multiple angles and expression sheets'
-)
+def _submit_asset_job(executor: ThreadPoolExecutor, name: str, job: Tuple, manifest: StageManifest = None) -> Tuple:
+    """
+    Submits one asset job unless the manifest has it up to date. Returns
+    (input_hash, future), or (input_hash, result) for a skipped job.
+    """
+    func, args = job[0], job[1]
+    input_hash = hash_inputs(func.__name__, args)
+    if manifest is not None and manifest.is_fresh(f"asset:{name}", input_hash):
+        return input_hash, {"result": manifest.outputs(f"asset:{name}"), "error": None, "skipped": True}
+    return input_hash, executor.submit(_traced_job, name, func, args)
 
-task_cinematography = Task(
-    description='Create a detailed shot list breaking down the screenplay into specific shots with camera angles, movements, and compositions',
-    agent=cinematographer,
-    expected_output='A comprehensive shot list with camera specifications for each scene'
-)
+def _collect_asset_job(name: str, job: Tuple, input_hash: str, submitted, manifest: StageManifest = None) -> Dict:
+    """Waits for a job from _submit_asset_job and records its output in the manifest"""
+    if isinstance(submitted, dict):
+        return submitted
+    try:
+        result = submitted.result()
+    except Exception as e:
+        return {"result": None, "error": str(e)}
+    
+    # Image helpers report failure by returning an empty path
+    error = None if result != "" else "no output produced"
+    if manifest is not None and error is None:
+        output_path = job[2] if len(job) > 2 else result
+        manifest.record(f"asset:{name}", input_hash, output_path)
+    return {"result": result, "error": error}
 
-task_sound = Task(
-    description='Design the complete sound landscape including dialogue notes, foley requirements, ambience, and music direction',
-    agent=sound_designer,
-    expected_output='A detailed sound design document with cue sheets and audio requirements'
-)
+def run_asset_jobs(jobs: Dict[str, Tuple], max_in_flight: int = None,
+                   manifest: StageManifest = None, executor: ThreadPoolExecutor = None) -> Dict[str, Dict]:
+    """
+    Runs independent asset jobs concurrently on a bounded thread pool.
+    jobs maps a job name to (function, args) or (function, args, output_path)
+    for helpers that do not return the path they write. Returns a dict of job
+    name to {"result": ..., "error": ...} so one failed job does not abort the
+    others. With a manifest, jobs whose arguments are unchanged are skipped.
+    Passing a shared executor bounds the jobs of several projects together.
+    """
+    if max_in_flight is None:
+        max_in_flight = MovieConfig.CONCURRENCY_SETTINGS["asset_max_in_flight"]
+    
+    with (nullcontext(executor) if executor is not None
+          else ThreadPoolExecutor(max_workers=max(1, max_in_flight))) as executor:
+        submitted = {name: _submit_asset_job(executor, name, job, manifest) for name, job in jobs.items()}
+        return {name: _collect_asset_job(name, jobs[name], input_hash, future, manifest)
+                for name, (input_hash, future) in submitted.items()}
 
-task_video_prompts = Task(
-    description='Create detailed prompts for AI video generation tools, incorporating all visual development, cinematography, and directorial vision',
-    agent=video_director,
-    expected_output='Complete set of video generation prompts ready for production',
-    context=[task_script, task_visual_dev, task_cinematography],
-    output_file="video_generation_guide.md"
-)
+def scene_asset_jobs(event: str, scene: Scene, style: str = "cinematic", project_dir: str = None,
+                     new_location: bool = True) -> Dict[str, Tuple]:
+    """
+    Returns the asset jobs for a streamed scene event: a storyboard (and
+    concept art for the first scene at a location) once the scene has
+    started, and a video prompt once it is complete.
+    """
+    base_dir = project_dir or os.getcwd()
+    prefix = f"scene_{scene.number:03d}"
+    shot_type = "wide" if scene.exterior else "medium"
+    if event == "scene_started":
+        # The scene number leads the description so each scene gets its own storyboard file
+        jobs = {f"{prefix}_storyboard": (generate_storyboard, (f"Scene {scene.number}: {scene.summary(30)}",
+                                                               shot_type, project_dir))}
+        if new_location:
+            description = f"{scene.location.title()}, {(scene.time or '').lower()}. {scene.summary(40)}"
+            jobs[f"{prefix}_concept_art"] = (generate_concept_art, (description, style, project_dir))
+        return jobs
+    return {
+        f"{prefix}_video_prompt": (create_video_prompt, (scene.summary(), shot_type, scene.estimated_duration(),
+                                                         project_dir, prefix),
+                                   os.path.join(base_dir, "video_prompts", f"prompt_{prefix}.json"))
+    }
 
-# Create Crew
-movie_crew = Crew(
-    agents=[script_writer, visual_developer, character_designer, cinematographer, sound_designer, video_director],
-    tasks=[task_script, task_visual_dev, task_characters, task_cinematography, task_sound, task_video_prompts],
-    verbose=True,
-    process=Process.sequential
-)
+def stream_screenplay(crew: Dict, on_event: Callable[[str, Scene], None] = None,
+                      manifest: StageManifest = None, project_dir: str = None) -> str:
+    """
+    Writes the screenplay with a streaming call to the script writer's LLM,
+    parsing it as it arrives and calling on_event(event, scene) for each
+    SceneStreamParser event, so per-scene work can start while later scenes
+    are still being written. The output is stored as the crew's "script"
+    stage; with a manifest, an unchanged script is replayed from disk.
+    Streaming bypasses LangChain's cache, so when the LLM completion cache
+    is enabled it is consulted and updated here, and honours record and
+    replay modes like every other completion.
+    """
+    from langchain_core.load import dumps
+    from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+    from langchain_core.outputs import ChatGeneration
+    
+    task = crew["tasks"]["script"]
+    agent = task.agent
+    graph = TaskGraph(crew["tasks"], root="script")
+    input_hash = graph.input_hash("script", [])
+    parser = SceneStreamParser()
+    
+    def dispatch(events):
+        if on_event is not None:
+            for event, scene in events:
+                on_event(event, scene)
+    
+    stored = graph.load_stage(manifest, "script", input_hash)
+    if stored is not None:
+        print("Skipping crew task 'script': inputs unchanged")
+        dispatch(parser.feed(stored) + parser.finish())
+        return stored
+    
+    messages = [
+        SystemMessage(content=f"You are {agent.role}. {agent.backstory}\nYour personal goal is: {agent.goal}"),
+        HumanMessage(content=f"{task.description}\n\nThis is the expected criteria for your final answer: "
+                             f"{task.expected_output}")
+    ]
+    llm = get_llm()
+    # Keyed the way LangChain keys its own cache lookups for this model
+    cache = llm.cache if not isinstance(llm.cache, bool) else None
+    cache_key = (dumps(messages), llm._get_llm_string()) if cache is not None else None
+    cached = cache.lookup(*cache_key) if cache is not None else None
+    if cached:
+        script = cached[0].text
+        dispatch(parser.feed(script) + parser.finish())
+        print(f"Screenplay served from the LLM cache: {len(parser.scenes)} scenes")
+    else:
+        chunks = []
+        start = time.perf_counter()
+        first_scene = None
+        with span("crew:script", "crew_task", streamed=True), request_priority(PRIORITY_HIGH):
+            for chunk in llm.stream(messages):
+                text = chunk.content if isinstance(chunk.content, str) else ""
+                chunks.append(text)
+                events = parser.feed(text)
+                if events and first_scene is None:
+                    first_scene = time.perf_counter() - start
+                dispatch(events)
+            dispatch(parser.finish())
+        
+        script = "".join(chunks)
+        print(f"Screenplay streamed: {len(parser.scenes)} scenes in {time.perf_counter() - start:.1f}s"
+              + (f", first scene after {first_scene:.1f}s" if first_scene is not None else ""))
+        if cache is not None:
+            cache.update(*cache_key, [ChatGeneration(message=AIMessage(content=script))])
+    if manifest is not None:
+        graph.save_stage(manifest, os.path.join(project_dir or os.getcwd(), "production", "stages"),
+                         "script", input_hash, script)
+    return script
 
-def create_movie_from_prompt(story_prompt: str):
+def create_movie_from_prompt(story_prompt: str, concurrent: bool = True, max_in_flight: int = None,
+                             crew_mode: str = None, resume: bool = True, project_dir: str = None,
+                             style: str = "cinematic", duration: int = None, crew: Dict = None,
+                             executor: ThreadPoolExecutor = None,
+                             on_asset_results: Callable[[Dict], None] = None, stream_script: bool = None):
     """
-    Main function to generate a movie from a story prompt
+    Main function to generate a movie from a story prompt.
+    With resume enabled, stages recorded in production/manifest.json whose
+    inputs are unchanged are skipped. Everything is written under project_dir
+    (default: the working directory). Concurrent projects each need their own
+    crew, from build_crew(); the default crew is shared. on_asset_results
+    receives the per-job results of run_asset_jobs. With stream_script (and
+    the "dag" crew mode), the screenplay is streamed and each scene's
+    storyboard, concept art and video prompt start as soon as it is written.
     """
     print(f"Starting movie generation for: {story_prompt}")
+    base_dir = project_dir or os.getcwd()
     
     # Create necessary directories
     directories = ['concept_art', 'storyboards', 'characters', 'production', 'sound', 'video_prompts', 'output']
     for dir in directories:
-        os.makedirs(dir, exist_ok=True)
+        os.makedirs(os.path.join(base_dir, dir), exist_ok=True)
     
     # Update the first task with the story prompt
-    task_script.description = f'Write a compelling short film screenplay based on this story prompt: "{story_prompt}". Include proper screenplay format with scene headings, action lines, and dialogue. Target length: 3-5 pages for a 3-5 minute film.'
+    if crew is None:
+        crew = get_crew()
+    target = (f"Target length: about {duration} seconds of screen time." if duration
+              else "Target length: 3-5 pages for a 3-5 minute film.")
+    # Crews are reused across projects, so point the guide at this one
+    crew["tasks"]["video_prompts"].output_file = _crew_paths(project_dir)[1]
+    crew["tasks"]["script"].description = f'Write a compelling short film screenplay based on this story prompt: "{story_prompt}". Include proper screenplay format with scene headings, action lines, and dialogue. {target}'
+    
+    manifest = StageManifest(os.path.join(base_dir, "production", "manifest.json")) if resume else None
+    if crew_mode is None:
+        crew_mode = MovieConfig.CONCURRENCY_SETTINGS["crew_mode"]
+    if stream_script is None:
+        stream_script = MovieConfig.CONCURRENCY_SETTINGS["stream_script"]
+    stream_script = stream_script and crew_mode == "dag"
     
-    # Execute the crew
-    result = movie_crew.kickoff()
+    # Per-scene assets are submitted while the screenplay is still streaming,
+    # to the same bounded pool as the remaining asset jobs
+    owned_executor = None
+    if executor is None or not concurrent:
+        if max_in_flight is None:
+            max_in_flight = MovieConfig.CONCURRENCY_SETTINGS["asset_max_in_flight"]
+        owned_executor = executor = ThreadPoolExecutor(max_workers=max(1, max_in_flight) if concurrent else 1)
+    scene_jobs = {}
+    scene_futures = {}
+    locations = set()
     
-    # Now generate the visual assets based on the script
-    print("\n=== Generating Visual Assets ===")
+    def on_scene(event, scene):
+        new_location = scene.location not in locations
+        locations.add(scene.location)
+        for name, job in scene_asset_jobs(event, scene, style, project_dir, new_location).items():
+            scene_jobs[name] = job
+            scene_futures[name] = _submit_asset_job(executor, name, job, manifest)
     
-    # Generate some concept art
     try:
-        print("Generating concept art...")
-        concept1 = generate_concept_art("Post-apocalyptic city with abandoned skyscrapers and overgrown vegetation")
-        concept2 = generate_concept_art("Close-up of a lonely robot discovering a small flower growing through concrete")
-        concept3 = generate_concept_art("Robot protecting flower from harsh storm in ruined city")
+        # Execute the crew
+        precomputed = None
+        crew_outputs = {}
+        if stream_script:
+            print("\n=== Streaming Screenplay ===")
+            script = stream_screenplay(crew, on_scene, manifest, project_dir)
+            precomputed = {"script": script}
+        result = run_crew(crew_mode, manifest, crew, project_dir, precomputed, crew_outputs.update)
+        script = crew_outputs.get("script") or getattr(getattr(crew["tasks"]["script"], "output", None), "raw", "")
+        if not script:
+            # Falling back to the sample shot list would overwrite the project's own
+            raise RuntimeError("The crew produced no screenplay to break down into shots")
         
-        print("Generating character designs...")
-        char1 = generate_character_design("Weathered but gentle robot with expressive LED eyes, industrial design with patches of rust")
+        # Now generate the visual assets based on the script
+        print("\n=== Generating Visual Assets ===")
         
-        print("Creating production documents...")
-        shot_list = create_shot_list("Robot and flower story")
-        sound_design = generate_sound_description("Post-apocalyptic environment with robot protagonist")
-        video_prompt = create_video_prompt("Robot discovers flower in ruins", "medium", 5)
+        asset_jobs = {
+            "character_1": (generate_character_design, ("Weathered but gentle robot with expressive LED eyes, industrial design with patches of rust", project_dir)),
+            "shot_list": (create_shot_list, (script, project_dir),
+                          os.path.join(base_dir, "production", "shot_list.json")),
+            "video_prompts": (create_video_prompts, (script, style, project_dir)),
+            "sound_design": (generate_sound_description, ("Post-apocalyptic environment with robot protagonist", project_dir),
+                             os.path.join(base_dir, "sound", "sound_design.json")),
+        }
+        if not stream_script:
+            # Streamed runs already have concept art for every location
+            asset_jobs.update({
+                "concept_art_1": (generate_concept_art, ("Post-apocalyptic city with abandoned skyscrapers and overgrown vegetation", style, project_dir)),
+                "concept_art_2": (generate_concept_art, ("Close-up of a lonely robot discovering a small flower growing through concrete", style, project_dir)),
+                "concept_art_3": (generate_concept_art, ("Robot protecting flower from harsh storm in ruined city", style, project_dir)),
+            })
         
-    except Exception as e:
-        print(f"Error generating assets: {e}")
+        print(f"Generating {len(asset_jobs)} assets {'concurrently' if concurrent else 'sequentially'}...")
+        asset_results = run_asset_jobs(asset_jobs, manifest=manifest, executor=executor)
+        for name, (input_hash, submitted) in scene_futures.items():
+            asset_results[name] = _collect_asset_job(name, scene_jobs[name], input_hash, submitted, manifest)
+    finally:
+        if owned_executor is not None:
+            owned_executor.shutdown()
+    
+    attach_storyboards(asset_results, project_dir)
+    if on_asset_results is not None:
+        on_asset_results(asset_results)
+    for name, outcome in asset_results.items():
+        if outcome["error"]:
+            print(f"Error generating {name}: {outcome['error']}")
+    
+    scheduler_metrics = get_scheduler().metrics()
+    if scheduler_metrics["requests"]:
+        wait = scheduler_metrics["wait_time"]
+        print(f"OpenAI scheduler: {scheduler_metrics['requests']} requests, "
+              f"{scheduler_metrics['retries']} retries ({scheduler_metrics['rate_limited']} rate limited), "
+              f"wait p50 {wait['p50']}s / max {wait['max']}s")
     
     print("\n=== Movie Generation Complete ===")
     print(f"Results saved to project directories")
-    print(f"Check video_generation_guide.md for final output")
+    print(f"Check {crew['tasks']['video_prompts'].output_file} for final output")
     
     return result
 
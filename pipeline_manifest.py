@@ -0,0 +1,107 @@
+# pipeline_manifest.py
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from typing import Dict, List, Optional, Union
+
+Outputs = Union[str, List[str], Dict[str, str]]
+
+def hash_inputs(*parts) -> str:
+    """Hashes JSON-serializable stage inputs into a stable digest"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def hash_file(path: str) -> str:
+    """Hashes a file's contents, returning an empty string if it does not exist"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    except OSError:
+        return ""
+    return digest.hexdigest()
+
+class StageManifest:
+    """
+    Records the input hash and outputs of each pipeline stage, like a build system.
+    A stage is up to date when its inputs hash the same as last time and all of
+    its recorded output files still exist.
+    """
+
+    def __init__(self, path: str = os.path.join("production", "manifest.json")):
+        self.path = path
+        self._lock = threading.Lock()
+        self.stages = self._load()
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f).get("stages", {})
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, 'w') as f:
+            json.dump({"version": "1.0", "stages": self.stages}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _output_paths(outputs: Outputs) -> List[str]:
+        if isinstance(outputs, str):
+            return [outputs] if outputs else []
+        if isinstance(outputs, dict):
+            return list(outputs.values())
+        return list(outputs)
+
+    def is_fresh(self, stage: str, input_hash: str) -> bool:
+        """Returns True if the stage ran with the same inputs and its outputs still exist"""
+        with self._lock:
+            entry = self.stages.get(stage)
+        if not entry or entry["input_hash"] != input_hash:
+            return False
+        return all(os.path.exists(path) for path in self._output_paths(entry["outputs"]))
+
+    def outputs(self, stage: str) -> Optional[Outputs]:
+        """Returns the recorded outputs of a stage"""
+        with self._lock:
+            entry = self.stages.get(stage)
+        return entry["outputs"] if entry else None
+
+    def input_hash(self, stage: str) -> Optional[str]:
+        """Returns the input hash recorded for a stage"""
+        with self._lock:
+            entry = self.stages.get(stage)
+        return entry["input_hash"] if entry else None
+
+    def record(self, stage: str, input_hash: str, outputs: Outputs):
+        """Records a completed stage and writes the manifest to disk immediately"""
+        with self._lock:
+            self.stages[stage] = {
+                "input_hash": input_hash,
+                "outputs": outputs,
+                "completed_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+            }
+            self._save()
+
+    def record_many(self, records: Dict[str, tuple]):
+        """Records several completed stages, {stage: (input_hash, outputs)}, with a single manifest write"""
+        if not records:
+            return
+        completed_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+        with self._lock:
+            for stage, (input_hash, outputs) in records.items():
+                self.stages[stage] = {"input_hash": input_hash, "outputs": outputs, "completed_at": completed_at}
+            self._save()
+
+    def invalidate(self, stage: str):
+        """Forgets a stage so it is recomputed on the next run"""
+        with self._lock:
+            if self.stages.pop(stage, None) is not None:
+                self._save()
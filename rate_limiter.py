@@ -0,0 +1,276 @@
+# rate_limiter.py
+import time
+import heapq
+import random
+import itertools
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+from config import MovieConfig
+
+# Lower values are served first
+PRIORITY_HIGH = 0    # Screenplay and other critical-path LLM calls
+PRIORITY_NORMAL = 5  # Other crew tasks, concept art, character sheets
+PRIORITY_LOW = 9     # Storyboards and other bulk assets
+
+_current_priority = contextvars.ContextVar("request_priority", default=PRIORITY_NORMAL)
+
+@contextmanager
+def request_priority(priority: int):
+    """Sets the priority of OpenAI requests made inside the block on this thread"""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+def current_priority() -> int:
+    return _current_priority.get()
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate"""
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount tokens are available (0 if available now)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Reads a Retry-After hint from an OpenAI error response, if any"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+def _is_retryable(error: Exception) -> bool:
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return type(error).__name__ in ("RateLimitError", "APITimeoutError", "APIConnectionError")
+
+class RequestScheduler:
+    """
+    Central scheduler for OpenAI traffic. Each model has token buckets for
+    requests/min and tokens/min and a priority queue of waiting callers, so
+    high-priority requests are admitted first when capacity is short.
+    Calls that hit rate limits or transient errors are retried with jittered
+    exponential backoff, honouring Retry-After; a backoff blocks the whole
+    model, whether or not it has configured limits.
+    """
+
+    def __init__(self, limits: Dict[str, Dict] = None, max_retries: int = None,
+                 base_delay: float = None, max_delay: float = None):
+        settings = MovieConfig.RATE_LIMIT_SETTINGS
+        self.limits = limits if limits is not None else settings["models"]
+        self.max_retries = settings["max_retries"] if max_retries is None else max_retries
+        self.base_delay = settings["base_delay"] if base_delay is None else base_delay
+        self.max_delay = settings["max_delay"] if max_delay is None else max_delay
+
+        self._cond = threading.Condition()
+        self._buckets = {}
+        self._blocked_until = {}
+        self._queues = {}
+        self._sequence = itertools.count()
+        self._waits = deque(maxlen=10000)
+        self._counters = {"requests": 0, "retries": 0, "rate_limited": 0, "failed": 0}
+        self._max_depth = {}
+
+    def _model_state(self, model: str):
+        if model not in self._buckets:
+            limit = self.limits.get(model, {})
+            self._buckets[model] = {
+                "rpm": TokenBucket(limit["rpm"]) if limit.get("rpm") else None,
+                "tpm": TokenBucket(limit["tpm"]) if limit.get("tpm") else None
+            }
+            self._blocked_until[model] = 0.0
+            self._queues[model] = []
+            self._max_depth[model] = 0
+        return self._buckets[model], self._queues[model]
+
+    def estimated_tokens(self, model: str) -> int:
+        return self.limits.get(model, {}).get("est_tokens", 0)
+
+    def acquire(self, model: str, tokens: int = None, priority: int = None) -> float:
+        """
+        Blocks until a request for model may be sent, serving waiters in
+        priority order. Returns the time spent waiting.
+        """
+        if tokens is None:
+            tokens = self.estimated_tokens(model)
+        if priority is None:
+            priority = current_priority()
+
+        start = time.monotonic()
+        with self._cond:
+            buckets, queue = self._model_state(model)
+            entry = (priority, next(self._sequence))
+            heapq.heappush(queue, entry)
+            self._max_depth[model] = max(self._max_depth[model], len(queue))
+            while True:
+                if queue[0] == entry:
+                    wait = self._blocked_until[model] - time.monotonic()
+                    if buckets["rpm"] is not None:
+                        wait = max(wait, buckets["rpm"].wait_time(1))
+                    if buckets["tpm"] is not None and tokens:
+                        wait = max(wait, buckets["tpm"].wait_time(tokens))
+                    if wait <= 0:
+                        break
+                    self._cond.wait(timeout=wait)
+                else:
+                    self._cond.wait()
+            heapq.heappop(queue)
+            if buckets["rpm"] is not None:
+                buckets["rpm"].consume(1)
+            if buckets["tpm"] is not None and tokens:
+                buckets["tpm"].consume(tokens)
+            self._counters["requests"] += 1
+            waited = time.monotonic() - start
+            self._waits.append(waited)
+            self._cond.notify_all()
+        return waited
+
+    def backoff(self, model: str, seconds: float):
+        """Admits no request for a model for the given time, e.g. after a 429 with Retry-After"""
+        with self._cond:
+            self._model_state(model)
+            self._blocked_until[model] = max(self._blocked_until[model], time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    def _retry(self, error: Exception, model: str, attempt: int) -> bool:
+        """Counts a failed attempt and backs the model off; returns False if the error should be raised"""
+        if not _is_retryable(error) or attempt == self.max_retries:
+            with self._cond:
+                self._counters["failed"] += 1
+            return False
+        delay = _retry_after(error)
+        if delay is None:
+            delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        # Jitter keeps concurrent retries from synchronizing
+        delay = delay + random.uniform(0, delay * 0.5)
+        with self._cond:
+            self._counters["retries"] += 1
+            if getattr(error, "status_code", None) == 429:
+                self._counters["rate_limited"] += 1
+        self.backoff(model, delay)
+        return True
+
+    def call(self, fn: Callable, model: str, tokens: int = None, priority: int = None):
+        """Runs fn() once admitted, retrying rate-limited and transient failures"""
+        for attempt in range(self.max_retries + 1):
+            self.acquire(model, tokens, priority)
+            try:
+                return fn()
+            except Exception as e:
+                if not self._retry(e, model, attempt):
+                    raise
+
+    async def acall(self, fn: Callable, model: str, tokens: int = None, priority: int = None):
+        """Awaits fn() once admitted, with the same retries as call"""
+        import asyncio
+        if priority is None:
+            priority = current_priority()
+        for attempt in range(self.max_retries + 1):
+            await asyncio.to_thread(self.acquire, model, tokens, priority)
+            try:
+                return await fn()
+            except Exception as e:
+                if not self._retry(e, model, attempt):
+                    raise
+
+    def metrics(self) -> Dict:
+        """Returns queue depths, wait-time statistics and retry counters"""
+        with self._cond:
+            waits = sorted(self._waits)
+            depths = {model: len(queue) for model, queue in self._queues.items()}
+            max_depths = dict(self._max_depth)
+            counters = dict(self._counters)
+
+        def percentile(point):
+            return round(waits[min(len(waits) - 1, int(point / 100.0 * len(waits)))], 3) if waits else 0.0
+
+        return {
+            "queue_depth": depths,
+            "max_queue_depth": max_depths,
+            "wait_time": {"mean": round(sum(waits) / len(waits), 3) if waits else 0.0,
+                          "p50": percentile(50), "p90": percentile(90), "max": round(waits[-1], 3) if waits else 0.0},
+            **counters
+        }
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler() -> RequestScheduler:
+    """Returns the process-wide request scheduler shared by all OpenAI traffic"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = RequestScheduler()
+    return _scheduler
+
+def make_scheduled_chat_model(**kwargs):
+    """
+    Returns a ChatOpenAI whose requests are admitted, retried and counted by
+    the shared scheduler, using the priority of the calling thread, so chat
+    and image requests follow one retry policy. The OpenAI client's own
+    retries are disabled. For streams, only opening the stream is retried.
+    """
+    from langchain_openai import ChatOpenAI
+
+    class ScheduledChatOpenAI(ChatOpenAI):
+        def _generate(self, messages, stop=None, run_manager=None, **options):
+            return get_scheduler().call(
+                lambda: ChatOpenAI._generate(self, messages, stop=stop, run_manager=run_manager, **options),
+                self.model_name)
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **options):
+            return await get_scheduler().acall(
+                lambda: ChatOpenAI._agenerate(self, messages, stop=stop, run_manager=run_manager, **options),
+                self.model_name)
+
+        def _stream(self, messages, stop=None, run_manager=None, **options):
+            def start():
+                stream = ChatOpenAI._stream(self, messages, stop=stop, run_manager=run_manager, **options)
+                return stream, next(stream, None)
+
+            stream, first = get_scheduler().call(start, self.model_name)
+            if first is not None:
+                yield first
+                yield from stream
+
+        async def _astream(self, messages, stop=None, run_manager=None, **options):
+            async def start():
+                stream = ChatOpenAI._astream(self, messages, stop=stop, run_manager=run_manager, **options)
+                return stream, await anext(stream, None)
+
+            stream, first = await get_scheduler().acall(start, self.model_name)
+            if first is not None:
+                yield first
+                async for chunk in stream:
+                    yield chunk
+
+    return ScheduledChatOpenAI(max_retries=0, **kwargs)
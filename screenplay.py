@@ -0,0 +1,278 @@
+# screenplay.py
+import re
+import math
+from typing import Dict, List, Optional, Tuple
+from config import MovieConfig
+
+# "INT. LOCATION - TIME", "EXT./INT. ...", optionally numbered or wrapped in markdown emphasis
+SCENE_HEADING = re.compile(
+    r"^(?:\d+[.)]?\s+)?(?P<setting>INT\./EXT\.|EXT\./INT\.|INT/EXT\.?|I/E\.?|INT\.|EXT\.)\s*"
+    r"(?P<location>.+?)(?:\s+[-–—]+\s+(?P<time>[^-–—]+?))?\s*$"
+)
+TRANSITION = re.compile(r"^(?:[A-Z][A-Z ]*(?:TO|IN|OUT):|FADE (?:IN|OUT)\.?|THE END\.?)$")
+CHARACTER_CUE = re.compile(r"^(?P<name>[A-Z][A-Z0-9 .'\-]*?)\s*(?P<extension>\((?:V\.O\.|O\.S\.|O\.C\.|CONT'D)\))?$")
+
+# Reading speeds used to estimate screen time
+ACTION_WORDS_PER_SECOND = 2.5
+DIALOGUE_WORDS_PER_SECOND = 2.5
+MIN_SCENE_SECONDS = 3
+MIN_SHOT_SECONDS = 2
+MAX_ESTABLISHING_SECONDS = 6
+
+# Action verbs that suggest the camera should follow the movement
+MOTION_WORDS = {"runs", "run", "walks", "walk", "moves", "chases", "races", "rushes", "flees", "climbs",
+                "drives", "flies", "falls", "rolls", "charges", "sprints", "crawls", "follows", "dashes"}
+
+def _clean(line: str) -> str:
+    """Strips markdown decoration an LLM may add around screenplay lines"""
+    line = line.strip()
+    line = re.sub(r"^#+\s*", "", line)
+    line = re.sub(r"^[*_]+|[*_]+$", "", line).strip()
+    return line
+
+class Scene:
+    """
+    One screenplay scene: its heading and a list of elements, each
+    ("action", text) or ("dialogue", character, text, parenthetical).
+    """
+
+    def __init__(self, number: int, heading: str, setting: str, location: str, time: Optional[str]):
+        self.number = number
+        self.heading = heading
+        self.setting = setting.rstrip(".")
+        self.location = location.strip()
+        self.time = time.strip() if time else None
+        self.elements = []
+
+    def __repr__(self):
+        return f"Scene({self.number}, {self.heading!r}, {len(self.elements)} elements)"
+
+    @property
+    def exterior(self) -> bool:
+        return self.setting.startswith("EXT") or self.setting.startswith("I/E")
+
+    @property
+    def action(self) -> List[str]:
+        return [element[1] for element in self.elements if element[0] == "action"]
+
+    @property
+    def dialogue(self) -> List[Tuple[str, str, Optional[str]]]:
+        return [element[1:] for element in self.elements if element[0] == "dialogue"]
+
+    @property
+    def characters(self) -> List[str]:
+        seen = []
+        for character, _, _ in self.dialogue:
+            if character not in seen:
+                seen.append(character)
+        return seen
+
+    def summary(self, max_words: int = 60) -> str:
+        """Heading plus the opening action, for prompts that describe the scene"""
+        words = " ".join(self.action).split()
+        text = " ".join(words[:max_words]) + ("..." if len(words) > max_words else "")
+        return f"{self.heading}. {text}".strip()
+
+    def estimated_duration(self) -> int:
+        """Estimated screen time in whole seconds from the action and dialogue word counts"""
+        action_words = sum(len(text.split()) for text in self.action)
+        dialogue_words = sum(len(text.split()) for _, text, _ in self.dialogue)
+        seconds = action_words / ACTION_WORDS_PER_SECOND + dialogue_words / DIALOGUE_WORDS_PER_SECOND
+        return max(MIN_SCENE_SECONDS, round(seconds))
+
+    def to_dict(self) -> Dict:
+        return {
+            "scene_number": self.number,
+            "heading": self.heading,
+            "setting": self.setting,
+            "location": self.location,
+            "time": self.time,
+            "action": self.action,
+            "characters": self.characters,
+            "dialogue": [{"character": character, "text": text, "parenthetical": parenthetical}
+                         for character, text, parenthetical in self.dialogue],
+            "estimated_duration": self.estimated_duration()
+        }
+
+class SceneStreamParser:
+    """
+    Incremental screenplay parser. feed() accepts text as it streams from the
+    LLM and returns events for scenes as soon as they are usable:
+    ("scene_started", scene) once a scene's heading and first action block are
+    complete, and ("scene_complete", scene) when the next heading or the end of
+    the script arrives. Every scene gets both events, in order.
+    """
+
+    def __init__(self):
+        self.scenes = []
+        self._buffer = ""
+        self._scene = None
+        self._started = False
+        self._paragraph = []
+        self._character = None
+        self._parenthetical = None
+
+    def feed(self, text: str) -> List[Tuple[str, Scene]]:
+        self._buffer += text
+        events = []
+        *lines, self._buffer = self._buffer.split("\n")
+        for line in lines:
+            events.extend(self._line(line))
+        return events
+
+    def finish(self) -> List[Tuple[str, Scene]]:
+        """Flushes the last partial line and completes the final scene"""
+        events = []
+        if self._buffer:
+            events.extend(self._line(self._buffer))
+            self._buffer = ""
+        events.extend(self._close_scene())
+        return events
+
+    def _close_paragraph(self) -> List[Tuple[str, Scene]]:
+        events = []
+        if self._scene is not None and self._paragraph:
+            text = " ".join(self._paragraph)
+            if self._character is not None:
+                self._scene.elements.append(("dialogue", self._character, text, self._parenthetical))
+            else:
+                self._scene.elements.append(("action", text))
+                if not self._started:
+                    self._started = True
+                    events.append(("scene_started", self._scene))
+        self._paragraph = []
+        self._character = None
+        self._parenthetical = None
+        return events
+
+    def _close_scene(self) -> List[Tuple[str, Scene]]:
+        events = self._close_paragraph()
+        if self._scene is not None:
+            if not self._started:
+                events.append(("scene_started", self._scene))
+            events.append(("scene_complete", self._scene))
+        self._scene = None
+        self._started = False
+        return events
+
+    def _line(self, raw: str) -> List[Tuple[str, Scene]]:
+        line = _clean(raw)
+        if not line:
+            return self._close_paragraph()
+
+        heading = SCENE_HEADING.match(line)
+        if heading:
+            events = self._close_scene()
+            self._scene = Scene(len(self.scenes) + 1, line, heading.group("setting"),
+                                heading.group("location"), heading.group("time"))
+            self.scenes.append(self._scene)
+            return events
+
+        if self._scene is None or TRANSITION.match(line):
+            return self._close_paragraph() if TRANSITION.match(line) else []
+
+        if self._character is not None:
+            if line.startswith("(") and line.endswith(")"):
+                if self._paragraph:
+                    # A parenthetical between dialogue lines starts a new speech block
+                    character = self._character
+                    events = self._close_paragraph()
+                    self._character = character
+                    self._parenthetical = line[1:-1]
+                    return events
+                self._parenthetical = line[1:-1]
+            else:
+                self._paragraph.append(line)
+            return []
+
+        cue = CHARACTER_CUE.match(line)
+        if cue and any(c.isalpha() for c in cue.group("name")) and len(cue.group("name")) <= 40:
+            events = self._close_paragraph()
+            self._character = cue.group("name").strip()
+            return events
+
+        self._paragraph.append(line)
+        return []
+
+def parse_screenplay(text: str) -> List[Scene]:
+    """Parses a complete screenplay into scenes"""
+    parser = SceneStreamParser()
+    parser.feed(text)
+    parser.finish()
+    return parser.scenes
+
+def _shot_seconds(words: int, words_per_second: float) -> int:
+    return max(MIN_SHOT_SECONDS, math.ceil(words / words_per_second))
+
+def _shot(shot_type: str, camera_movement: str, description: str, duration: int, scene: Scene,
+          characters: List[str] = None) -> Dict:
+    return {
+        "scene_number": scene.number,
+        "type": shot_type,
+        "abbr": MovieConfig.SHOT_TYPES[shot_type]["abbr"],
+        "description": description,
+        "duration": duration,
+        "camera_movement": camera_movement,
+        "characters": characters or []
+    }
+
+def scene_shots(scene: Scene, first_at_location: bool = True) -> List[Dict]:
+    """
+    Breaks one scene into a shot skeleton: an establishing shot, a shot per
+    action block and a shot per speech (consecutive lines of one speaker
+    are merged). Two-handers are covered over the shoulder, single speakers
+    in close-up, and action with movement is followed by the camera.
+    """
+    shots = []
+    action = scene.action
+    opening = action[0] if action else scene.heading
+    establishing_type = "extreme_wide_shot" if scene.exterior else "wide_shot"
+    establishing_seconds = min(MAX_ESTABLISHING_SECONDS,
+                               _shot_seconds(len(opening.split()), ACTION_WORDS_PER_SECOND))
+    shots.append(_shot(establishing_type, "crane_down" if first_at_location and scene.exterior else "static",
+                       f"{scene.heading}. {opening}", establishing_seconds, scene))
+
+    two_hander = len(scene.characters) >= 2
+    speech = None
+    speech_words = 0
+    first_action = True
+    for element in scene.elements:
+        if element[0] == "action":
+            speech = None
+            if first_action:
+                # The opening action is covered by the establishing shot
+                first_action = False
+                continue
+            words = element[1].split()
+            moving = any(word.strip(".,!?;:").lower() in MOTION_WORDS for word in words)
+            shots.append(_shot("wide_shot" if moving else "medium_shot", "steadicam" if moving else "static",
+                               element[1], _shot_seconds(len(words), ACTION_WORDS_PER_SECOND), scene))
+        else:
+            _, character, text, parenthetical = element
+            speech_words = len(text.split()) + (speech_words if speech is not None and
+                                                speech["characters"] == [character] else 0)
+            if speech is not None and speech["characters"] == [character]:
+                speech["description"] += f" {text}"
+                speech["duration"] = _shot_seconds(speech_words, DIALOGUE_WORDS_PER_SECOND)
+                continue
+            prefix = f"{character} ({parenthetical})" if parenthetical else character
+            speech = _shot("over_shoulder" if two_hander else "close_up", "static", f"{prefix}: {text}",
+                           _shot_seconds(speech_words, DIALOGUE_WORDS_PER_SECOND), scene, [character])
+            shots.append(speech)
+    return shots
+
+def build_shot_list(scenes: List[Scene], project_name: str = "AI Movie") -> Dict:
+    """Builds a numbered shot list skeleton, in the production/shot_list.json format, for parsed scenes"""
+    shots = []
+    locations = set()
+    for scene in scenes:
+        for shot in scene_shots(scene, scene.location not in locations):
+            shots.append(dict(shot_number=len(shots) + 1, **shot))
+        locations.add(scene.location)
+    return {
+        "project_name": project_name,
+        "scenes": [{"scene_number": scene.number, "heading": scene.heading, "characters": scene.characters}
+                   for scene in scenes],
+        "shots": shots,
+        "total_duration": sum(shot["duration"] for shot in shots)
+    }
@@ -0,0 +1,216 @@
+# task_graph.py
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pipeline_manifest import StageManifest, hash_inputs
+from tracing import span
+from rate_limiter import request_priority, PRIORITY_HIGH, PRIORITY_NORMAL
+
+def _execute_task(task, context: str) -> str:
+    """Executes a single crewai Task with the given context and returns its text output"""
+    if hasattr(task, "execute_sync"):
+        output = task.execute_sync(context=context)
+        return getattr(output, "raw", str(output))
+    return task.execute(context=context)
+
+class TaskGraph:
+    """
+    Runs crew tasks as a dependency graph instead of a fixed sequence.
+    Dependencies come from each task's context list; tasks without one
+    depend on the root task (the screenplay) only. context_builders maps a
+    task name to a function that builds its context from its dependencies'
+    outputs (name -> output); by default the outputs are concatenated.
+    """
+
+    def __init__(self, tasks: Dict[str, object], root: str,
+                 context_builders: Dict[str, Callable[[Dict[str, str]], str]] = None):
+        self.tasks = tasks
+        self.root = root
+        self.context_builders = context_builders or {}
+        self.dependencies = self._build_dependencies()
+        self.timings = {}
+        self.wall_time = 0.0
+
+    def _build_dependencies(self) -> Dict[str, List[str]]:
+        names_by_id = {id(task): name for name, task in self.tasks.items()}
+        dependencies = {}
+        for name, task in self.tasks.items():
+            context = getattr(task, "context", None)
+            if isinstance(context, list) and context:
+                deps = []
+                for upstream in context:
+                    if id(upstream) not in names_by_id:
+                        raise ValueError(f"Task '{name}' depends on a task outside the graph")
+                    deps.append(names_by_id[id(upstream)])
+            elif name != self.root:
+                deps = [self.root]
+            else:
+                deps = []
+            dependencies[name] = deps
+        self._check_acyclic(dependencies)
+        return dependencies
+
+    @staticmethod
+    def _check_acyclic(dependencies: Dict[str, List[str]]):
+        visiting, done = set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle detected at task '{name}'")
+            visiting.add(name)
+            for dep in dependencies[name]:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in dependencies:
+            visit(name)
+
+    def input_hash(self, name: str, dep_outputs: List[str]) -> str:
+        """Hashes everything that determines a task's output: its prompt, model and upstream outputs"""
+        task = self.tasks[name]
+        llm = getattr(getattr(task, "agent", None), "llm", None)
+        return hash_inputs(name, getattr(task, "description", ""), getattr(task, "expected_output", ""),
+                           getattr(llm, "model_name", None), dep_outputs)
+
+    def load_stage(self, manifest: StageManifest, name: str, input_hash: str) -> Optional[str]:
+        """Returns the stored output of a task whose inputs are unchanged, or None"""
+        if manifest is None or not manifest.is_fresh(f"crew:{name}", input_hash):
+            return None
+        with open(manifest.outputs(f"crew:{name}"), 'r') as f:
+            return f.read()
+
+    def save_stage(self, manifest: StageManifest, stage_dir: str, name: str, input_hash: str, output: str):
+        """Stores a task's output under stage_dir and records it in the manifest"""
+        os.makedirs(stage_dir, exist_ok=True)
+        path = os.path.join(stage_dir, f"{name}.md")
+        with open(path, 'w') as f:
+            f.write(output)
+        manifest.record(f"crew:{name}", input_hash, path)
+
+    def run(self, max_workers: int = 4, precomputed: Optional[Dict[str, str]] = None,
+            manifest: StageManifest = None, stage_dir: str = os.path.join("production", "stages")) -> Dict[str, str]:
+        """
+        Executes every task as soon as its dependencies have finished.
+        precomputed maps task names to outputs that are already known, so
+        those tasks are not executed again. With a manifest, tasks whose
+        description and upstream outputs are unchanged reuse their stored
+        output. Returns task name -> output.
+        """
+        outputs = dict(precomputed or {})
+        self.timings = {name: (0.0, 0.0) for name in outputs}
+        pending = {name for name in self.tasks if name not in outputs}
+        running = {}
+        errors = {}
+        input_hashes = {}
+        graph_start = time.perf_counter()
+
+        def timed(name, context):
+            start = time.perf_counter() - graph_start
+            # The root task gates every other task, so its LLM calls jump the queue
+            priority = PRIORITY_HIGH if name == self.root else PRIORITY_NORMAL
+            with span(f"crew:{name}", "crew_task"), request_priority(priority):
+                output = _execute_task(self.tasks[name], context)
+            return output, start, time.perf_counter() - graph_start
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            while pending or running:
+                # Submit every task whose dependencies are satisfied. Repeat
+                # while tasks are restored from the manifest, since that can
+                # make their dependents ready without waiting on a future.
+                progressed = True
+                while progressed:
+                    progressed = False
+                    for name in sorted(pending):
+                        deps = self.dependencies[name]
+                        if any(dep in errors for dep in deps):
+                            errors[name] = RuntimeError("Skipped because a dependency failed")
+                            pending.discard(name)
+                            progressed = True
+                        elif all(dep in outputs for dep in deps):
+                            pending.discard(name)
+                            dep_outputs = [outputs[dep] for dep in deps]
+                            builder = self.context_builders.get(name)
+                            context = builder({dep: outputs[dep] for dep in deps}) if builder \
+                                else "\n\n".join(dep_outputs)
+                            # A built context is hashed too, so changes to the builder re-run the task
+                            input_hashes[name] = self.input_hash(name, dep_outputs + [context] if builder
+                                                                 else dep_outputs)
+                            stored = self.load_stage(manifest, name, input_hashes[name])
+                            if stored is not None:
+                                print(f"Skipping crew task '{name}': inputs unchanged")
+                                outputs[name] = stored
+                                self.timings[name] = (0.0, 0.0)
+                                progressed = True
+                                continue
+                            running[executor.submit(timed, name, context)] = name
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        output, start, end = future.result()
+                        outputs[name] = output
+                        self.timings[name] = (start, end)
+                        if manifest is not None:
+                            self.save_stage(manifest, stage_dir, name, input_hashes[name], output)
+                    except Exception as e:
+                        errors[name] = e
+
+        self.wall_time = time.perf_counter() - graph_start
+        if errors:
+            first = next(name for name in self.tasks if name in errors)
+            raise errors[first]
+        return outputs
+
+    def critical_path(self) -> Tuple[List[str], float]:
+        """Returns the longest dependency chain by measured duration and its total time"""
+        finish = {}
+        previous = {}
+        for name in self._topological_order():
+            duration = self.timings.get(name, (0.0, 0.0))
+            duration = duration[1] - duration[0]
+            best_dep = max(self.dependencies[name], key=lambda dep: finish[dep], default=None)
+            finish[name] = duration + (finish[best_dep] if best_dep else 0.0)
+            previous[name] = best_dep
+
+        if not finish:
+            return [], 0.0
+        name = max(finish, key=finish.get)
+        total = finish[name]
+        path = []
+        while name:
+            path.append(name)
+            name = previous[name]
+        return list(reversed(path)), total
+
+    def _topological_order(self) -> List[str]:
+        order, seen = [], set()
+
+        def visit(name):
+            if name in seen:
+                return
+            seen.add(name)
+            for dep in self.dependencies[name]:
+                visit(dep)
+            order.append(name)
+
+        for name in self.tasks:
+            visit(name)
+        return order
+
+    def report(self) -> Dict:
+        """Summarizes per-task timings, wall time and the critical path"""
+        path, path_time = self.critical_path()
+        return {
+            "tasks": {name: round(end - start, 3) for name, (start, end) in self.timings.items()},
+            "wall_time": round(self.wall_time, 3),
+            "critical_path": path,
+            "critical_path_time": round(path_time, 3)
+        }
@@ -0,0 +1,64 @@
+# tests/test_assembly_mode.py
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from video_assembler import VideoAssembler, proxy_encoder_args
+
+# ffprobe output for a shot rendered with the default encoder settings
+H264_SHOT = {"codec_name": "h264", "profile": "High", "width": 1920, "height": 1080,
+             "pix_fmt": "yuv420p", "r_frame_rate": "24/1", "time_base": "1/12288"}
+HEVC_SHOT = dict(H264_SHOT, codec_name="hevc", profile="Main")
+
+class FixtureAssembler(VideoAssembler):
+    """Reports fixed probe results instead of running ffprobe"""
+
+    def __init__(self, probes):
+        super().__init__("output")
+        self.probes = probes
+
+    def probe_video(self, path):
+        return self.probes[os.path.basename(path)]
+
+def edl(*transitions):
+    return {"timeline": [{"shot_number": index + 1, "file_path": f"shots/shot_{index + 1:03d}.mp4",
+                          "in_point": index, "out_point": index + 1,
+                          "transitions": {"in": transition, "out": "cut"}}
+                         for index, transition in enumerate(transitions)]}
+
+def probes(*shots):
+    return {f"shot_{index + 1:03d}.mp4": shot for index, shot in enumerate(shots)}
+
+class AssemblyModeTest(unittest.TestCase):
+    def test_matching_cuts_are_copied(self):
+        assembler = FixtureAssembler(probes(H264_SHOT, H264_SHOT))
+        self.assertEqual(assembler.choose_assembly_mode(edl("cut", "cut")), "copy")
+
+    def test_matching_fades_use_smart_render(self):
+        assembler = FixtureAssembler(probes(H264_SHOT, H264_SHOT))
+        self.assertEqual(assembler.choose_assembly_mode(edl("cut", "fade")), "smart")
+
+    def test_fades_on_another_codec_are_reencoded(self):
+        # Fade heads would be x264 next to stream-copied HEVC tails
+        assembler = FixtureAssembler(probes(HEVC_SHOT, HEVC_SHOT))
+        self.assertEqual(assembler.choose_assembly_mode(edl("cut", "fade")), "reencode")
+
+    def test_fades_with_other_pixel_format_frame_rate_or_size_are_reencoded(self):
+        for mismatch in ({"pix_fmt": "yuv444p"}, {"r_frame_rate": "30/1"}, {"width": 1280, "height": 720}):
+            shot = dict(H264_SHOT, **mismatch)
+            assembler = FixtureAssembler(probes(shot, shot))
+            self.assertEqual(assembler.choose_assembly_mode(edl("fade", "cut")), "reencode", mismatch)
+
+    def test_draft_encoder_ignores_full_resolution(self):
+        proxy = dict(H264_SHOT, width=640, height=360)
+        assembler = FixtureAssembler(probes(proxy, proxy))
+        self.assertEqual(assembler.choose_assembly_mode(edl("fade", "cut"), proxy_encoder_args()), "smart")
+
+    def test_mixed_shots_are_reencoded(self):
+        assembler = FixtureAssembler(probes(H264_SHOT, HEVC_SHOT))
+        self.assertEqual(assembler.choose_assembly_mode(edl("cut", "cut")), "reencode")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+# tests/test_startup.py
+import os
+import sys
+import json
+import time
+import subprocess
+import unittest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds main.py --help may take; crewai and langchain alone take several
+HELP_BUDGET = 1.0
+HEAVY_MODULES = ("crewai", "langchain_openai")
+
+# Runs main.py --help in-process and reports which modules it imported
+PROBE = """
+import sys, json, runpy
+sys.argv = ["main.py", "--help"]
+try:
+    runpy.run_path("main.py", run_name="__main__")
+except SystemExit:
+    pass
+print(json.dumps(sorted(sys.modules)))
+"""
+
+class StartupTest(unittest.TestCase):
+    def test_help_within_budget(self):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "main.py", "--help"], cwd=REPO_ROOT, check=True, capture_output=True)
+        elapsed = time.perf_counter() - start
+        self.assertLess(elapsed, HELP_BUDGET, f"main.py --help took {elapsed:.2f}s")
+
+    def test_help_does_not_import_agents(self):
+        result = subprocess.run([sys.executable, "-c", PROBE], cwd=REPO_ROOT, check=True,
+                                capture_output=True, text=True)
+        modules = json.loads(result.stdout.splitlines()[-1])
+        heavy = [name for name in modules if name.split(".")[0] in HEAVY_MODULES]
+        self.assertEqual(heavy, [], f"main.py --help imported {heavy}")
+
+if __name__ == "__main__":
+    unittest.main()
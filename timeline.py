@@ -0,0 +1,215 @@
+# timeline.py
+from array import array
+from fractions import Fraction
+from typing import Dict, Iterator, List, Optional, Union
+from config import MovieConfig
+
+Timecode = Union[int, float, Fraction, str]
+
+def parse_timecode(timecode: Timecode, fps: int) -> int:
+    """
+    Converts a timecode to a frame count. Accepts seconds (int, float or
+    Fraction), "HH:MM:SS" strings as used in the sound cue list, and
+    "HH:MM:SS:FF" strings with a frame field.
+    """
+    if isinstance(timecode, str):
+        parts = [int(part) for part in timecode.split(":")]
+        frames = parts[3] if len(parts) == 4 else 0
+        hours, minutes, seconds = ([0, 0, 0] + parts[:3])[-3:]
+        return (hours * 3600 + minutes * 60 + seconds) * fps + frames
+    return round(Fraction(timecode).limit_denominator(1000000) * fps)
+
+def format_timecode(frames: int, fps: int) -> str:
+    """Formats a frame count as an "HH:MM:SS:FF" timecode"""
+    seconds, frame = divmod(frames, fps)
+    minutes, second = divmod(seconds, 60)
+    hour, minute = divmod(minutes, 60)
+    return f"{hour:02d}:{minute:02d}:{second:02d}:{frame:02d}"
+
+class EditRecord:
+    """A single shot on the timeline, timed in whole frames"""
+    __slots__ = ("shot_number", "duration", "file_path", "transitions")
+
+    def __init__(self, shot_number: int, duration: int, file_path: str, transitions: Optional[Dict] = None):
+        self.shot_number = shot_number
+        self.duration = duration
+        self.file_path = file_path
+        self.transitions = transitions or {"in": "cut", "out": "cut"}
+
+    def __repr__(self):
+        return f"EditRecord(shot_number={self.shot_number}, duration={self.duration}, file_path={self.file_path!r})"
+
+class Timeline:
+    """
+    Frame-accurate timeline of edit records. Record start times are kept in a
+    Fenwick tree over the durations, so position lookups, "which shot is at
+    timecode T" and ripple edits (changing one duration and shifting
+    everything after it) each take O(log n).
+    """
+
+    def __init__(self, fps: int = None, project_name: str = "untitled"):
+        self.fps = fps or MovieConfig.VIDEO_SETTINGS["fps"]
+        self.project_name = project_name
+        self.records: List[EditRecord] = []
+        self._tree = array('q', [0])  # 1-based Fenwick tree of durations
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[EditRecord]:
+        return iter(self.records)
+
+    def __getitem__(self, index: int) -> EditRecord:
+        return self.records[index]
+
+    # Fenwick tree primitives
+
+    def _prefix(self, count: int) -> int:
+        """Sum of the first count durations"""
+        total = 0
+        while count > 0:
+            total += self._tree[count]
+            count -= count & -count
+        return total
+
+    def _add(self, index: int, delta: int):
+        position = index + 1
+        while position < len(self._tree):
+            self._tree[position] += delta
+            position += position & -position
+
+    def _rebuild(self):
+        tree = array('q', [0] * (len(self.records) + 1))
+        for position, record in enumerate(self.records, start=1):
+            tree[position] += record.duration
+            parent = position + (position & -position)
+            if parent < len(tree):
+                tree[parent] += tree[position]
+        self._tree = tree
+
+    # Building
+
+    def append(self, record: EditRecord):
+        """Appends a record at the end of the timeline in O(log n)"""
+        self.records.append(record)
+        position = len(self.records)
+        # A Fenwick node covers the durations in (position - lowbit, position]
+        lowbit = position & -position
+        self._tree.append(record.duration + self._prefix(position - 1) - self._prefix(position - lowbit))
+
+    def insert(self, index: int, record: EditRecord):
+        """Inserts a record, rippling later records. O(n) because the index is rebuilt."""
+        self.records.insert(index, record)
+        self._rebuild()
+
+    def remove(self, index: int) -> EditRecord:
+        """Removes a record, rippling later records. O(n) because the index is rebuilt."""
+        record = self.records.pop(index)
+        self._rebuild()
+        return record
+
+    # Queries
+
+    @property
+    def total_frames(self) -> int:
+        return self._prefix(len(self.records))
+
+    def start_frame(self, index: int) -> int:
+        """Frame at which record index starts"""
+        return self._prefix(index)
+
+    def end_frame(self, index: int) -> int:
+        """Frame at which record index ends (exclusive)"""
+        return self._prefix(index + 1)
+
+    def index_at_frame(self, frame: int) -> int:
+        """Returns the index of the record playing at frame, or -1 outside the timeline"""
+        if frame < 0 or frame >= self.total_frames:
+            return -1
+        # Descend the Fenwick tree to find the last position whose prefix is <= frame
+        position = 0
+        remaining = frame
+        step = 1 << (len(self.records).bit_length())
+        while step:
+            candidate = position + step
+            if candidate < len(self._tree) and self._tree[candidate] <= remaining:
+                position = candidate
+                remaining -= self._tree[candidate]
+            step >>= 1
+        return position
+
+    def shot_at(self, timecode: Timecode) -> Optional[EditRecord]:
+        """Returns the record playing at a timecode, or None outside the timeline"""
+        index = self.index_at_frame(parse_timecode(timecode, self.fps))
+        return self.records[index] if index >= 0 else None
+
+    def range(self, start: Timecode, end: Timecode) -> List[int]:
+        """Returns the indices of every record overlapping [start, end)"""
+        start_frame = max(0, parse_timecode(start, self.fps))
+        end_frame = min(self.total_frames, parse_timecode(end, self.fps))
+        if start_frame >= end_frame:
+            return []
+        first = self.index_at_frame(start_frame)
+        last = self.index_at_frame(end_frame - 1)
+        return list(range(first, last + 1))
+
+    # Edits
+
+    def set_duration(self, index: int, frames: int):
+        """Changes a record's duration and ripples every later record in O(log n)"""
+        if frames < 0:
+            raise ValueError("Duration cannot be negative")
+        record = self.records[index]
+        self._add(index, frames - record.duration)
+        record.duration = frames
+
+    def ripple(self, index: int, delta_frames: int):
+        """Extends (or shortens, for negative deltas) a record and ripples later records"""
+        self.set_duration(index, self.records[index].duration + delta_frames)
+
+    # Conversion to and from the JSON EDL shape
+
+    def _seconds(self, frames: int) -> Union[int, float]:
+        seconds = Fraction(frames, self.fps)
+        return int(seconds) if seconds.denominator == 1 else round(float(seconds), 6)
+
+    @classmethod
+    def from_shot_list(cls, shot_list: Dict, fps: int = None) -> "Timeline":
+        """Builds a timeline from a shot list, with durations in seconds"""
+        timeline = cls(fps, shot_list.get("project_name", "untitled"))
+        for shot in shot_list.get("shots", []):
+            timeline.append(EditRecord(
+                shot["shot_number"],
+                parse_timecode(shot["duration"], timeline.fps),
+                f"shots/shot_{shot['shot_number']:03d}.mp4",
+                shot.get("transitions", {"in": "cut", "out": "cut"})
+            ))
+        return timeline
+
+    @classmethod
+    def from_edl(cls, edl: Dict, fps: int = None) -> "Timeline":
+        """Loads a timeline from an EDL dict as produced by to_edl"""
+        timeline = cls(fps, edl.get("project_name", "untitled"))
+        for edit in edl.get("timeline", []):
+            duration = parse_timecode(edit["out_point"], timeline.fps) - parse_timecode(edit["in_point"], timeline.fps)
+            timeline.append(EditRecord(edit["shot_number"], duration, edit["file_path"], edit.get("transitions")))
+        return timeline
+
+    def to_edl(self, project_name: str = None) -> Dict:
+        """Serializes the timeline to the JSON EDL shape used by VideoAssembler"""
+        edl = {
+            "version": "1.0",
+            "project_name": project_name or self.project_name,
+            "timeline": []
+        }
+        current = 0
+        for record in self.records:
+            edl["timeline"].append({
+                "shot_number": record.shot_number,
+                "in_point": self._seconds(current),
+                "out_point": self._seconds(current + record.duration),
+                "file_path": record.file_path,
+                "transitions": record.transitions
+            })
+            current += record.duration
+        return edl
@@ -0,0 +1,154 @@
+# tracing.py
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, List
+
+class Tracer:
+    """
+    Collects timed spans from every thread of a pipeline run and exports them
+    as Chrome trace-event JSON (chrome://tracing, Perfetto) or a summary table.
+    Tracing is off until enable() is called, and spans are then near free.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.spans: List[Dict] = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def enable(self):
+        self.enabled = True
+        self._origin = time.perf_counter()
+
+    def reset(self):
+        with self._lock:
+            self.spans = []
+        self._origin = time.perf_counter()
+
+    def now(self) -> float:
+        return time.perf_counter()
+
+    def add_span(self, name: str, category: str, start: float, end: float, args: Dict = None):
+        """Records a span from perf_counter start/end times"""
+        if not self.enabled:
+            return
+        span = {
+            "name": name,
+            "cat": category,
+            "start": start - self._origin,
+            "duration": end - start,
+            "tid": threading.get_native_id(),
+            "args": args or {}
+        }
+        with self._lock:
+            self.spans.append(span)
+
+    @contextmanager
+    def span(self, name: str, category: str = "pipeline", **args):
+        """
+        Times the enclosed block. The yielded dict can be updated inside the
+        block to attach results such as token counts or cache hits.
+        """
+        if not self.enabled:
+            yield args
+            return
+        start = time.perf_counter()
+        try:
+            yield args
+        except Exception as e:
+            args["error"] = str(e)
+            raise
+        finally:
+            self.add_span(name, category, start, time.perf_counter(), args)
+
+    def export_chrome(self, path: str):
+        """Writes the spans as Chrome trace-event JSON"""
+        pid = os.getpid()
+        with self._lock:
+            events = [{
+                "name": span["name"],
+                "cat": span["cat"],
+                "ph": "X",
+                "ts": round(span["start"] * 1e6),
+                "dur": round(span["duration"] * 1e6),
+                "pid": pid,
+                "tid": span["tid"],
+                "args": span["args"]
+            } for span in self.spans]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def summary(self) -> List[Dict]:
+        """Aggregates spans by category and name, slowest total first"""
+        groups = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            key = (span["cat"], span["name"])
+            group = groups.setdefault(key, {
+                "category": span["cat"], "name": span["name"], "count": 0,
+                "total": 0.0, "max": 0.0, "prompt_tokens": 0, "completion_tokens": 0
+            })
+            group["count"] += 1
+            group["total"] += span["duration"]
+            group["max"] = max(group["max"], span["duration"])
+            group["prompt_tokens"] += span["args"].get("prompt_tokens", 0) or 0
+            group["completion_tokens"] += span["args"].get("completion_tokens", 0) or 0
+        return sorted(groups.values(), key=lambda group: group["total"], reverse=True)
+
+    def format_summary(self) -> str:
+        """Formats the summary as a plain-text table"""
+        lines = [f"{'category':<12} {'name':<36} {'count':>6} {'total s':>9} {'mean s':>8} {'max s':>8} {'tokens in':>10} {'tokens out':>10}"]
+        for group in self.summary():
+            lines.append(
+                f"{group['category'][:12]:<12} {group['name'][:36]:<36} {group['count']:>6} "
+                f"{group['total']:>9.2f} {group['total'] / group['count']:>8.2f} {group['max']:>8.2f} "
+                f"{group['prompt_tokens']:>10} {group['completion_tokens']:>10}"
+            )
+        return "\n".join(lines)
+
+# Process-wide tracer shared by every module
+tracer = Tracer()
+
+def span(name: str, category: str = "pipeline", **args):
+    """Shortcut for tracer.span"""
+    return tracer.span(name, category, **args)
+
+def make_langchain_handler():
+    """
+    Returns a LangChain callback handler that records one span per LLM call
+    with its prompt and completion token counts.
+    """
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class TracingCallbackHandler(BaseCallbackHandler):
+        def __init__(self):
+            self._starts = {}
+
+        def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+            self._starts[run_id] = tracer.now()
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+            self._starts[run_id] = tracer.now()
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            start = self._starts.pop(run_id, None)
+            if start is None:
+                return
+            llm_output = response.llm_output or {}
+            usage = llm_output.get("token_usage") or {}
+            tracer.add_span(f"llm:{llm_output.get('model_name', 'chat')}", "llm", start, tracer.now(), {
+                "prompt_tokens": usage.get("prompt_tokens", 0),
+                "completion_tokens": usage.get("completion_tokens", 0)
+            })
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            start = self._starts.pop(run_id, None)
+            if start is not None:
+                tracer.add_span("llm:error", "llm", start, tracer.now(), {"error": str(error)})
+
+    return TracingCallbackHandler()
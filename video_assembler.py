@@ -1,45 +1,166 @@
 # video_assembler.py
 import os
 import json
+import threading
+import functools
 import subprocess
-from typing import List, Dict
-import requests
+from typing import List, Dict, Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from fractions import Fraction
 import time
+from config import MovieConfig
+from pipeline_manifest import StageManifest, hash_inputs
+from timeline import Timeline
+from ffmpeg_runner import FFmpegError, run_ffmpeg
+
+def encoder_args(preset: str = None, crf: int = None) -> List[str]:
+    """Returns the ffmpeg video encoder arguments shared by every render path"""
+    settings = MovieConfig.VIDEO_SETTINGS
+    return [
+        "-c:v", settings["encoder"],
+        "-preset", preset or settings["preset"],
+        "-crf", str(crf if crf is not None else settings["crf"]),
+        "-pix_fmt", settings["pix_fmt"],
+        "-r", str(settings["fps"])
+    ]
+
+# ffprobe codec names of the encoders renders may use
+ENCODER_CODECS = {
+    "libx264": "h264", "h264_nvenc": "h264", "h264_videotoolbox": "h264", "h264_qsv": "h264",
+    "libx265": "hevc", "hevc_nvenc": "hevc", "hevc_videotoolbox": "hevc",
+    "libvpx-vp9": "vp9", "libaom-av1": "av1", "libsvtav1": "av1"
+}
+
+def matches_encoder(params: Dict, encode: List[str], resolution: str = None) -> bool:
+    """
+    Returns True if a stream probed by VideoAssembler.probe_video has the
+    codec, pixel format and frame rate that the encoder arguments produce
+    (and the given "WxH" resolution), so it can be stream-copied next to
+    clips encoded with them.
+    """
+    options = dict(zip(encode[::2], encode[1::2]))
+    codec = ENCODER_CODECS.get(options.get("-c:v"))
+    if codec is None or params.get("codec_name") != codec:
+        return False
+    if options.get("-pix_fmt") and params.get("pix_fmt") != options["-pix_fmt"]:
+        return False
+    try:
+        if options.get("-r") and Fraction(params.get("r_frame_rate", "0/1")) != Fraction(options["-r"]):
+            return False
+    except (ValueError, ZeroDivisionError):
+        return False
+    return not resolution or f"{params.get('width')}x{params.get('height')}" == resolution
+
+def proxy_encoder_args() -> List[str]:
+    """Returns the fast encoder arguments used for proxies and draft renders"""
+    settings = MovieConfig.PROXY_SETTINGS
+    return encoder_args(preset=settings["preset"], crf=settings["crf"])
+
+def write_concat_list(entries: List, list_path: str):
+    """
+    Writes an ffmpeg concat demuxer list. entries are file paths or
+    (path, inpoint) tuples; inpoints must fall on keyframes for stream copy.
+    """
+    with open(list_path, 'w') as f:
+        for entry in entries:
+            path, inpoint = entry if isinstance(entry, tuple) else (entry, None)
+            escaped = os.path.abspath(str(path)).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+            if inpoint is not None:
+                f.write(f"inpoint {inpoint:.6f}\n")
+
+def _timeline_duration(edl: Dict) -> float:
+    return float(edl["timeline"][-1]["out_point"] - edl["timeline"][0]["in_point"]) if edl["timeline"] else 0.0
+
+def ken_burns_filter(movement: str, frames: int, width: int, height: int, fps: int, zoom: float) -> str:
+    """
+    Returns a zoompan filter that animates a still over frames output frames
+    according to a shot list camera_movement, or None for a static hold.
+    Free-form movements such as "slow push in" are matched case-insensitively,
+    ignoring a "slow" or "fast" qualifier.
+    """
+    progress = f"on/{max(frames - 1, 1)}"
+    centre_x = "iw/2-(iw/zoom/2)"
+    centre_y = "ih/2-(ih/zoom/2)"
+    moves = {
+        "dolly_in": (f"1+{zoom - 1:.4f}*{progress}", centre_x, centre_y),
+        "dolly_out": (f"{zoom:.4f}-{zoom - 1:.4f}*{progress}", centre_x, centre_y),
+        "pan_left": (f"{zoom:.4f}", f"(iw-iw/zoom)*(1-{progress})", centre_y),
+        "pan_right": (f"{zoom:.4f}", f"(iw-iw/zoom)*{progress}", centre_y),
+        "tilt_up": (f"{zoom:.4f}", centre_x, f"(ih-ih/zoom)*(1-{progress})"),
+        "tilt_down": (f"{zoom:.4f}", centre_x, f"(ih-ih/zoom)*{progress}"),
+        "handheld": (f"{1 + (zoom - 1) / 2:.4f}", f"{centre_x}+iw*0.004*sin(on/5)", f"{centre_y}+ih*0.004*cos(on/7)"),
+        "steadicam": (f"1+{(zoom - 1) / 2:.4f}*{progress}", f"{centre_x}+iw*0.01*sin(on/40)", centre_y),
+    }
+    moves["track_left"] = moves["pan_left"]
+    moves["track_right"] = moves["pan_right"]
+    moves["crane_up"] = moves["tilt_up"]
+    moves["crane_down"] = moves["tilt_down"]
+    moves["push_in"] = moves["zoom_in"] = moves["dolly_in"]
+    moves["pull_out"] = moves["pull_back"] = moves["zoom_out"] = moves["dolly_out"]
+    
+    words = movement.lower().replace("-", " ").replace("_", " ").split()
+    movement = "_".join(word for word in words if word not in ("slow", "slowly", "fast", "quick"))
+    if movement not in moves:
+        return None
+    z, x, y = moves[movement]
+    return f"zoompan=z='{z}':x='{x}':y='{y}':d={frames}:s={width}x{height}:fps={fps}"
+
+def _render_entry(method):
+    """
+    Marks a public render method. Starting one while no other render of the
+    assembler is running (in any thread) clears a cancel left over from an
+    earlier render, so one cancel() stops only the renders in progress,
+    including the nested steps they run.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._render_lock:
+            if self._render_depth == 0:
+                self.cancel_event.clear()
+            self._render_depth += 1
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            with self._render_lock:
+                self._render_depth -= 1
+    return wrapper
 
 class VideoAssembler:
     """Assembles final video from generated components"""
     
-    def __init__(self, project_path: str):
+    def __init__(self, project_path: str, on_progress: Callable[[Dict], None] = None,
+                 on_metrics: Callable[[Dict], None] = None):
         self.project_path = Path(project_path)
+        self.on_progress = on_progress
+        self.on_metrics = on_metrics
+        self.cancel_event = threading.Event()
+        self._render_depth = 0
+        self._render_lock = threading.Lock()
         self.shots_path = self.project_path / "shots"
         self.audio_path = self.project_path / "audio"
         self.output_path = self.project_path / "output"
+        self.proxies_path = self.shots_path / "proxies"
         
-    def create_edit_decision_list(self, shot_list_path: str) -> Dict:
-        """Creates an EDL from the shot list"""
+    def _run_ffmpeg(self, cmd: List[str], label: str = None, duration: float = None) -> Dict:
+        """Runs ffmpeg through the shared runner with this assembler's callbacks"""
+        return run_ffmpeg(cmd, label=label, duration=duration, on_progress=self.on_progress,
+                          on_metrics=self.on_metrics, cancel_event=self.cancel_event)
+    
+    def cancel(self):
+        """Cancels any render this assembler is running"""
+        self.cancel_event.set()
+    
+    def create_timeline(self, shot_list_path: str) -> Timeline:
+        """Builds a frame-accurate timeline from the shot list"""
         with open(shot_list_path, 'r') as f:
             shot_list = json.load(f)
-            
-        edl = {
-            "version": "1.0",
-            "project_name": shot_list.get("project_name", "untitled"),
-            "timeline": []
-        }
-        
-        current_time = 0
-        for shot in shot_list.get("shots", []):
-            edit_point = {
-                "shot_number": shot["shot_number"],
-                "in_point": current_time,
-                "out_point": current_time + shot["duration"],
-                "file_path": f"shots/shot_{shot['shot_number']:03d}.mp4",
-                "transitions": shot.get("transitions", {"in": "cut", "out": "cut"})
-            }
-            edl["timeline"].append(edit_point)
-            current_time += shot["duration"]
-            
-        return edl
+        return Timeline.from_shot_list(shot_list)
+    
+    def create_edit_decision_list(self, shot_list_path: str) -> Dict:
+        """Creates an EDL from the shot list"""
+        return self.create_timeline(shot_list_path).to_edl()
     
     def generate_ffmpeg_filter_complex(self, edl: Dict) -> str:
         """Generates FFmpeg filter complex for video assembly"""
@@ -61,10 +182,157 @@ class VideoAssembler:
         
         return ";".join(filters)
     
-    def assemble_video(self, edl_path: str, output_filename: str):
-        """Assembles the final video using FFmpeg"""
-        edl = self.create_edit_decision_list(edl_path)
+    @_render_entry
+    def render_shots(self, shot_list_path: str, manifest: StageManifest = None) -> Dict[int, str]:
+        """
+        Renders every shot in the shot list. With a manifest, only shots whose
+        entry in the shot list changed since the last run are re-rendered.
+        """
+        with open(shot_list_path, 'r') as f:
+            shot_list = json.load(f)
+        
+        rendered = {}
+        stale = []
+        input_hashes = {}
+        for shot in shot_list.get("shots", []):
+            shot_number = shot["shot_number"]
+            stage = f"shot_render:{shot_number:03d}"
+            input_hashes[shot_number] = hash_inputs(shot, MovieConfig.VIDEO_SETTINGS)
+            
+            if manifest is not None and manifest.is_fresh(stage, input_hashes[shot_number]):
+                rendered[shot_number] = manifest.outputs(stage)
+            else:
+                stale.append(shot)
+        
+        if stale:
+            results = generate_video_shots_batch(stale, output_dir=str(self.shots_path),
+                                                 cancel_event=self.cancel_event)
+            for shot in stale:
+                shot_number = shot["shot_number"]
+                if shot_number not in results:
+                    print(f"Error rendering shot {shot_number}")
+                    continue
+                rendered[shot_number] = results[shot_number]
+                if manifest is not None:
+                    manifest.record(f"shot_render:{shot_number:03d}", input_hashes[shot_number], results[shot_number])
+        return rendered
+    
+    def _assembly_hash(self, edl: Dict, output_filename: str) -> str:
+        """Hashes the EDL together with the current state of every shot file it uses"""
+        shot_states = []
+        for edit in edl["timeline"]:
+            try:
+                stat = os.stat(self.project_path / edit["file_path"])
+                shot_states.append((edit["file_path"], stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                shot_states.append((edit["file_path"], None, None))
+        return hash_inputs(edl, shot_states, output_filename)
+    
+    def probe_video(self, path) -> Dict:
+        """Returns the codec parameters of the first video stream in a file"""
+        cmd = [
+            "ffprobe", "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "stream=codec_name,profile,width,height,pix_fmt,r_frame_rate,time_base",
+            "-of", "json",
+            str(path)
+        ]
+        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+        streams = json.loads(result.stdout).get("streams", [])
+        return streams[0] if streams else {}
+    
+    def probe_keyframes(self, path) -> List[float]:
+        """Returns the timestamps of every keyframe in the first video stream"""
+        cmd = [
+            "ffprobe", "-v", "error",
+            "-select_streams", "v:0",
+            "-skip_frame", "nokey",
+            "-show_entries", "frame=pts_time",
+            "-of", "csv=p=0",
+            str(path)
+        ]
+        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+        return [float(value) for value in result.stdout.split() if value not in ("", "N/A")]
+    
+    def choose_assembly_mode(self, edl: Dict, encode: List[str] = None) -> str:
+        """
+        Picks the cheapest assembly mode for an EDL:
+        "copy" when every shot shares codec parameters and only cuts are used,
+        "smart" when shots match each other and the encoder settings (encode,
+        default: the full-resolution settings) but some fade in, since the
+        re-encoded fade heads are joined to stream-copied tails, and
+        "reencode" otherwise.
+        """
+        resolution = None
+        if encode is None:
+            encode, resolution = encoder_args(), MovieConfig.VIDEO_SETTINGS["resolution"]
+        try:
+            params = [self.probe_video(self.project_path / edit["file_path"]) for edit in edl["timeline"]]
+        except (subprocess.CalledProcessError, OSError, ValueError):
+            return "reencode"
         
+        if not params or not params[0] or any(p != params[0] for p in params):
+            return "reencode"
+        if any(edit["transitions"]["in"] == "fade" for edit in edl["timeline"]):
+            return "smart" if matches_encoder(params[0], encode, resolution) else "reencode"
+        return "copy"
+    
+    def _concat_copy(self, entries: List, output_file: str, duration: float = None):
+        """Concatenates clips with the concat demuxer without re-encoding"""
+        list_path = self.output_path / ".concat_list.txt"
+        write_concat_list(entries, str(list_path))
+        cmd = [
+            "ffmpeg", "-y",
+            "-f", "concat", "-safe", "0",
+            "-i", str(list_path),
+            "-c", "copy",
+            output_file
+        ]
+        try:
+            self._run_ffmpeg(cmd, label=f"concat:{os.path.basename(output_file)}", duration=duration)
+        finally:
+            if list_path.exists():
+                list_path.unlink()
+    
+    def _smart_render(self, edl: Dict, output_file: str, encode: List[str], fade_duration: float = 1.0):
+        """
+        Re-encodes only the GOP-aligned head of each shot that fades in and
+        stream-copies everything else. A faded head runs from the start of the
+        shot to its first keyframe after the fade, so the copied remainder
+        starts cleanly on a keyframe.
+        """
+        work_dir = self.output_path / ".smart_render"
+        os.makedirs(work_dir, exist_ok=True)
+        
+        entries = []
+        try:
+            for i, edit in enumerate(edl["timeline"]):
+                source = self.project_path / edit["file_path"]
+                if edit["transitions"]["in"] != "fade":
+                    entries.append(str(source))
+                    continue
+                
+                keyframes = [t for t in self.probe_keyframes(source) if t >= fade_duration]
+                head_path = work_dir / f"head_{i:05d}.mp4"
+                cmd = ["ffmpeg", "-y", "-i", str(source)]
+                if keyframes:
+                    cmd.extend(["-t", f"{keyframes[0]:.6f}"])
+                cmd.extend(["-vf", f"fade=t=in:st=0:d={fade_duration}", "-an"])
+                cmd.extend(encode)
+                cmd.append(str(head_path))
+                self._run_ffmpeg(cmd, label=f"smart_head:{edit['shot_number']}")
+                
+                entries.append(str(head_path))
+                if keyframes:
+                    entries.append((str(source), keyframes[0]))
+            
+            self._concat_copy(entries, output_file, _timeline_duration(edl))
+        finally:
+            for path in work_dir.glob("head_*.mp4"):
+                path.unlink()
+    
+    def _reencode(self, edl: Dict, output_file: str, encode: List[str]):
+        """Decodes every shot through a concat filter graph and re-encodes the timeline"""
         # Build FFmpeg command
         cmd = ["ffmpeg", "-y"]
         
@@ -72,26 +340,370 @@ class VideoAssembler:
         for edit in edl["timeline"]:
             cmd.extend(["-i", str(self.project_path / edit["file_path"])])
         
-        # Add filter complex
-        filter_complex = self.generate_ffmpeg_filter_complex(edl)
-        cmd.extend(["-filter_complex", filter_complex])
+        # Add filter complex; long timelines exceed the command line limit, so it is read from a file
+        graph_file = f"{output_file}.graph.txt"
+        with open(graph_file, 'w') as f:
+            f.write(self.generate_ffmpeg_filter_complex(edl))
+        cmd.extend(["-filter_complex_script", graph_file])
         
         # Add output settings
-        cmd.extend([
-            "-map", "[outv]",
-            "-c:v", "libx264",
-            "-preset", "medium",
-            "-crf", "23",
-            str(self.output_path / output_filename)
-        ])
+        cmd.extend(["-map", "[outv]"])
+        cmd.extend(encode)
+        cmd.append(output_file)
+        
+        try:
+            self._run_ffmpeg(cmd, label=f"reencode:{os.path.basename(output_file)}", duration=_timeline_duration(edl))
+        finally:
+            os.remove(graph_file)
+    
+    def _parallel_render(self, edl: Dict, output_file: str, encode: List[str], workers: int, segment_shots: int):
+        """
+        Splits the EDL on shot boundaries into segments, encodes the segments
+        in parallel with the shared encoder settings and joins them
+        losslessly with the concat demuxer. Each encode is its own ffmpeg
+        process, so a thread pool is enough to keep the cores busy, and
+        encodes report progress and metrics and honour cancel() like any
+        other render.
+        """
+        work_dir = self.output_path / ".parallel_render"
+        os.makedirs(work_dir, exist_ok=True)
+        
+        timeline = edl["timeline"]
+        segments = [timeline[i:i + segment_shots] for i in range(0, len(timeline), segment_shots)]
+        # Split the cores between workers so the encoders do not oversubscribe
+        threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+        
+        commands = []
+        durations = []
+        for index, segment in enumerate(segments):
+            cmd = ["ffmpeg", "-y"]
+            for edit in segment:
+                cmd.extend(["-i", str(self.project_path / edit["file_path"])])
+            graph_file = work_dir / f"segment_{index:05d}.txt"
+            with open(graph_file, 'w') as f:
+                f.write(self.generate_ffmpeg_filter_complex({"timeline": segment}))
+            cmd.extend(["-filter_complex_script", str(graph_file)])
+            cmd.extend(["-map", "[outv]"])
+            cmd.extend(encode)
+            cmd.extend(["-threads", str(threads_per_worker)])
+            cmd.append(str(work_dir / f"segment_{index:05d}.mp4"))
+            commands.append(cmd)
+            durations.append(_timeline_duration({"timeline": segment}))
+        
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(self._run_ffmpeg, cmd, f"segment:{index:05d}", duration)
+                           for index, (cmd, duration) in enumerate(zip(commands, durations))]
+                try:
+                    for future in as_completed(futures):
+                        future.result()
+                except BaseException:
+                    # Queued segments are dropped; running ones are killed by cancel() or finish
+                    for future in futures:
+                        future.cancel()
+                    raise
+            self._concat_copy([cmd[-1] for cmd in commands], output_file, _timeline_duration(edl))
+        finally:
+            for path in work_dir.glob("segment_*"):
+                path.unlink()
+    
+    @_render_entry
+    def render_timeline(self, edl: Dict, output_file: str, mode: str = "auto", workers: int = None,
+                        segment_shots: int = None, encode: List[str] = None) -> str:
+        """
+        Renders an EDL to output_file and returns the mode that was used.
+        mode is "copy" (concat demuxer, no re-encode), "smart" (re-encode only
+        around fades), "reencode" (full filter graph), "parallel" (re-encode
+        in segments on parallel ffmpeg processes) or "auto" to pick the cheapest
+        mode the shots allow. encode overrides the encoder arguments.
+        """
+        if workers is None:
+            workers = MovieConfig.CONCURRENCY_SETTINGS["render_workers"]
+        if segment_shots is None:
+            segment_shots = MovieConfig.CONCURRENCY_SETTINGS["render_segment_shots"]
+        if mode == "auto":
+            # Chosen before encode is defaulted, so full renders also check the shots' resolution
+            mode = self.choose_assembly_mode(edl, encode)
+            if mode == "reencode" and workers > 1 and len(edl["timeline"]) > segment_shots:
+                mode = "parallel"
+        if encode is None:
+            encode = encoder_args()
+        
+        os.makedirs(self.output_path, exist_ok=True)
+        
+        if mode == "copy":
+            self._concat_copy([str(self.project_path / edit["file_path"]) for edit in edl["timeline"]],
+                              output_file, _timeline_duration(edl))
+        elif mode == "smart":
+            self._smart_render(edl, output_file, encode)
+        elif mode == "parallel":
+            self._parallel_render(edl, output_file, encode, max(1, workers), max(1, segment_shots))
+        else:
+            self._reencode(edl, output_file, encode)
+        return mode
+    
+    @_render_entry
+    def assemble_video(self, edl_path: str, output_filename: str, manifest: StageManifest = None,
+                       mode: str = "auto", workers: int = None, segment_shots: int = None):
+        """Assembles the final video using FFmpeg. See render_timeline for the modes."""
+        edl = self.create_edit_decision_list(edl_path)
+        output_file = str(self.output_path / output_filename)
+        
+        if manifest is not None:
+            input_hash = self._assembly_hash(edl, output_filename)
+            if manifest.is_fresh("assembly", input_hash):
+                print(f"Skipping assembly: {output_filename} is up to date")
+                return
         
         # Execute FFmpeg
         try:
-            subprocess.run(cmd, check=True)
-            print(f"Video assembled successfully: {output_filename}")
+            mode = self.render_timeline(edl, output_file, mode, workers, segment_shots)
+            print(f"Video assembled successfully ({mode}): {output_filename}")
+            if manifest is not None:
+                manifest.record("assembly", input_hash, output_file)
         except subprocess.CalledProcessError as e:
             print(f"Error assembling video: {e}")
+    
+    def save_edl(self, edl: Dict, edl_file: str):
+        """Writes an EDL to disk so drafts and the final conform share one timeline"""
+        os.makedirs(os.path.dirname(edl_file) or ".", exist_ok=True)
+        with open(edl_file, 'w') as f:
+            json.dump(edl, f, indent=2)
+    
+    def load_edl(self, edl_file: str) -> Dict:
+        """Reads an EDL written by save_edl"""
+        with open(edl_file, 'r') as f:
+            return json.load(f)
+    
+    def _load_proxy_map(self) -> Dict:
+        try:
+            with open(self.proxies_path / "proxy_map.json", 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _render_proxy(self, source: str, proxy: str):
+        settings = MovieConfig.PROXY_SETTINGS
+        cmd = [
+            "ffmpeg", "-y",
+            "-i", source,
+            "-vf", f"scale=-2:{settings['height']}",
+            "-an",
+            *proxy_encoder_args(),
+            proxy
+        ]
+        self._run_ffmpeg(cmd, label=f"proxy:{os.path.basename(source)}")
+    
+    @_render_entry
+    def create_proxies(self, edl: Dict, max_workers: int = None) -> Dict[str, str]:
+        """
+        Creates low-resolution proxies for every shot in the EDL. Proxies are
+        cached in shots/proxies/proxy_map.json keyed by source path, size and
+        modification time, so each source is only transcoded once.
+        Returns a mapping of EDL file path to proxy file path. If a proxy
+        fails, the ones already finished are still recorded in the map.
+        """
+        if max_workers is None:
+            max_workers = MovieConfig.CONCURRENCY_SETTINGS["render_workers"]
+        os.makedirs(self.proxies_path, exist_ok=True)
+        
+        proxy_map = self._load_proxy_map()
+        proxies = {}
+        pending = {}
+        for edit in edl["timeline"]:
+            file_path = edit["file_path"]
+            if file_path in proxies or file_path in pending:
+                continue
+            stat = os.stat(self.project_path / file_path)
+            proxy_rel = os.path.join("shots", "proxies", os.path.basename(file_path))
+            entry = proxy_map.get(file_path)
+            if (entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns
+                    and (self.project_path / entry["proxy"]).exists()):
+                proxies[file_path] = entry["proxy"]
+            else:
+                pending[file_path] = (proxy_rel, stat)
+        
+        if pending:
+            print(f"Creating {len(pending)} proxies...")
+            try:
+                with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+                    futures = {
+                        executor.submit(self._render_proxy, str(self.project_path / file_path),
+                                        str(self.project_path / proxy_rel)): file_path
+                        for file_path, (proxy_rel, _) in pending.items()
+                    }
+                    for future in as_completed(futures):
+                        file_path = futures[future]
+                        future.result()
+                        proxy_rel, stat = pending[file_path]
+                        proxies[file_path] = proxy_rel
+                        proxy_map[file_path] = {"proxy": proxy_rel, "size": stat.st_size,
+                                                "mtime_ns": stat.st_mtime_ns}
+            finally:
+                with open(self.proxies_path / "proxy_map.json", 'w') as f:
+                    json.dump(proxy_map, f, indent=2)
+        return proxies
+    
+    @_render_entry
+    def render_draft(self, edl: Dict, output_filename: str, mode: str = "auto") -> str:
+        """
+        Renders a fast draft of the EDL from low-resolution proxies with the
+        proxy encoder settings. The EDL itself is unchanged, so the same
+        timeline can be passed to conform for the final master.
+        """
+        output_file = str(self.output_path / output_filename)
+        try:
+            proxies = self.create_proxies(edl)
+            draft_edl = dict(edl)
+            draft_edl["timeline"] = [dict(edit, file_path=proxies[edit["file_path"]]) for edit in edl["timeline"]]
+            mode = self.render_timeline(draft_edl, output_file, mode, encode=proxy_encoder_args())
+            print(f"Draft rendered successfully ({mode}): {output_filename}")
+            return output_file
+        except subprocess.CalledProcessError as e:
+            print(f"Error rendering draft: {e}")
+        return ""
+    
+    @_render_entry
+    def conform(self, edl: Dict, output_filename: str, mode: str = "auto") -> str:
+        """Re-renders an EDL, typically one already reviewed as a draft, against the full-resolution shots"""
+        output_file = str(self.output_path / output_filename)
+        try:
+            mode = self.render_timeline(edl, output_file, mode)
+            print(f"Conformed successfully ({mode}): {output_filename}")
+            return output_file
+        except subprocess.CalledProcessError as e:
+            print(f"Error conforming video: {e}")
+        return ""
             
+    def _shot_image(self, shot: Dict, images: Dict[int, str]) -> str:
+        """Returns the existing storyboard image for a shot, or None"""
+        image = images.get(shot["shot_number"]) or shot.get("storyboard")
+        if image and not os.path.isabs(image):
+            image = str(self.project_path / image)
+        return image if image and os.path.exists(image) else None
+    
+    def _animatic_graph(self, shot_list: Dict, images: Dict[int, str], ken_burns: bool, slates: bool,
+                        proxies: Dict[str, str] = None) -> tuple:
+        """Builds the input files, filter graph and duration of a storyboard animatic"""
+        settings = MovieConfig.VIDEO_SETTINGS
+        width, height = (int(v) for v in settings["resolution"].split("x"))
+        fps = settings["fps"]
+        zoom = MovieConfig.ANIMATIC_SETTINGS["zoom"]
+        timeline = Timeline.from_shot_list(shot_list, fps)
+        shots = {shot["shot_number"]: shot for shot in shot_list.get("shots", [])}
+        
+        # Each distinct image is decoded and scaled once, then split between the shots using it
+        inputs = []
+        uses = {}
+        shot_sources = []
+        for record in timeline:
+            image = self._shot_image(shots[record.shot_number], images)
+            if image:
+                image = (proxies or {}).get(image, image)
+                if image not in uses:
+                    inputs.append(image)
+                    uses[image] = []
+                uses[image].append(len(shot_sources))
+            shot_sources.append(image)
+        
+        filters = []
+        labels = {}
+        for index, image in enumerate(inputs):
+            fit = (f"[{index}:v]scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                   f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,format=yuv420p")
+            count = len(uses[image])
+            if count == 1:
+                filters.append(f"{fit}[img{index}_0]")
+            else:
+                filters.append(f"{fit},split={count}" + "".join(f"[img{index}_{n}]" for n in range(count)))
+            for n, position in enumerate(uses[image]):
+                labels[position] = f"[img{index}_{n}]"
+        
+        for position, record in enumerate(timeline):
+            shot = shots[record.shot_number]
+            frames = max(1, record.duration)
+            if position in labels:
+                move = ken_burns_filter(shot.get("camera_movement", "static"), frames, width, height, fps,
+                                        zoom) if ken_burns else None
+                # zoompan emits d frames from the single decoded still; static holds just repeat it
+                chain = labels[position] + (move if move else
+                                            f"loop=loop={frames - 1}:size=1:start=0,setpts=N/({fps}*TB)")
+            else:
+                chain = f"color=c=0x202020:s={width}x{height}:r={fps},trim=end_frame={frames},format=yuv420p"
+            if slates:
+                chain += (f",drawtext=text='SHOT {record.shot_number:03d}':x=40:y=40:fontsize=h/18:fontcolor=white"
+                          f":box=1:boxcolor=black@0.6:boxborderw=12")
+            filters.append(f"{chain},setsar=1[s{position}]")
+        
+        concat_inputs = "".join(f"[s{position}]" for position in range(len(shot_sources)))
+        filters.append(f"{concat_inputs}concat=n={len(shot_sources)}:v=1:a=0[outv]")
+        return inputs, ";\n".join(filters), timeline.total_frames / fps
+    
+    @_render_entry
+    def render_animatic(self, shot_list_path: str, output_filename: str = "animatic.mp4",
+                        images: Dict[int, str] = None, ken_burns: bool = True, slates: bool = None,
+                        encode: List[str] = None, proxies: bool = None) -> str:
+        """
+        Renders a storyboard animatic straight from still images in a single
+        ffmpeg pass, without encoding a clip per shot. images maps shot numbers
+        to storyboard images (falling back to a shot's "storyboard" entry);
+        shots without an image are held on a blank frame. Shots animate
+        according to their camera_movement when ken_burns is set and carry a
+        shot-number slate when slates is set. With proxies, images are read
+        through cached proxy images (image_derivatives) rather than decoded
+        at full size.
+        """
+        settings = MovieConfig.ANIMATIC_SETTINGS
+        if slates is None:
+            slates = settings["slates"]
+        if proxies is None:
+            proxies = settings["proxies"]
+        if encode is None:
+            encode = encoder_args(preset=settings["preset"], crf=settings["crf"])
+        
+        with open(shot_list_path, 'r') as f:
+            shot_list = json.load(f)
+        if not shot_list.get("shots"):
+            print("Error rendering animatic: the shot list has no shots")
+            return ""
+        
+        # The shot list lives in <project>/production/ and its storyboard paths are relative to <project>
+        project_dir = os.path.dirname(os.path.dirname(os.path.abspath(shot_list_path)))
+        for shot in shot_list["shots"]:
+            if shot.get("storyboard") and not os.path.isabs(shot["storyboard"]):
+                shot["storyboard"] = os.path.join(project_dir, shot["storyboard"])
+        
+        proxy_map = None
+        if proxies:
+            from image_derivatives import ImageDerivatives
+            sources = {self._shot_image(shot, images or {}) for shot in shot_list["shots"]}
+            proxy_map = ImageDerivatives(project_dir).proxies(sorted(source for source in sources if source))
+        inputs, graph, duration = self._animatic_graph(shot_list, images or {}, ken_burns, slates, proxy_map)
+        os.makedirs(self.output_path, exist_ok=True)
+        output_file = str(self.output_path / output_filename)
+        # Long timelines exceed the command line limit, so the graph is read from a file
+        graph_file = self.output_path / ".animatic_graph.txt"
+        with open(graph_file, 'w') as f:
+            f.write(graph)
+        
+        cmd = ["ffmpeg", "-y"]
+        for image in inputs:
+            cmd.extend(["-i", image])
+        cmd.extend(["-filter_complex_script", str(graph_file), "-map", "[outv]"])
+        cmd.extend(encode)
+        cmd.append(output_file)
+        
+        try:
+            self._run_ffmpeg(cmd, label=f"animatic:{output_filename}", duration=duration)
+            print(f"Animatic rendered successfully: {output_filename}")
+            return output_file
+        except subprocess.CalledProcessError as e:
+            print(f"Error rendering animatic: {e}")
+        finally:
+            graph_file.unlink()
+        return ""
+    
+    @_render_entry
     def add_audio_track(self, video_path: str, audio_path: str, output_path: str):
         """Adds audio track to video"""
         cmd = [
@@ -105,13 +717,13 @@ class VideoAssembler:
         ]
         
         try:
-            subprocess.run(cmd, check=True)
+            self._run_ffmpeg(cmd, label=f"audio_mux:{os.path.basename(output_path)}")
             print(f"Audio added successfully: {output_path}")
         except subprocess.CalledProcessError as e:
             print(f"Error adding audio: {e}")
 
 # Regular functions instead of tools
-def generate_video_shot(prompt: str, duration: int, shot_number: int) -> str:
+def generate_video_shot(prompt: str, duration: int, shot_number: int, output_dir: str = "output/shots") -> str:
     """
     Generates a video shot using AI video generation API.
     This is a placeholder for actual video generation - 
@@ -120,25 +732,103 @@ def generate_video_shot(prompt: str, duration: int, shot_number: int) -> str:
     # Placeholder for video generation
     # In production, this would call Runway Gen-4, Google Veo, or similar
     
-    video_path = f"output/shots/shot_{shot_number:03d}.mp4"
+    video_path = os.path.join(output_dir, f"shot_{shot_number:03d}.mp4")
     os.makedirs(os.path.dirname(video_path), exist_ok=True)
     
     # Create a placeholder video file
     # In real implementation, this would be the generated video
+    settings = MovieConfig.VIDEO_SETTINGS
     placeholder_cmd = [
         "ffmpeg", "-y",
         "-f", "lavfi",
-        "-i", f"color=c=black:s=1920x1080:d={duration}",
+        "-i", f"color=c=black:s={settings['resolution']}:r={settings['fps']}:d={duration}",
         "-vf", f"drawtext=text='Shot {shot_number}':fontsize=48:fontcolor=white:x=(w-text_w)/2:y=(h-text_h)/2",
+        *encoder_args(),
         video_path
     ]
     
     try:
-        subprocess.run(placeholder_cmd, check=True, capture_output=True)
+        run_ffmpeg(placeholder_cmd, label=f"placeholder:{shot_number}", duration=duration)
         return video_path
     except:
         return ""
 
+def _render_placeholder_batch(shots: List[Dict], output_dir: str,
+                              cancel_event: threading.Event = None) -> Dict[int, str]:
+    """Renders a batch of placeholder shots with a single ffmpeg process, one output per shot"""
+    settings = MovieConfig.VIDEO_SETTINGS
+    cmd = ["ffmpeg", "-y"]
+    for shot in shots:
+        cmd.extend([
+            "-f", "lavfi",
+            "-i", f"color=c=black:s={settings['resolution']}:r={settings['fps']}:d={shot['duration']}"
+        ])
+    
+    paths = {}
+    for index, shot in enumerate(shots):
+        shot_number = shot["shot_number"]
+        paths[shot_number] = os.path.join(output_dir, f"shot_{shot_number:03d}.mp4")
+        cmd.extend([
+            "-map", f"{index}:v",
+            "-vf", f"drawtext=text='Shot {shot_number}':fontsize=48:fontcolor=white:x=(w-text_w)/2:y=(h-text_h)/2",
+            *encoder_args(),
+            # Every output has its own encoder, so each gets one thread
+            "-threads", "1",
+            paths[shot_number]
+        ])
+    
+    # The outputs encode side by side, so the batch lasts as long as its longest shot
+    run_ffmpeg(cmd, label=f"placeholder_batch:{shots[0]['shot_number']}-{shots[-1]['shot_number']}",
+               duration=max(shot["duration"] for shot in shots), cancel_event=cancel_event)
+    return paths
+
+def generate_video_shots_batch(shots: List[Dict], output_dir: str = "output/shots", batch_size: int = None,
+                               max_workers: int = None, progress: Callable[[int, int], None] = None,
+                               cancel_event: threading.Event = None) -> Dict[int, str]:
+    """
+    Renders placeholder clips for a whole shot list with few ffmpeg invocations.
+    Shots are grouped into batches that each run as one ffmpeg process with
+    one output per shot, and batches run on a bounded worker pool.
+    max_workers caps the number of encoders running at once (default:
+    render_workers), so it allows max_workers // batch_size concurrent
+    batches, and at least one.
+    progress is called with (shots_done, shots_total) after each batch.
+    Setting cancel_event kills the running batches, drops the queued ones
+    and raises FFmpegError with reason "cancelled".
+    Returns a mapping of shot number to clip path for every rendered shot.
+    """
+    if batch_size is None:
+        batch_size = MovieConfig.CONCURRENCY_SETTINGS["placeholder_batch_size"]
+    if batch_size <= 0:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+    if max_workers is None:
+        max_workers = MovieConfig.CONCURRENCY_SETTINGS["render_workers"]
+    max_workers = max(1, max_workers // batch_size)
+    if progress is None:
+        progress = lambda done, total: print(f"Rendered {done}/{total} placeholder shots")
+    
+    os.makedirs(output_dir, exist_ok=True)
+    batches = [shots[i:i + batch_size] for i in range(0, len(shots), batch_size)]
+    
+    rendered = {}
+    done = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_render_placeholder_batch, batch, output_dir, cancel_event): batch for batch in batches}
+        for future in as_completed(futures):
+            batch = futures[future]
+            try:
+                rendered.update(future.result())
+            except subprocess.CalledProcessError as e:
+                if cancel_event is not None and cancel_event.is_set():
+                    for queued in futures:
+                        queued.cancel()
+                    raise
+                numbers = ", ".join(str(shot["shot_number"]) for shot in batch)
+                print(f"Error rendering placeholder shots {numbers}: {e}")
+            done += len(batch)
+            progress(done, len(shots))
+    return rendered
+
 def generate_audio_track(description: str, duration: int, audio_type: str = "music") -> str:
     """
     Generates audio track (music, sfx, ambience) using AI audio generation.
@@ -160,7 +850,7 @@ def generate_audio_track(description: str, duration: int, audio_type: str = "mus
     ]
     
     try:
-        subprocess.run(placeholder_cmd, check=True, capture_output=True)
+        run_ffmpeg(placeholder_cmd, label=f"audio:{audio_type}", duration=duration)
         return audio_path
     except:
         return ""
\ No newline at end of file
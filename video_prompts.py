@@ -0,0 +1,157 @@
+# video_prompts.py
+import os
+import json
+import threading
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+from config import MovieConfig
+from tracing import span
+
+# Written alongside the JSONL file; maps shot numbers to byte ranges
+INDEX_SUFFIX = ".idx.json"
+
+@lru_cache(maxsize=None)
+def _style_fragments(style: str) -> Tuple[str, str, str]:
+    settings = MovieConfig.VIDEO_SETTINGS
+    preset = MovieConfig.STYLE_PRESETS.get(style) or MovieConfig.STYLE_PRESETS["cinematic"]
+    technical = {
+        "fps": settings["fps"],
+        "resolution": settings["resolution"],
+        "aspect_ratio": settings["aspect_ratio"]
+    }
+    style_guide = {
+        "style": style,
+        "cinematography": preset["camera"],
+        "lighting": preset["lighting"],
+        "color_grade": preset["color"],
+        "mood": preset["mood"]
+    }
+    suffix = (f"{preset['camera'].capitalize()}. Lighting: {preset['lighting']}. Color: {preset['color']}. "
+              f"Mood: {preset['mood']}. Photorealistic quality.")
+    # Encoded once and spliced into every record
+    return (json.dumps(technical, ensure_ascii=False)[1:-1], json.dumps(style_guide, ensure_ascii=False), suffix)
+
+def style_fragments(style: str) -> Dict:
+    """
+    Returns the parts of a video prompt shared by every shot in a given
+    STYLE_PRESETS style: the technical specs, the style guide and the
+    prompt text suffix. They are computed once per style.
+    """
+    technical, style_guide, suffix = _style_fragments(style)
+    return {"technical_specs": json.loads("{" + technical + "}"), "style_guide": json.loads(style_guide),
+            "prompt_suffix": suffix}
+
+def shot_prompt_line(shot: Dict, style: str = "cinematic") -> str:
+    """Serializes one shot's video prompt as a JSON line, reusing the style's precomputed fragments"""
+    technical, style_guide, suffix = _style_fragments(style)
+    shot_type = shot.get("type", "medium_shot")
+    movement = shot.get("camera_movement", "static")
+    description = shot.get("description", "")
+    label = MovieConfig.SHOT_TYPES.get(shot_type, {}).get("description", shot_type.replace("_", " "))
+    prompt_text = (f"Video, {shot_type.replace('_', ' ')} ({label}), camera {movement.replace('_', ' ')}: "
+                   f"{description}. {suffix}")
+    head = json.dumps({
+        "shot_number": shot["shot_number"],
+        "scene_number": shot.get("scene_number"),
+        "scene": description,
+        "characters": shot.get("characters", [])
+    }, ensure_ascii=False)
+    specs = json.dumps({"shot_type": shot_type, "duration_seconds": shot.get("duration"),
+                        "camera_movement": movement}, ensure_ascii=False)
+    return (f'{head[:-1]}, "technical_specs": {specs[:-1]}, {technical}}}, "style_guide": {style_guide}, '
+            f'"prompt_text": {json.dumps(prompt_text, ensure_ascii=False)}}}\n')
+
+def write_video_prompts(shots: List[Dict], path: str, style: str = "cinematic") -> Dict[int, Tuple[int, int]]:
+    """
+    Streams one video prompt per shot into a single JSONL file at path and
+    writes an offset index (path + ".idx.json") mapping each shot number to
+    the byte offset and length of its line. Both files are replaced
+    atomically. Returns the index.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    index = {}
+    offset = 0
+    tmp_path = f"{path}.tmp"
+    with span("write:video_prompts", "file_write", shots=len(shots)), \
+            open(tmp_path, 'wb', buffering=1024 * 1024) as f:
+        for shot in shots:
+            line = shot_prompt_line(shot, style).encode("utf-8")
+            f.write(line)
+            index[shot["shot_number"]] = (offset, len(line))
+            offset += len(line)
+    os.replace(tmp_path, path)
+    _write_index(path, index)
+    return index
+
+def _write_index(path: str, index: Dict[int, Tuple[int, int]]):
+    stat = os.stat(path)
+    tmp_path = f"{path}{INDEX_SUFFIX}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({"size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                   "shots": {str(number): list(entry) for number, entry in index.items()}}, f)
+    os.replace(tmp_path, f"{path}{INDEX_SUFFIX}")
+
+class VideoPromptReader:
+    """
+    Random access to a prompts JSONL file by shot number. The offset index
+    is loaded from disk, or rebuilt with one scan if it is missing or older
+    than the JSONL file. Safe to share between threads.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._lock = threading.Lock()
+        self.index = self._load_index()
+
+    def _load_index(self) -> Dict[int, Tuple[int, int]]:
+        stat = os.fstat(self._file.fileno())
+        try:
+            with open(f"{self.path}{INDEX_SUFFIX}", 'r') as f:
+                stored = json.load(f)
+            if stored["size"] == stat.st_size and stored["mtime_ns"] == stat.st_mtime_ns:
+                return {int(number): tuple(entry) for number, entry in stored["shots"].items()}
+        except (OSError, ValueError, KeyError):
+            pass
+        return self._scan()
+
+    def _scan(self) -> Dict[int, Tuple[int, int]]:
+        index = {}
+        offset = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    index[json.loads(line)["shot_number"]] = (offset, len(line))
+                offset += len(line)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, shot_number: int) -> bool:
+        return shot_number in self.index
+
+    def get(self, shot_number: int) -> Optional[Dict]:
+        """Returns the prompt for shot_number, or None if it has no prompt"""
+        entry = self.index.get(shot_number)
+        if entry is None:
+            return None
+        offset, length = entry
+        with self._lock:
+            self._file.seek(offset)
+            line = self._file.read(length)
+        return json.loads(line)
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Yields prompts in shot-number order"""
+        for shot_number in sorted(self.index):
+            yield self.get(shot_number)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()